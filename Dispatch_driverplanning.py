@@ -1,11 +1,22 @@
+import time
+from functools import partial
+
 import streamlit as st
-import pandas as pd
-import folium
-from folium.plugins import MarkerCluster
-from streamlit_folium import st_folium
-from geopy.distance import geodesic
-from datetime import timedelta
-from ortools.constraint_solver import routing_enums_pb2, pywrapcp
+from dispatch_planner import (
+    DEFAULT_DEPOT,
+    DistanceStore,
+    METAHEURISTICS,
+    MemoryReport,
+    PlanCache,
+    PlanningError,
+    SearchOptions,
+    UPLOAD_TYPES,
+    csv_bytes,
+    read_locations,
+    read_orders,
+    xlsx_bytes,
+)
+from dispatch_planner.memory import track
 
 #------------------------------------------------------------------------------
 
@@ -16,249 +27,242 @@ st.markdown("<div style='text-align:right; font-size:12px; color:gray;'>Version
 
 #------------------------------------------------------------------------------
 
+@st.cache_resource
+def get_plan_cache():
+    # ✅ Shared across reruns/sessions: unchanged uploads + parameters skip the solve
+    # ✅ Distances persist across days only when DISPATCH_DISTANCE_CACHE names a directory
+    return PlanCache(maxsize=8, store=DistanceStore.from_env())
+
+#------------------------------------------------------------------------------
+
 # Upload files
-order_file = st.file_uploader("Upload OrderList.xlsx", type=["xlsx"], key="order")
-location_file = st.file_uploader("Upload OrderLocation.xlsx", type=["xlsx"], key="location")
+order_file = st.file_uploader("Upload OrderList.xlsx", type=UPLOAD_TYPES, key="order")
+location_file = st.file_uploader("Upload OrderLocation.xlsx", type=UPLOAD_TYPES, key="location")
+depot_file = st.file_uploader("Upload Depots.xlsx (optional: plan several depots at once)", type=UPLOAD_TYPES,
+                              key="depots", help="Columns: Depot, LAT, LON, Drivers, Max Drops. Orders go to "
+                                                 "their 'Depot' column, or else to the nearest depot.")
 
 #------------------------------------------------------------------------------
 
 # Parameters
 num_drivers = st.number_input("Number of Drivers", min_value=1, value=3, step=1)
 max_drops_per_driver = st.number_input("Max Drops per Driver", min_value=1, value=2, step=1)
+service_min = st.number_input("Service time per drop (minutes)", min_value=0, value=0, step=1)
+allow_unassigned = st.checkbox("Allow unassigned orders", help="Plan the orders that fit and list "
+                               "the rest, instead of failing when some orders cannot be served")
+if depot_file is None:
+    decompose = st.selectbox("Large-day decomposition", ["off", "sweep", "kmeans", "grid"],
+                             help="Split many orders into spatial clusters solved in parallel")
+with st.expander("Solver settings"):
+    time_limit = st.number_input("Time limit (seconds, 0 = until converged)", min_value=0, value=0, step=5,
+                                 help="With delivery windows, 0 stops after 30 seconds at the latest")
+    solution_limit = st.number_input("Solution limit (0 = none)", min_value=0, value=0, step=10)
+    metaheuristic = st.selectbox("Local search", list(METAHEURISTICS))
+    portfolio = st.checkbox("Multi-start portfolio", help="Solve with several first-solution strategies "
+                            "in parallel (one per CPU core) and keep the cheapest routes")
+search = SearchOptions(time_limit or None, solution_limit or None, metaheuristic)
+resolve = st.button("🔄 Re-solve", help="Ignore cached results and solve again")
 
 #------------------------------------------------------------------------------
 
-if order_file and location_file:
-    order_df = pd.read_excel(order_file)
-    location_df = pd.read_excel(location_file)
-    merged_df = pd.merge(order_df, location_df, on='Order No', how='inner')
-    merged_df = merged_df.drop_duplicates(subset=['Order No', 'LAT', 'LON'])
-
-
-#----------------------------------------------------------------------------------------
-    
-    # ✅ Map Picking Zone code → readable name
-    zone_map = {
-        'AM': 'Ambient', 'AS': 'Ambient', 'AH': 'Ambient',
-        'VM': 'VM+01 C',
-        '20F': '20 C',
-        '01F': 'Frozen', 'FZ': 'Frozen'
-    }
-    if 'Picking Zone' in merged_df.columns:
-        merged_df['Picking Zone'] = merged_df['Picking Zone'].map(zone_map).fillna(merged_df['Picking Zone'])
-
-        # ✅ เพิ่มตรงนี้เพื่อแยกเป็น column True/False
-        zone_types = ['Ambient', 'VM+01 C', '20 C', 'Frozen']
-        for zone in zone_types:
-            merged_df[zone] = merged_df['Picking Zone'] == zone
-    
-    depot = (13.737469640166223, 100.63594745151381)
-    
-#----------------------------------------------------------------------------------------
-    
-    merged_df['order_datetime'] = pd.to_datetime(
-        merged_df['Order Date'].astype(str) + ' ' + merged_df['Order Time'].astype(str),
-        format='%d/%m/%Y %H:%M:%S', errors='coerce'
-    )
-    merged_df['distance_km'] = merged_df.apply(
-        lambda row: geodesic((row['LAT'], row['LON']), depot).km, axis=1
-    )
-    merged_df['zone'] = merged_df['distance_km'].apply(lambda d: 'sameday' if d <= 5 else 'nextday')
-    merged_df['delivery_deadline'] = merged_df.apply(
-        lambda row: row['order_datetime'] + timedelta(hours=3) if row['zone'] == 'sameday' else pd.NaT,
-        axis=1
-    )
+depot = DEFAULT_DEPOT  # the DC, unless a depot table is uploaded
 
 #------------------------------------------------------------------------------
 
-    df_zone = merged_df[merged_df['zone'] == 'sameday'].copy().reset_index(drop=True)
-    locations = [depot] + list(zip(df_zone['LAT'], df_zone['LON']))
-    distance_matrix = [[geodesic(a, b).km for b in locations] for a in locations]
+if order_file and location_file and not depot_file:
+    # ✅ Fleet sizing: solve a range of driver counts in parallel, keep the fewest that works
+    with st.expander("🚚 Fleet sizing (find the fewest drivers)"):
+        col1, col2 = st.columns(2)
+        with col1:
+            sweep_min = st.number_input("Fewest drivers to try", min_value=1, value=1, step=1)
+        with col2:
+            sweep_max = st.number_input("Most drivers to try", min_value=1, value=10, step=1)
+        sweep_drops = st.multiselect("Max drops per driver to try",
+                                     list(range(1, max(10, max_drops_per_driver) + 1)),
+                                     default=[max_drops_per_driver])
+        time_budget = st.number_input("Time budget (seconds)", min_value=1, value=30, step=5)
+        if st.button("Run fleet sweep"):
+            with st.spinner("Solving every fleet size..."):
+                fleet = get_plan_cache().sweep_fleet(order_file, location_file, depot,
+                                                     range(sweep_min, sweep_max + 1),
+                                                     sweep_drops or [max_drops_per_driver], search=search,
+                                                     time_budget_s=time_budget,
+                                                     service_time_s=service_min * 60)
+            st.dataframe(fleet.table)
+            best = fleet.smallest()
+            if best is None:
+                st.warning("No feasible fleet in this range: try more drivers, more drops or a longer budget.")
+            else:
+                st.success(f"✅ Smallest feasible fleet: {best['Drivers used']} drivers × "
+                           f"{best['Max Drops']} drops ({best['Distance (km)']:.1f} km)")
 
-    manager = pywrapcp.RoutingIndexManager(len(locations), num_drivers, 0)
-    routing = pywrapcp.RoutingModel(manager)
-    
 #------------------------------------------------------------------------------
-    
-    def distance_callback(from_index, to_index):
-        f = manager.IndexToNode(from_index)
-        t = manager.IndexToNode(to_index)
-        return int(distance_matrix[f][t] * 1000)
-
-    transit_cb_idx = routing.RegisterTransitCallback(distance_callback)
-    routing.SetArcCostEvaluatorOfAllVehicles(transit_cb_idx)
-
-    # ✅ Add Distance dimension to limit each route to 5km (5000 meters)
-    distance_dimension_name = "Distance"
-    routing.AddDimension(
-        transit_cb_idx,
-        0,        # slack
-        10000,     # max 5,000 meters per route
-        True,     # start from 0
-        distance_dimension_name
-    )
-    
-    # (Optional) เข้าถึง object เพื่อ debug หรือดูค่าระยะในแต่ละ vehicle
-    distance_dimension = routing.GetDimensionOrDie(distance_dimension_name)
-    
-#------------------------------------------------------------------------------
-    
-    def demand_callback(from_index):
-        from_node = manager.IndexToNode(from_index)
-        return 0 if from_node == 0 else 1
-
-    demand_cb_idx = routing.RegisterUnaryTransitCallback(demand_callback)
-    routing.AddDimensionWithVehicleCapacity(
-        demand_cb_idx,
-        0,
-        [max_drops_per_driver] * num_drivers,
-        True,
-        "DropCount"
-    )
-
-    for vehicle_id in range(1, num_drivers):
-        routing.SetFixedCostOfVehicle(1000 * vehicle_id, vehicle_id)
-
-    search_params = pywrapcp.DefaultRoutingSearchParameters()
-    search_params.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
-
-    total_orders = len(df_zone)
-    max_capacity = num_drivers * max_drops_per_driver
-
-    if total_orders > max_capacity:
-        st.error(f"❌ Orders ({total_orders}) exceed driver capacity ({max_capacity}).")
-    else:
-        solution = routing.SolveWithParameters(search_params)
-        if not solution:
-            st.error("❌ No routing solution found.")
-        else:
-            driver_results = []
-            merged_df['Driver'] = None
-            merged_df['Drop no.'] = None
-            speed_kmph = 30
-
-            for vehicle_id in range(num_drivers):
-                index = routing.Start(vehicle_id)
-                route_nodes = []
-
-                while not routing.IsEnd(index):
-                    node = manager.IndexToNode(index)
-                    if node != 0:
-                        route_nodes.append(node)
-                    index = solution.Value(routing.NextVar(index))
-
-                if not route_nodes:
-                    driver_results.append((f"Driver {vehicle_id + 1}", []))
-                    continue
 
-                base_time = df_zone.iloc[route_nodes[0] - 1]['order_datetime']
-                cumulative_time = timedelta()
-                vehicle_eta = []
-
-                index = routing.Start(vehicle_id)
-                current_node = manager.IndexToNode(index)
-
-                while not routing.IsEnd(index):
-                    next_index = solution.Value(routing.NextVar(index))
-                    next_node = manager.IndexToNode(next_index)
-
-                    if next_node == 0 or routing.IsEnd(next_index):
-                        break
-
-                    dist = distance_matrix[current_node][next_node]
-                    travel_time = timedelta(hours=dist / speed_kmph)
-                    cumulative_time += travel_time
-                    eta = (base_time + cumulative_time).strftime("%H:%M")
+# ✅ Stage timings of this rerun, shown in the Performance panel
+perf = MemoryReport(trace=False)
+
+if order_file and location_file and depot_file:
+    # ✅ Multi-depot: every depot's routes are solved in parallel, counts default to the inputs above
+    with st.spinner("Planning routes for every depot..."):
+        try:
+            result = get_plan_cache().plan_depots(order_file, location_file, depot_file, num_drivers,
+                                                  max_drops_per_driver, force=resolve, search=search,
+                                                  service_time_s=service_min * 60,
+                                                  allow_unassigned=allow_unassigned, memory=perf)
+        except PlanningError as exc:
+            st.error(f"❌ {exc}")
+            st.stop()
+
+elif order_file and location_file:
+    progress = st.empty()
+
+    def show_incumbent(incumbent):
+        # ✅ Stream each improved solution while the solver is still running
+        progress.caption(f"⏱️ {incumbent.seconds:.1f}s · solution {incumbent.solution_no} · "
+                         f"cost {incumbent.cost:,} · {incumbent.routes} routes"
+                         + (f" · {incumbent.late} late" if incumbent.late else ""))
+
+    try:
+        if decompose == "off":
+            # ✅ Solve in a background process: the page stays live and reruns reattach to the same job
+            job = get_plan_cache().submit(order_file, location_file, depot, num_drivers,
+                                          max_drops_per_driver, force=resolve, search=search,
+                                          service_time_s=service_min * 60, portfolio=portfolio or None,
+                                          allow_unassigned=allow_unassigned, memory=perf)
+            previous = st.session_state.get("plan_job")
+            if previous is not None and previous is not job and not previous.done:
+                previous.close()  # uploads or parameters changed mid-solve
+            st.session_state["plan_job"] = job
+            if not job.poll().done:
+                best = job.best
+                st.info(f"⏳ Solving for {job.elapsed:.0f}s"
+                        + (f" · solution {best.solution_no} · cost {best.cost:,} · {best.routes} routes"
+                           + (f" · {best.late} late" if best.late else "")
+                           if best is not None else " · no solution yet"))
+                if st.button("⏹️ Stop and keep the best routes so far"):
+                    job.cancel()
+                time.sleep(0.5)
+                st.rerun()
+            result = job.result(memory=perf)
+            if job.cancelled:
+                st.caption(f"⏹️ Stopped after {job.elapsed:.0f}s: these are the best routes found so far.")
+        else:
+            with st.spinner("Planning routes..."):
+                result = get_plan_cache().plan(order_file, location_file, depot, num_drivers,
+                                               max_drops_per_driver, force=resolve, decompose=decompose,
+                                               search=search, on_solution=show_incumbent,
+                                               service_time_s=service_min * 60,
+                                               allow_unassigned=allow_unassigned, memory=perf)
+    except PlanningError as exc:
+        st.error(f"❌ {exc}")
+        st.stop()
+
+    # ✅ Late orders: keep this plan and its matrix, insert only the new orders
+    replan = st.session_state.get("replan")
+    if replan is not None and replan[0] is not result:
+        replan = None  # uploads or parameters changed since the last insert
+
+    with st.expander("➕ Late orders (incremental re-plan)"):
+        late_order_file = st.file_uploader("Upload late OrderList.xlsx", type=UPLOAD_TYPES, key="late_order")
+        late_location_file = st.file_uploader("Upload late OrderLocation.xlsx", type=UPLOAD_TYPES, key="late_location")
+        current = replan[1].result if replan else result
+        routed = current.orders.loc[current.orders['Driver'].notna(), 'Order No'].tolist()
+        dispatched = st.multiselect("Already dispatched orders (kept in place)", routed)
+        insert_late = st.button("Insert late orders")
+
+    if insert_late and late_order_file and late_location_file:
+        planner = replan[1] if replan else get_plan_cache().replanner(
+            result, order_file, location_file, num_drivers, max_drops_per_driver, search=search,
+            service_time_s=service_min * 60, allow_unassigned=allow_unassigned)
+        planner.mark_dispatched(dispatched)
+        try:
+            planner.add_orders(read_orders(late_order_file), read_locations(late_location_file),
+                               on_solution=show_incumbent)
+        except PlanningError as exc:
+            st.error(f"❌ {exc}")
+        replan = (result, planner)
+        st.session_state["replan"] = replan
+    if replan is not None:
+        result = replan[1].result
 
-                    order_no = df_zone.iloc[next_node - 1]['Order No']
-                    merged_df.loc[merged_df['Order No'] == order_no, 'ETA'] = eta
-                    merged_df.loc[merged_df['Order No'] == order_no, 'Driver'] = f"Driver {vehicle_id + 1}"
-                    merged_df.loc[merged_df['Order No'] == order_no, 'Drop no.'] = len(vehicle_eta) + 1
-                    vehicle_eta.append((order_no, eta))
+if order_file and location_file:
+    merged_df = result.orders
 
-                    index = next_index
-                    current_node = next_node
+#------------------------------------------------------------------------------
 
-                driver_results.append((f"Driver {vehicle_id + 1}", vehicle_eta))
+    # คำนวณจำนวนลูกค้าในแต่ละโซน
+    zone_counts = result.zone_counts()
+
+    st.markdown(f"""
+    📦 **Customer Zone Summary**  
+    - Sameday: {zone_counts.get('sameday', 0)} customers  
+    - Nextday: {zone_counts.get('nextday', 0)} customers
+    """)
+
+    # ✅ Partial plan: orders left out are listed with the reason
+    unassigned = result.unassigned()
+    if len(unassigned):
+        st.warning(f"⚠️ {len(unassigned)} sameday orders could not be assigned to a driver")
+        st.dataframe(unassigned)
+    late = result.late()
+    if len(late):
+        st.warning(f"⚠️ {len(late)} orders will be delivered late: the search was stopped "
+                   "before it met every deadline")
+        st.dataframe(late)
+
+    if not depot_file and result.portfolio is not None:
+        winner = result.portfolio[result.portfolio['Best']].iloc[0]
+        with st.expander(f"🏁 Multi-start: best of {len(result.portfolio)} runs was "
+                         f"{winner['First solution']} + {winner['Local search']}"):
+            st.dataframe(result.portfolio)
 
 #------------------------------------------------------------------------------
 
-            # คำนวณจำนวนลูกค้าในแต่ละโซน
-            zone_counts = merged_df['zone'].value_counts().to_dict()
-                            
-            # เตรียมข้อความแสดงผล
-            sameday_count = zone_counts.get('sameday', 0)
-            nextday_count = zone_counts.get('nextday', 0)
-                            
-            st.markdown(f"""
-            📦 **Customer Zone Summary**  
-            - Sameday: {zone_counts.get('sameday', 0)} customers  
-            - Nextday: {zone_counts.get('nextday', 0)} customers
-            """)
+    # Map visualization 1 (one GeoJSON layer, clustered on very large days)
+    with track(perf, "customer map"):
+        # ✅ folium loads on the first map drawn, not at app start (it is slow to import)
+        from streamlit_folium import st_folium
+        from dispatch_planner.maps import customer_map, depots_customer_map, depots_route_map, route_map
+
+        m = (depots_customer_map(result, control_scale=True) if depot_file
+             else customer_map(merged_df, depot, control_scale=True))
+        st_folium(m, width=1600, height=900, returned_objects=[], feature_group_to_add=None, zoom=13)
 
 #------------------------------------------------------------------------------
 
-            # Map visualization 1
-            m = folium.Map(location=depot, zoom_start=12, control_scale=True)
-            color_map = {'sameday': 'green', 'nextday': 'red'}
-            
-            # วาดจุดศูนย์กลาง
-            folium.Marker(location=depot, popup='Depot', icon=folium.Icon(color='blue')).add_to(m)
-            
-            # วาดลูกค้า
-            for _, row in merged_df.iterrows():
-                folium.CircleMarker(
-                    location=(row['LAT'], row['LON']),
-                    radius=5,
-                    color=color_map[row['zone']],
-                    fill=True,
-                    popup=f"Customer: {row['Order No']} | {row['zone']} | {row['distance_km']:.2f} km"
-                ).add_to(m)
-            
-            # เพิ่มวงรัศมี 5 กม. (เส้นขอบโซน sameday)
-            folium.Circle(location=depot, radius=5000, color='gray', fill=False).add_to(m)
-            st_folium(m, width=1600, height=900, returned_objects=[], feature_group_to_add=None, zoom=13)
+    summary_df = result.summary()
+    st.subheader("Routing Summary")
+    st.dataframe(summary_df)
+
+    # ✅ Export: summary, route stats and one sheet per driver, written only when clicked
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="⬇️ Download route plan (.xlsx)",
+            data=partial(xlsx_bytes, result),
+            file_name="route_plan.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+    with col2:
+        st.download_button(
+            label="⬇️ Download routing summary (.csv)",
+            data=partial(csv_bytes, result),
+            file_name="route_plan.csv",
+            mime="text/csv"
+        )
 
 #------------------------------------------------------------------------------
-  
-            summary_df = merged_df[[
-                'Order No', 'LAT', 'LON', 'distance_km', 'zone',
-                'order_datetime', 'delivery_deadline', 'Driver', 'Drop no.', 'ETA',
-                'Picking Zone', 'Ambient', 'VM+01 C', '20 C', 'Frozen'
-            ]]
-            st.subheader("Routing Summary")
-            st.dataframe(summary_df)
 
-#------------------------------------------------------------------------------
-            
-            # Map visualization 2
-            st.subheader("Route Map")
-            route_map = folium.Map(location=depot, zoom_start=12,  control_scale=True)
-            colors = ['red', 'blue', 'green', 'purple', 'orange', 'darkred']
-            folium.Marker(depot, popup='Depot', icon=folium.Icon(color='black')).add_to(route_map)
-
-            for vehicle_id in range(num_drivers):
-                index = routing.Start(vehicle_id)
-                route_coords = []
-                while not routing.IsEnd(index):
-                    node = manager.IndexToNode(index)
-                    if node == 0:
-                        route_coords.append(depot)
-                    else:
-                        lat, lon = df_zone.iloc[node - 1][['LAT', 'LON']]
-                        route_coords.append((lat, lon))
-                    index = solution.Value(routing.NextVar(index))
-                route_coords.append(depot)
-
-                folium.PolyLine(route_coords, color=colors[vehicle_id % len(colors)],
-                                weight=5, opacity=0.8, popup=f"Driver {vehicle_id + 1}").add_to(route_map)
-
-                for i, coord in enumerate(route_coords[1:-1], start=1):
-                    folium.Marker(coord,
-                                  icon=folium.Icon(color=colors[vehicle_id % len(colors)], icon='truck', prefix='fa'),
-                                  popup=f"Driver {vehicle_id + 1} - Stop {i}").add_to(route_map)
-
-            st_folium(route_map, width=1600, height=900, returned_objects=[], feature_group_to_add=None, zoom=13)
+    # Map visualization 2 (one polyline feature per driver)
+    st.subheader("Route Map")
+    with track(perf, "route map"):
+        route_fmap = (depots_route_map(result, control_scale=True) if depot_file
+                      else route_map(result.routes, depot, control_scale=True))
+        st_folium(route_fmap, width=1600, height=900, returned_objects=[], feature_group_to_add=None, zoom=13)
 
 #-------------------------------------------------------------------------
 
+    # ✅ Where the time went: stage timings, matrix size and solver statistics
+    with st.expander(f"⏱️ Performance ({perf.total_seconds():.2f} s)"):
+        st.dataframe(perf.to_frame()[['Stage', 'Seconds', 'Max RSS (MiB)']])
+        st.json(perf.notes)
@@ -0,0 +1,89 @@
+"""Route-result assembly: per-stop ``merged_df.loc`` scans vs one indexed join.
+
+    python benchmarks/bench_assembly.py --orders 5000 --drivers 250
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dispatch_planner.engine import assemble_result  # noqa: E402
+from dispatch_planner.routes import Routes  # noqa: E402
+
+
+def legacy_assemble(merged_df, df_zone, distance_matrix, node_routes, speed_kmph=30):
+    """The original app loop: three full-column scans per stop."""
+    merged_df = merged_df.copy()
+    merged_df['Driver'] = None
+    merged_df['Drop no.'] = None
+    for vehicle_id, route_nodes in enumerate(node_routes):
+        if not route_nodes:
+            continue
+        base_time = df_zone.iloc[route_nodes[0] - 1]['order_datetime']
+        cumulative_time = timedelta()
+        current_node = 0
+        for drop_no, next_node in enumerate(route_nodes, start=1):
+            dist = distance_matrix[current_node, next_node] / 1000
+            cumulative_time += timedelta(hours=dist / speed_kmph)
+            eta = (base_time + cumulative_time).strftime("%H:%M")
+            order_no = df_zone.iloc[next_node - 1]['Order No']
+            merged_df.loc[merged_df['Order No'] == order_no, 'ETA'] = eta
+            merged_df.loc[merged_df['Order No'] == order_no, 'Driver'] = f"Driver {vehicle_id + 1}"
+            merged_df.loc[merged_df['Order No'] == order_no, 'Drop no.'] = drop_no
+            current_node = next_node
+    return merged_df
+
+
+def make_inputs(num_orders, num_drivers, seed=0):
+    rng = np.random.default_rng(seed)
+    df_zone = pd.DataFrame({
+        'Order No': [f"SO{i:07d}" for i in range(num_orders)],
+        'LAT': 13.7374 + rng.normal(0, 0.02, num_orders),
+        'LON': 100.6359 + rng.normal(0, 0.02, num_orders),
+        'order_datetime': pd.Timestamp("2026-01-05 08:00")
+                          + pd.to_timedelta(rng.integers(0, 36000, num_orders), unit='s'),
+    })
+    n = num_orders + 1
+    distance_matrix = rng.integers(100, 3000, size=(n, n), dtype=np.int32)
+    nodes = rng.permutation(np.arange(1, n))
+    node_routes = [part.tolist() for part in np.array_split(nodes, num_drivers)]
+    return df_zone.copy(), df_zone, distance_matrix, node_routes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--drivers", type=int, default=250)
+    parser.add_argument("--skip-legacy-above", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    print(f"{'orders':>8} {'legacy s':>10} {'columnar s':>11} {'speedup':>8}")
+    for num_orders in args.orders:
+        merged_df, df_zone, matrix, node_routes = make_inputs(num_orders, args.drivers)
+
+        t0 = time.perf_counter()
+        routes = Routes.from_node_lists(node_routes, matrix)
+        result = assemble_result(merged_df, df_zone, routes)
+        new_s = time.perf_counter() - t0
+
+        if num_orders > args.skip_legacy_above:
+            print(f"{num_orders:>8} {'-':>10} {new_s:>11.3f} {'-':>8}")
+            continue
+        t0 = time.perf_counter()
+        legacy = legacy_assemble(merged_df, df_zone, matrix, node_routes)
+        old_s = time.perf_counter() - t0
+
+        cols = ['Driver', 'Drop no.', 'ETA']
+        assert (legacy[cols].astype(str).values == result.orders[cols].astype(str).values).all()
+        print(f"{num_orders:>8} {old_s:>10.3f} {new_s:>11.3f} {old_s / new_s:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Decomposed vs monolithic VRP: route quality and wall time.
+
+    python benchmarks/bench_decompose.py --orders 200 600 --max-drops 5
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dispatch_planner.decompose import DECOMPOSE_METHODS, solve_decomposed  # noqa: E402
+from dispatch_planner.engine import build_matrix  # noqa: E402
+from dispatch_planner.preprocess import DEFAULT_DEPOT  # noqa: E402
+from dispatch_planner.routing import solve_routes  # noqa: E402
+
+
+def make_zone(num_orders, radius_km=2.0, seed=0):
+    """Uniform orders in a disk around the depot."""
+    rng = np.random.default_rng(seed)
+    r = radius_km * np.sqrt(rng.random(num_orders))
+    theta = rng.random(num_orders) * 2 * np.pi
+    lat = DEFAULT_DEPOT[0] + r * np.sin(theta) / 111.32
+    lon = DEFAULT_DEPOT[1] + r * np.cos(theta) / (111.32 * math.cos(math.radians(DEFAULT_DEPOT[0])))
+    return pd.DataFrame({'Order No': [f"SO{i:07d}" for i in range(num_orders)], 'LAT': lat, 'LON': lon})
+
+
+def describe(routes, seconds):
+    return {
+        'total_km': routes.route_distance_m.sum() / 1000,
+        'drivers_used': int((routes.lengths > 0).sum()),
+        'seconds': seconds,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, nargs="+", default=[200, 600])
+    parser.add_argument("--max-drops", type=int, default=5)
+    parser.add_argument("--spare-drivers", type=float, default=0.25,
+                        help="extra drivers over the minimum, as a fraction")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--skip-monolithic-above", type=int, default=1500)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for num_orders in args.orders:
+        df_zone = make_zone(num_orders)
+        num_drivers = math.ceil(num_orders / args.max_drops * (1 + args.spare_drivers))
+
+        if num_orders <= args.skip_monolithic_above:
+            t0 = time.perf_counter()
+            routes = solve_routes(build_matrix(df_zone, DEFAULT_DEPOT), num_drivers, args.max_drops)
+            mono = describe(routes, time.perf_counter() - t0)
+            rows.append({'orders': num_orders, 'mode': 'monolithic', **mono})
+        else:
+            mono = None
+
+        for method in DECOMPOSE_METHODS:
+            t0 = time.perf_counter()
+            routes = solve_decomposed(df_zone, DEFAULT_DEPOT, num_drivers, args.max_drops, method,
+                                      workers=args.workers)
+            res = describe(routes, time.perf_counter() - t0)
+            if mono:
+                res['km_vs_monolithic'] = f"{res['total_km'] / mono['total_km'] - 1:+.1%}"
+            rows.append({'orders': num_orders, 'mode': method, **res})
+
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
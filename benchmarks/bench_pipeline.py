@@ -0,0 +1,219 @@
+"""End-to-end planning pipeline on synthetic Bangkok days: time, memory and cost per stage.
+
+    python benchmarks/bench_pipeline.py --orders 50 500 2000 10000 --output pipeline.json
+
+Every size gets a seeded OrderList / OrderLocation pair around the depot
+(:func:`make_day`), which is planned stage by stage as the apps do: ingest
+and merge, depot distance and zoning, distance matrix, model build, solve,
+result assembly and folium rendering. Days above ``--decompose-above``
+orders are solved with the sweep decomposition, where cluster matrices and
+models are built inside the solve stage. Solves run with
+``allow_unassigned``, so an over-tight day still reports its cost.
+
+Each stage's wall time and the process high-water mark (max RSS) after it
+are written to the JSON report. ``--trace-memory`` adds tracemalloc peaks
+per stage, which slows the pandas stages down.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ortools  # noqa: E402
+
+from dispatch_planner.decompose import solve_decomposed  # noqa: E402
+from dispatch_planner.engine import (  # noqa: E402
+    SAMEDAY_COLUMNS,
+    assemble_result,
+    build_matrix,
+    build_time_windows,
+)
+from dispatch_planner.ingest import merge_orders, read_locations, read_orders  # noqa: E402
+from dispatch_planner.maps import customer_map, route_map  # noqa: E402
+from dispatch_planner.memory import MemoryReport, max_rss_bytes, track  # noqa: E402
+from dispatch_planner.preprocess import DEFAULT_DEPOT, prepare_orders  # noqa: E402
+from dispatch_planner.routes import Routes  # noqa: E402
+from dispatch_planner.routing import SearchOptions, build_routing_model, precheck  # noqa: E402
+
+PICKING_ZONES = ['AM', 'AS', 'AH', 'VM', '20F', '01F', 'FZ']
+MIB = 1024 * 1024
+
+
+def make_day(num_orders, depot=DEFAULT_DEPOT, radius_km=6.0, day="2026-01-05", seed=0):
+    """Synthetic ``(orders, locations)`` frames shaped like the OrderList / OrderLocation reads.
+
+    Orders are uniform in a disk of ``radius_km`` around ``depot`` (so about
+    70% fall inside the default 5 km sameday radius) and placed between
+    08:00 and 18:00 on ``day``.
+    """
+    rng = np.random.default_rng(seed)
+    order_no = [f"SO{i:07d}" for i in range(num_orders)]
+    r = radius_km * np.sqrt(rng.random(num_orders))
+    theta = rng.random(num_orders) * 2 * np.pi
+    lat = depot[0] + r * np.sin(theta) / 111.32
+    lon = depot[1] + r * np.cos(theta) / (111.32 * math.cos(math.radians(depot[0])))
+    placed = pd.Timestamp(f"{day} 08:00") + pd.to_timedelta(np.sort(rng.integers(0, 36000, num_orders)),
+                                                          unit='s')
+    orders = pd.DataFrame({
+        'Order No': order_no,
+        'Order Date': placed.strftime("%d/%m/%Y"),
+        'Order Time': placed.strftime("%H:%M:%S"),
+        'Picking Zone': rng.choice(PICKING_ZONES, num_orders),
+    })
+    locations = pd.DataFrame({
+        'Order No': order_no,
+        'LAT': lat.astype('float32'),
+        'LON': lon.astype('float32'),
+    })
+    return orders, locations
+
+
+@contextmanager
+def stage(report, name, memory):
+    """Record ``name``'s wall time and max RSS in ``report['stages']``."""
+    started = time.perf_counter()
+    with track(memory, name):
+        yield
+    rss = max_rss_bytes()
+    report['stages'][name] = {
+        'seconds': round(time.perf_counter() - started, 4),
+        'max_rss_mib': None if rss is None else round(rss / MIB, 1),
+    }
+
+
+def run_day(num_orders, args, memory=None, workdir=None):
+    orders, locations = make_day(num_orders, seed=args.seed)
+    depot = DEFAULT_DEPOT
+    search = SearchOptions(time_limit_s=args.time_limit)
+    report = {'orders': num_orders, 'stages': {}}
+    if workdir is not None:
+        order_path = os.path.join(workdir, f"orders{num_orders}.{args.format}")
+        location_path = os.path.join(workdir, f"locations{num_orders}.{args.format}")
+        for df, path in ((orders, order_path), (locations, location_path)):
+            if args.format == "parquet":
+                df.to_parquet(path, index=False)
+            elif args.format == "csv":
+                df.to_csv(path, index=False)
+            else:
+                df.to_excel(path, index=False)
+
+    started = time.perf_counter()
+    with stage(report, "ingest", memory):
+        if workdir is not None:
+            orders, locations = read_orders(order_path), read_locations(location_path)
+        merged_df = merge_orders(orders, locations)
+    with stage(report, "zoning", memory):
+        merged_df = prepare_orders(merged_df, depot)
+        columns = [c for c in SAMEDAY_COLUMNS if c in merged_df.columns]
+        df_zone = merged_df.loc[merged_df['zone'] == 'sameday', columns].reset_index(drop=True)
+
+    num_sameday = len(df_zone)
+    num_drivers = max(1, math.ceil(num_sameday / args.max_drops * (1 + args.spare_drivers)))
+    decompose = num_sameday > args.decompose_above
+    report.update(sameday=num_sameday, drivers=num_drivers, max_drops=args.max_drops,
+                  mode="sweep" if decompose else "monolithic")
+
+    if decompose:
+        time_windows = build_time_windows(df_zone)
+        with stage(report, "solve", memory):
+            routes = solve_decomposed(df_zone, depot, num_drivers, args.max_drops, "sweep",
+                                      workers=args.workers, options=search, time_windows=time_windows,
+                                      allow_unassigned=True)
+    else:
+        with stage(report, "matrix", memory):
+            distance_matrix = build_matrix(df_zone, depot)
+        time_windows = build_time_windows(df_zone)
+        with stage(report, "model", memory):
+            unreachable = precheck(distance_matrix, time_windows)
+            manager, routing = build_routing_model(distance_matrix, num_drivers, args.max_drops,
+                                                   time_windows=time_windows, optional=True,
+                                                   excluded=unreachable)
+        with stage(report, "solve", memory):
+            # solve_routes' search, on the model timed above
+            solution = routing.SolveWithParameters(search.parameters(bounded=True))
+            routes = Routes.from_solution(manager, routing, solution, distance_matrix, time_windows)
+            routes.set_unassigned(num_sameday, unreachable)
+            routes.cost = solution.ObjectiveValue()
+
+    with stage(report, "assemble", memory):
+        result = assemble_result(merged_df, df_zone, routes, depot)
+    if not args.skip_maps:
+        with stage(report, "render", memory):
+            for fmap in (customer_map(result.orders, depot), route_map(result.routes, depot)):
+                fmap.get_root().render()
+    total_s = time.perf_counter() - started
+
+    report.update(
+        total_seconds=round(total_s, 3),
+        orders_per_second=round(num_orders / total_s, 1),
+        max_rss_mib=round(max_rss_bytes() / MIB, 1) if max_rss_bytes() is not None else None,
+        cost=routes.cost,
+        distance_km=round(float(routes.route_distance_m.sum()) / 1000, 3),
+        drivers_used=int((routes.lengths > 0).sum()),
+        assigned=int(len(routes.nodes)),
+        unassigned=int(len(routes.unassigned)),
+    )
+    if memory is not None:
+        for row in memory.stages:
+            report['stages'][row.stage]['peak_mib'] = round(row.peak_bytes / MIB, 2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, nargs="+", default=[50, 200, 1000, 5000, 10000])
+    parser.add_argument("--max-drops", type=int, default=5)
+    parser.add_argument("--spare-drivers", type=float, default=0.25,
+                        help="extra drivers over the minimum, as a fraction")
+    parser.add_argument("--time-limit", type=float, default=10, help="seconds per solve (per cluster)")
+    parser.add_argument("--decompose-above", type=int, default=1000,
+                        help="solve days with more sameday orders than this with the sweep decomposition")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--format", choices=("parquet", "csv", "xlsx"),
+                        help="write each day to this format first and time reading it back")
+    parser.add_argument("--skip-maps", action="store_true", help="do not time folium rendering")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="add tracemalloc peaks per stage (slower)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_pipeline.json")
+    args = parser.parse_args(argv)
+
+    runs = []
+    with tempfile.TemporaryDirectory() if args.format else nullcontext() as workdir:
+        for num_orders in args.orders:
+            memory = MemoryReport() if args.trace_memory else None
+            run = run_day(num_orders, args, memory, workdir)
+            runs.append(run)
+            print(f"{num_orders:>6} orders  {run['mode']:>10}  {run['total_seconds']:>8.2f} s  "
+                  f"{run['orders_per_second']:>8.0f} orders/s  {run['distance_km']:>9.1f} km  "
+                  f"{run['unassigned']:>5} unassigned  "
+                  + "  ".join(f"{k} {v['seconds']:.2f}" for k, v in run['stages'].items()))
+
+    report = {
+        'benchmark': 'pipeline',
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__, 'ortools': ortools.__version__},
+        'settings': {k: v for k, v in vars(args).items() if k not in ('orders', 'output')},
+        'runs': runs,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Preprocessing: row-wise ``apply`` + geopy vs the column-wise pipeline.
+
+Also checks that both paths produce the same zones, deadlines and (to within
+a millimetre) the same depot distances.
+
+    python benchmarks/bench_preprocess.py --rows 1000 10000 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from geopy.distance import geodesic
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dispatch_planner.preprocess import DEFAULT_DEPOT, classify_zones  # noqa: E402
+
+
+def legacy_classify(merged_df, depot, sameday_radius_km=5):
+    """The original app code."""
+    merged_df['distance_km'] = merged_df.apply(
+        lambda row: geodesic((row['LAT'], row['LON']), depot).km, axis=1
+    )
+    merged_df['zone'] = merged_df['distance_km'].apply(
+        lambda d: 'sameday' if d <= sameday_radius_km else 'nextday'
+    )
+    merged_df['delivery_deadline'] = merged_df.apply(
+        lambda row: row['order_datetime'] + timedelta(hours=3) if row['zone'] == 'sameday' else pd.NaT,
+        axis=1
+    )
+    return merged_df
+
+
+def make_orders(num_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Order No': [f"SO{i:07d}" for i in range(num_rows)],
+        'LAT': DEFAULT_DEPOT[0] + rng.normal(0, 0.05, num_rows),
+        'LON': DEFAULT_DEPOT[1] + rng.normal(0, 0.05, num_rows),
+        'order_datetime': pd.Timestamp("2026-01-05 08:00")
+                          + pd.to_timedelta(rng.integers(0, 36000, num_rows), unit='s'),
+    })
+    df.loc[df.sample(frac=0.01, random_state=seed).index, 'order_datetime'] = pd.NaT
+    return df
+
+
+def check_equal(legacy, fast):
+    np.testing.assert_allclose(fast['distance_km'], legacy['distance_km'], rtol=0, atol=1e-6)
+    pd.testing.assert_series_equal(fast['zone'].astype(str), legacy['zone'].astype(str))
+    pd.testing.assert_series_equal(pd.to_datetime(fast['delivery_deadline']),
+                                   pd.to_datetime(legacy['delivery_deadline']), check_dtype=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>8} {'apply s':>9} {'vectorized s':>13} {'speedup':>8}")
+    for num_rows in args.rows:
+        orders = make_orders(num_rows)
+
+        t0 = time.perf_counter()
+        legacy = legacy_classify(orders.copy(), DEFAULT_DEPOT)
+        old_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fast = classify_zones(orders.copy(), DEFAULT_DEPOT)
+        new_s = time.perf_counter() - t0
+
+        check_equal(legacy, fast)
+        print(f"{num_rows:>8} {old_s:>9.3f} {new_s:>13.4f} {old_s / new_s:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
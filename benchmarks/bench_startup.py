@@ -0,0 +1,91 @@
+"""App start-up: cold and warm script runs of the three Streamlit apps.
+
+    python benchmarks/bench_startup.py --repeat 5 --output startup.json
+
+Every sample runs in a fresh interpreter that has already imported
+Streamlit, as a running server has. The first run of the app script (with
+Streamlit's ``AppTest``, no uploads) is the cold start: it pays for the
+imports and the cached resources. A second run of the same script is the
+warm start that every rerun pays. The report lists, per app, the median of
+both and which heavy modules the cold start loaded; the map and solver
+modules should only load once a plan is made.
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HEAVY_MODULES = ("ortools", "folium", "streamlit_folium", "xlsxwriter", "scipy", "openpyxl")
+
+
+def run_app(path):
+    """``{'cold_s', 'warm_s', 'loaded'}`` of one app, in this (fresh) process."""
+    from streamlit.testing.v1 import AppTest
+
+    sys.path.insert(0, ROOT)
+    app = AppTest.from_file(path, default_timeout=120)
+    started = time.perf_counter()
+    app.run()
+    cold_s = time.perf_counter() - started
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    started = time.perf_counter()
+    app.run()
+    warm_s = time.perf_counter() - started
+    errors = [e.value for e in app.exception]
+    return {'cold_s': cold_s, 'warm_s': warm_s, 'loaded': loaded, 'errors': errors}
+
+
+def sample(path):
+    out = subprocess.run([sys.executable, __file__, "--child", path], capture_output=True, text=True,
+                         check=True, cwd=ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", nargs="+", default=sorted(glob.glob(os.path.join(ROOT, "Dispatch_*.py"))))
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per app")
+    parser.add_argument("--output", default="bench_startup.json")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        print(json.dumps(run_app(args.child)))
+        return
+
+    apps = []
+    for path in args.apps:
+        samples = [sample(path) for _ in range(args.repeat)]
+        run = {
+            'app': os.path.basename(path),
+            'cold_seconds': round(statistics.median(s['cold_s'] for s in samples), 3),
+            'warm_seconds': round(statistics.median(s['warm_s'] for s in samples), 3),
+            'heavy_modules_at_start': samples[0]['loaded'],
+            'errors': samples[0]['errors'],
+        }
+        apps.append(run)
+        print(f"{run['app']:<42} cold {run['cold_seconds']:>6.2f} s  warm {run['warm_seconds']:>6.2f} s  "
+              f"loaded: {', '.join(run['heavy_modules_at_start']) or '-'}")
+
+    report = {
+        'benchmark': 'startup',
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'apps': apps,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Planning engine shared by the Dispatch Driver Planning apps."""
+
+from .cache import LRUCache, PlanCache, file_digest
+from .decompose import DECOMPOSE_METHODS, allocate_drivers, partition, solve_decomposed
+from .distance import (
+    DISTANCE_METHODS,
+    distance_block_m,
+    distance_matrix_km,
+    distance_matrix_m,
+    ellipsoidal_km,
+    extend_matrix_m,
+    haversine_km,
+    vincenty_km,
+)
+from .distance_store import DistanceStore
+from .engine import (
+    CapacityError,
+    NoSolutionError,
+    Incumbent,
+    PlanningError,
+    PlanResult,
+    SearchOptions,
+    TimeWindows,
+    assemble_result,
+    build_matrix,
+    build_time_matrix,
+    build_time_windows,
+    load_orders,
+    plan_routes,
+    precheck_orders,
+    solve_routes,
+)
+from .export import csv_bytes, write_csv, write_xlsx, xlsx_bytes
+from .fleet import FleetSweep, size_fleet, sweep_fleet
+from .incremental import IncrementalPlanner
+from .ingest import (
+    UPLOAD_TYPES,
+    convert_to_parquet,
+    merge_orders,
+    read_depots,
+    read_locations,
+    read_orders,
+    read_table,
+)
+from .jobs import SolveJob
+from .memory import MemoryReport
+from .multidepot import MultiDepotResult, assign_depots, plan_depots
+from .portfolio import DEFAULT_PORTFOLIO, solve_portfolio
+from .preprocess import DEFAULT_DEPOT, SAMEDAY_RADIUS_KM, ZONE_MAP, ZONE_TYPES, prepare_orders
+from .roads import RoadNetwork
+from .routes import Routes
+from .routing import (
+    FIRST_SOLUTIONS,
+    METAHEURISTICS,
+    SERVICE_TIME_S,
+    WINDOW_INSERTION,
+    build_routing_model,
+    cheapest_insertion,
+    insertion_routes,
+    precheck,
+)
+
+__all__ = [
+    "CapacityError",
+    "DECOMPOSE_METHODS",
+    "DEFAULT_DEPOT",
+    "DEFAULT_PORTFOLIO",
+    "DISTANCE_METHODS",
+    "DistanceStore",
+    "FIRST_SOLUTIONS",
+    "FleetSweep",
+    "Incumbent",
+    "IncrementalPlanner",
+    "LRUCache",
+    "METAHEURISTICS",
+    "MemoryReport",
+    "MultiDepotResult",
+    "NoSolutionError",
+    "PlanCache",
+    "PlanResult",
+    "PlanningError",
+    "RoadNetwork",
+    "Routes",
+    "SAMEDAY_RADIUS_KM",
+    "SERVICE_TIME_S",
+    "SearchOptions",
+    "SolveJob",
+    "TimeWindows",
+    "UPLOAD_TYPES",
+    "WINDOW_INSERTION",
+    "ZONE_MAP",
+    "ZONE_TYPES",
+    "allocate_drivers",
+    "assemble_result",
+    "assign_depots",
+    "build_matrix",
+    "build_routing_model",
+    "build_time_matrix",
+    "build_time_windows",
+    "cheapest_insertion",
+    "convert_to_parquet",
+    "csv_bytes",
+    "distance_block_m",
+    "distance_matrix_km",
+    "distance_matrix_m",
+    "ellipsoidal_km",
+    "extend_matrix_m",
+    "file_digest",
+    "haversine_km",
+    "insertion_routes",
+    "load_orders",
+    "merge_orders",
+    "partition",
+    "plan_depots",
+    "plan_routes",
+    "precheck",
+    "precheck_orders",
+    "prepare_orders",
+    "read_depots",
+    "read_locations",
+    "read_orders",
+    "read_table",
+    "size_fleet",
+    "solve_decomposed",
+    "solve_portfolio",
+    "solve_routes",
+    "sweep_fleet",
+    "vincenty_km",
+    "write_csv",
+    "write_xlsx",
+    "xlsx_bytes",
+]
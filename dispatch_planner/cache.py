@@ -0,0 +1,363 @@
+"""Content-hash keyed, bounded LRU cache around the planning stages.
+
+Streamlit reruns the whole script on every widget interaction. Keying each
+stage on a hash of the uploaded bytes plus the planning parameters means an
+unchanged input returns the previous result instead of re-reading the
+workbooks, rebuilding the matrix and re-solving the VRP.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+
+from .engine import (
+    SERVICE_TIME_S,
+    SPEED_KMPH,
+    PlanningError,
+    assemble_result,
+    build_matrix,
+    build_time_matrix,
+    build_time_windows,
+    check_orders,
+    load_orders,
+    node_points,
+    note_solve,
+    solve,
+)
+from .decompose import solve_decomposed
+from .fleet import sweep_fleet
+from .incremental import IncrementalPlanner
+from .ingest import read_depots, read_locations, read_orders
+from .jobs import SolveJob
+from .memory import note, track
+from .multidepot import plan_depots
+from .preprocess import DEFAULT_DEPOT, SAMEDAY_RADIUS_KM
+from .routing import DEFAULT_TIME_LIMIT_S, SearchOptions
+
+DEFAULT_MAXSIZE = 8
+
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used entry.
+
+    ``on_evict(value)``, if given, is called for every value that leaves the
+    cache: evicted, replaced under the same key, or cleared.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, on_evict=None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            old = self._data.get(key)
+            evicted = [old] if old is not None and old is not value else []
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[1])
+        self._evicted(evicted)
+
+    def clear(self):
+        with self._lock:
+            evicted = list(self._data.values())
+            self._data.clear()
+        self._evicted(evicted)
+
+    def _evicted(self, values):
+        # outside the lock: the hook may be slow (e.g. ending a process)
+        if self.on_evict is not None:
+            for value in values:
+                self.on_evict(value)
+
+
+def file_digest(src):
+    """sha256 of an upload (``getvalue()``), file-like object or path; None → None."""
+    if src is None:
+        return None
+    if hasattr(src, "getvalue"):
+        data = src.getvalue()
+    elif hasattr(src, "read"):
+        pos = src.tell()
+        data = src.read()
+        src.seek(pos)
+    else:
+        with open(os.fspath(src), "rb") as f:
+            data = f.read()
+    return hashlib.sha256(data).hexdigest()
+
+
+class PlanCache:
+    """Caches ingestion, distance matrix and solve results for :meth:`plan`.
+
+    Each stage has its own LRU so that e.g. changing ``num_drivers`` re-solves
+    but reuses the already parsed orders and matrix. A ``store``
+    (:class:`~dispatch_planner.distance_store.DistanceStore`) keeps distances
+    across sessions and days; a road ``network``
+    (:class:`~dispatch_planner.roads.RoadNetwork`) replaces straight-line
+    distances and ETAs.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, store=None, network=None):
+        self.store = store
+        self.network = network
+        self.frames = LRUCache(maxsize)
+        self.matrices = LRUCache(maxsize)
+        self.plans = LRUCache(maxsize)
+        self.jobs = LRUCache(maxsize, on_evict=SolveJob.close)  # nobody polls an evicted job
+
+    def clear(self):
+        self.frames.clear()
+        self.matrices.clear()
+        self.plans.clear()
+        self.jobs.clear()
+
+    @staticmethod
+    def _keys(order_file, location_file, depot, num_drivers, max_drops, sameday_radius_km, speed_kmph,
+              decompose, num_clusters, search, service_time_s, portfolio, allow_unassigned):
+        """``(frames_key, plan_key)`` of a :meth:`plan` call."""
+        frames_key = (file_digest(order_file), file_digest(location_file), depot, sameday_radius_km)
+        plan_key = frames_key + (int(num_drivers), int(max_drops), speed_kmph, decompose, num_clusters,
+                                search, int(service_time_s), portfolio, bool(allow_unassigned))
+        return frames_key, plan_key
+
+    def _frames(self, frames_key, order_file, location_file, depot, sameday_radius_km, force,
+                memory=None):
+        """Cached ``(merged_df, df_zone)`` of the uploads."""
+        frames = None if force else self.frames.get(frames_key)
+        if frames is None:
+            with track(memory, "read"):
+                order_df = read_orders(order_file) if order_file is not None else None
+                location_df = read_locations(location_file)
+            with track(memory, "preprocess"):
+                frames = load_orders(order_df, location_df, depot, sameday_radius_km)
+            self.frames.put(frames_key, frames)
+        return frames
+
+    def _matrices(self, frames_key, df_zone, depot, force, memory=None):
+        """Cached ``(distance_matrix, time_matrix)``; the time matrix is None without a network."""
+        cached = None if force else self.matrices.get(frames_key)
+        if cached is None:
+            with track(memory, "matrix"):
+                cached = (build_matrix(df_zone, depot, self.store, self.network),
+                          build_time_matrix(df_zone, depot, self.network))
+            self.matrices.put(frames_key, cached)
+        return cached
+
+    def plan(self, order_file, location_file, depot=DEFAULT_DEPOT, num_drivers=3, max_drops=2,
+             sameday_radius_km=SAMEDAY_RADIUS_KM, speed_kmph=SPEED_KMPH,
+             decompose=None, num_clusters=None, workers=None, search=None, on_solution=None,
+             service_time_s=SERVICE_TIME_S, portfolio=None, allow_unassigned=False, force=False,
+             memory=None):
+        """Cached equivalent of :func:`plan_routes` taking the raw uploads.
+
+        ``force=True`` recomputes every stage and replaces the cached entries
+        (the apps' "Re-solve" button). Planning failures are cached as well and
+        re-raised, so an infeasible input is not re-solved on every rerun.
+        ``on_solution`` only fires when the solver actually runs. ``memory``
+        (a :class:`~dispatch_planner.memory.MemoryReport`) only records the
+        stages that ran; a cached plan is noted as ``cache='plan'``.
+        """
+        depot = (float(depot[0]), float(depot[1]))
+        frames_key, plan_key = self._keys(order_file, location_file, depot, num_drivers, max_drops,
+                                          sameday_radius_km, speed_kmph, decompose, num_clusters, search,
+                                          service_time_s, portfolio, allow_unassigned)
+
+        if not force:
+            cached = self.plans.get(plan_key)
+            if isinstance(cached, PlanningError):
+                raise cached
+            if cached is not None:
+                note(memory, cache='plan')
+                note_solve(memory, cached.sameday, None, cached.routes)
+                return cached
+
+        merged_df, df_zone = self._frames(frames_key, order_file, location_file, depot,
+                                          sameday_radius_km, force, memory)
+
+        distance_matrix = None
+        try:
+            if decompose:
+                # clusters build their own small matrices, the full one is not needed
+                time_windows = build_time_windows(df_zone, speed_kmph, service_time_s)
+                with track(memory, "solve"):
+                    routes = solve_decomposed(df_zone, depot, num_drivers, max_drops, decompose,
+                                              num_clusters, workers, search, self.network, time_windows,
+                                              allow_unassigned)
+                runs = None
+            else:
+                distance_matrix, time_matrix = self._matrices(frames_key, df_zone, depot, force, memory)
+                time_windows = build_time_windows(df_zone, speed_kmph, service_time_s, time_matrix)
+                if not allow_unassigned:
+                    check_orders(df_zone, distance_matrix, time_windows)
+                with track(memory, "solve"):
+                    routes, runs = solve(distance_matrix, num_drivers, max_drops, search, on_solution,
+                                         time_windows, portfolio, node_points(df_zone, depot), workers,
+                                         allow_unassigned)
+        except PlanningError as exc:
+            self.plans.put(plan_key, exc)
+            raise
+        note_solve(memory, df_zone, distance_matrix, routes)
+        with track(memory, "assemble"):
+            result = assemble_result(merged_df, df_zone, routes, depot, speed_kmph)
+        result.portfolio = runs
+        self.plans.put(plan_key, result)
+        return result
+
+    def submit(self, order_file, location_file, depot=DEFAULT_DEPOT, num_drivers=3, max_drops=2,
+               sameday_radius_km=SAMEDAY_RADIUS_KM, speed_kmph=SPEED_KMPH, workers=None, search=None,
+               service_time_s=SERVICE_TIME_S, portfolio=None, allow_unassigned=False, force=False,
+               memory=None):
+        """:meth:`plan` (without decomposition) as a :class:`~dispatch_planner.jobs.SolveJob`.
+
+        Reading, the matrix and the order check run here; the solve runs in a
+        background process. Calling again with the same inputs returns the
+        same job, running or done, so a Streamlit rerun reattaches to it
+        instead of starting a second solve. ``job.result(memory)`` assembles
+        the :class:`PlanResult` and caches it like :meth:`plan` does; a
+        cached plan or planning failure comes back as an already done job.
+        ``force=True`` ends a running job for these inputs and starts over.
+        Without a time or solution limit in ``search``, the solve stops after
+        ``DEFAULT_TIME_LIMIT_S``; a job evicted from :attr:`jobs` is closed.
+        """
+        depot = (float(depot[0]), float(depot[1]))
+        frames_key, plan_key = self._keys(order_file, location_file, depot, num_drivers, max_drops,
+                                          sameday_radius_km, speed_kmph, None, None, search,
+                                          service_time_s, portfolio, allow_unassigned)
+        job = self.jobs.get(plan_key)
+        if job is not None and not force and not job.closed:
+            job.poll()
+            if not job.done or job.error is not None or job.finish is not None or job.cancelled:
+                return job  # running, failed, cut short, or not yet collected by the session
+        if job is not None:
+            job.close()
+        if not force:
+            cached = self.plans.get(plan_key)
+            if cached is not None:
+                note(memory, cache='plan')
+                if isinstance(cached, PlanningError):
+                    return SolveJob.completed(error=cached)
+                note_solve(memory, cached.sameday, None, cached.routes)
+                return SolveJob.completed(cached)
+
+        merged_df, df_zone = self._frames(frames_key, order_file, location_file, depot,
+                                          sameday_radius_km, force, memory)
+        distance_matrix, time_matrix = self._matrices(frames_key, df_zone, depot, force, memory)
+        time_windows = build_time_windows(df_zone, speed_kmph, service_time_s, time_matrix)
+        if not allow_unassigned:
+            try:
+                check_orders(df_zone, distance_matrix, time_windows)
+            except PlanningError as exc:
+                self.plans.put(plan_key, exc)
+                return SolveJob.completed(error=exc)
+
+        def finish(job, memory):
+            routes, runs = job.value
+            note(memory, solve_seconds=round(job.elapsed, 3), cancelled=job.cancelled)
+            note_solve(memory, df_zone, distance_matrix, routes)
+            with track(memory, "assemble"):
+                result = assemble_result(merged_df, df_zone, routes, depot, speed_kmph)
+            result.portfolio = runs
+            if not job.cancelled:  # a cut-short search is not the plan for these inputs
+                self.plans.put(plan_key, result)
+            return result
+
+        if search is None or (search.time_limit_s is None and search.solution_limit is None):
+            search = replace(search or SearchOptions(), time_limit_s=DEFAULT_TIME_LIMIT_S)
+        job = SolveJob(solve, distance_matrix, num_drivers, max_drops, search,
+                       time_windows=time_windows, portfolio=portfolio,
+                       points=node_points(df_zone, depot), workers=workers,
+                       allow_unassigned=allow_unassigned, stoppable=not portfolio)
+        job.finish = finish
+        self.jobs.put(plan_key, job)
+        return job
+
+    def replanner(self, result, order_file, location_file, num_drivers=3, max_drops=2,
+                  sameday_radius_km=SAMEDAY_RADIUS_KM, **kwargs):
+        """:class:`IncrementalPlanner` continuing ``result``, a plan of these uploads.
+
+        The matrices cached for the uploads and ``result.depot`` are reused, so
+        late orders only compute their own rows; if they were evicted,
+        :meth:`IncrementalPlanner.from_plan` rebuilds them. The planner uses
+        this cache's store and network; ``kwargs`` go to the planner.
+        """
+        frames_key = (file_digest(order_file), file_digest(location_file), result.depot, sameday_radius_km)
+        distance_matrix, time_matrix = self.matrices.get(frames_key, (None, None))
+        return IncrementalPlanner.from_plan(result, num_drivers, max_drops, distance_matrix, time_matrix,
+                                            sameday_radius_km=sameday_radius_km, store=self.store,
+                                            network=self.network, **kwargs)
+
+    def sweep_fleet(self, order_file, location_file, depot=DEFAULT_DEPOT, driver_counts=range(1, 11),
+                    drop_limits=(2,), sameday_radius_km=SAMEDAY_RADIUS_KM, speed_kmph=SPEED_KMPH,
+                    workers=None, search=None, time_budget_s=None, service_time_s=SERVICE_TIME_S,
+                    force=False):
+        """Cached :func:`~dispatch_planner.fleet.size_fleet` taking the raw uploads.
+
+        Reuses the parsed orders and matrix of :meth:`plan` for the same uploads.
+        """
+        depot = (float(depot[0]), float(depot[1]))
+        frames_key = (file_digest(order_file), file_digest(location_file), depot, sameday_radius_km)
+        sweep_key = frames_key + ("fleet", tuple(map(int, driver_counts)), tuple(map(int, drop_limits)),
+                                  speed_kmph, search, time_budget_s, int(service_time_s))
+        cached = None if force else self.plans.get(sweep_key)
+        if cached is not None:
+            return cached
+
+        merged_df, df_zone = self._frames(frames_key, order_file, location_file, depot,
+                                          sameday_radius_km, force)
+        distance_matrix, time_matrix = self._matrices(frames_key, df_zone, depot, force)
+        time_windows = build_time_windows(df_zone, speed_kmph, service_time_s, time_matrix)
+        sweep = sweep_fleet(distance_matrix, driver_counts, drop_limits, search, time_windows,
+                            workers, time_budget_s).assemble(merged_df, df_zone, depot, speed_kmph)
+        self.plans.put(sweep_key, sweep)
+        return sweep
+
+    def plan_depots(self, order_file, location_file, depot_file, num_drivers=3, max_drops=2,
+                    sameday_radius_km=SAMEDAY_RADIUS_KM, speed_kmph=SPEED_KMPH, workers=None,
+                    search=None, service_time_s=SERVICE_TIME_S, allow_unassigned=False, force=False,
+                    memory=None):
+        """Cached :func:`~dispatch_planner.multidepot.plan_depots` taking the raw uploads.
+
+        Only whole multi-depot plans are cached (failures included, as in :meth:`plan`).
+        """
+        plan_key = ("depots", file_digest(order_file), file_digest(location_file),
+                    file_digest(depot_file), int(num_drivers), int(max_drops), sameday_radius_km,
+                    speed_kmph, search, int(service_time_s), bool(allow_unassigned))
+        if not force:
+            cached = self.plans.get(plan_key)
+            if isinstance(cached, PlanningError):
+                raise cached
+            if cached is not None:
+                note(memory, cache='plan')
+                return cached
+
+        with track(memory, "read"):
+            order_df = read_orders(order_file) if order_file is not None else None
+            location_df, depot_df = read_locations(location_file), read_depots(depot_file)
+        try:
+            result = plan_depots(order_df, location_df, depot_df,
+                                 num_drivers, max_drops, sameday_radius_km, speed_kmph, workers,
+                                 search, memory=memory, store=self.store, network=self.network,
+                                 service_time_s=service_time_s, allow_unassigned=allow_unassigned)
+        except PlanningError as exc:
+            self.plans.put(plan_key, exc)
+            raise
+        self.plans.put(plan_key, result)
+        return result
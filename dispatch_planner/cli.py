@@ -0,0 +1,199 @@
+"""``dispatch-plan``: plan routes from the command line, no Streamlit needed.
+
+    python -m dispatch_planner --orders OrderList.xlsx --locations OrderLocation.xlsx \\
+        --drivers 3 --max-drops 2 --output route_plan.csv
+"""
+
+import argparse
+import logging
+import sys
+
+from .decompose import DECOMPOSE_METHODS
+from .distance_store import DistanceStore
+from .engine import PlanningError, plan_routes
+from .export import write_csv, write_xlsx
+from .fleet import size_fleet
+from .portfolio import DEFAULT_PORTFOLIO, SWEEP
+from .routing import FIRST_SOLUTIONS, METAHEURISTICS, WINDOW_INSERTION, SearchOptions
+from .ingest import read_depots, read_locations, read_orders
+from .memory import MemoryReport, logger, note, track
+from .multidepot import plan_depots
+from .roads import RoadNetwork
+from .preprocess import DEFAULT_DEPOT, SAMEDAY_RADIUS_KM
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="dispatch-plan", description="Plan rider routes with ETA.")
+    parser.add_argument("--orders", help="OrderList .xlsx/.csv/.parquet (omit for the Store version, "
+                                         "where the location file carries order_datetime)")
+    parser.add_argument("--locations", required=True, help="OrderLocation .xlsx/.csv/.parquet")
+    parser.add_argument("--drivers", type=int, default=3, help="number of drivers (default: 3)")
+    parser.add_argument("--max-drops", type=int, default=2, help="max drops per driver (default: 2)")
+    parser.add_argument("--depot", type=float, nargs=2, metavar=("LAT", "LON"), default=DEFAULT_DEPOT)
+    parser.add_argument("--depots", metavar="FILE",
+                        help="depot table (Depot, LAT, LON[, Drivers, Max Drops]): plan every depot "
+                             "in parallel, orders going to their 'Depot' column or nearest depot")
+    parser.add_argument("--sameday-radius-km", type=float, default=SAMEDAY_RADIUS_KM)
+    parser.add_argument("--service-min", type=float, default=0,
+                        help="minutes spent at each drop (default: 0)")
+    parser.add_argument("--decompose", choices=DECOMPOSE_METHODS,
+                        help="split large days into spatial clusters solved in parallel")
+    parser.add_argument("--clusters", type=int, help="number of clusters (default: ~150 orders each)")
+    parser.add_argument("--workers", type=int, help="solver processes (default: CPU count)")
+    parser.add_argument("--time-limit", type=float, metavar="SECONDS",
+                        help="stop the search after this long and keep the best solution")
+    parser.add_argument("--solution-limit", type=int, help="stop after this many solutions")
+    parser.add_argument("--metaheuristic", choices=tuple(METAHEURISTICS), default="automatic")
+    parser.add_argument("--first-solution", choices=(*FIRST_SOLUTIONS, WINDOW_INSERTION),
+                        help=f"default: {WINDOW_INSERTION} with delivery windows, else path_cheapest_arc")
+    parser.add_argument("--portfolio", nargs="*", metavar="STRATEGY",
+                        choices=(*FIRST_SOLUTIONS, WINDOW_INSERTION, SWEEP),
+                        help="multi-start: solve with several first-solution strategies in parallel and "
+                             f"keep the cheapest (default: {' '.join(DEFAULT_PORTFOLIO)})")
+    parser.add_argument("--allow-unassigned", action="store_true",
+                        help="partial plan: leave orders no driver can serve unassigned instead of "
+                             "failing, and list them on stderr")
+    parser.add_argument("--distance-cache", metavar="DIR",
+                        help="persistent distance store reused across runs (created if missing)")
+    parser.add_argument("--road-nodes", metavar="FILE",
+                        help="road graph nodes (node, lat, lon); use with --road-edges")
+    parser.add_argument("--road-edges", metavar="FILE",
+                        help="road graph edges (u, v, length_m[, speed_kmph, oneway]): road "
+                             "distances and travel-time ETAs instead of straight lines")
+    parser.add_argument("--sweep-drivers", type=int, nargs=2, metavar=("MIN", "MAX"),
+                        help="fleet sizing: solve every driver count in MIN..MAX in parallel, print "
+                             "distance per fleet size and write the smallest feasible fleet's plan")
+    parser.add_argument("--sweep-drops", type=int, nargs="+", metavar="N",
+                        help="max drops per driver to try with --sweep-drivers (default: --max-drops)")
+    parser.add_argument("--time-budget", type=float, metavar="SECONDS",
+                        help="wall-clock limit for the whole --sweep-drivers run")
+    parser.add_argument("--quiet", action="store_true", help="do not print incumbent updates")
+    parser.add_argument("--memory", action="store_true",
+                        help="print wall time and peak memory per stage and frame sizes to stderr")
+    parser.add_argument("--log-json", action="store_true",
+                        help="log every stage's timing, the matrix size and solver statistics to "
+                             "stderr as JSON lines")
+    parser.add_argument("--output", default="route_plan.csv", help="summary .csv, or .xlsx with route stats and a sheet per driver")
+    return parser
+
+
+def write_plan(result, path):
+    if str(path).lower().endswith(".xlsx"):
+        write_xlsx(result, path)
+    else:
+        write_csv(result, path)
+
+
+def print_incumbent(incumbent):
+    print(f"[{incumbent.seconds:7.2f}s] solution {incumbent.solution_no}: "
+          f"cost {incumbent.cost}, {incumbent.routes} routes"
+          + (f", {incumbent.late} late" if incumbent.late else ""), file=sys.stderr, flush=True)
+
+
+def print_memory(memory):
+    print(memory.to_frame().to_string(index=False), file=sys.stderr)
+    for name, size in memory.frames.items():
+        print(f"{name}: {size / 1024 / 1024:.2f} MiB", file=sys.stderr)
+
+
+def log_json():
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def sweep(args, order_df, location_df, search, store, network):
+    low, high = args.sweep_drivers
+    fleet = size_fleet(order_df, location_df, tuple(args.depot), range(low, high + 1),
+                       args.sweep_drops or [args.max_drops], args.sameday_radius_km,
+                       workers=args.workers, search=search, time_budget_s=args.time_budget,
+                       store=store, network=network, service_time_s=round(args.service_min * 60))
+    print(fleet.table.to_string(index=False))
+    best = fleet.smallest()
+    if best is None:
+        print("dispatch-plan: no feasible fleet in the swept range", file=sys.stderr)
+        return 1
+    print(f"Smallest feasible fleet: {best['Drivers used']} drivers x {best['Max Drops']} drops "
+          f"({best['Distance (km)']:.1f} km)")
+    write_plan(fleet.plan, args.output)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if bool(args.road_nodes) != bool(args.road_edges):
+        parser.error("--road-nodes and --road-edges go together")
+    if args.depots and args.decompose:
+        parser.error("--depots and --decompose cannot be combined")
+    if args.sweep_drivers and (args.depots or args.decompose):
+        parser.error("--sweep-drivers cannot be combined with --depots or --decompose")
+    if args.portfolio is not None and (args.depots or args.decompose or args.sweep_drivers):
+        parser.error("--portfolio only applies to a single monolithic solve")
+    search = SearchOptions(args.time_limit, args.solution_limit, args.metaheuristic, args.first_solution)
+    portfolio = None if args.portfolio is None else (tuple(args.portfolio) or True)
+
+    if args.log_json:
+        log_json()
+    memory = MemoryReport(trace=args.memory) if args.memory or args.log_json else None
+    store = DistanceStore(args.distance_cache) if args.distance_cache else None
+    network = RoadNetwork.from_files(args.road_nodes, args.road_edges) if args.road_edges else None
+
+    with track(memory, "read"):
+        order_df = read_orders(args.orders) if args.orders else None
+        location_df = read_locations(args.locations)
+        depot_df = read_depots(args.depots) if args.depots else None
+    if args.sweep_drivers:
+        return sweep(args, order_df, location_df, search, store, network)
+    try:
+        if depot_df is not None:
+            result = plan_depots(order_df, location_df, depot_df, args.drivers, args.max_drops,
+                                 sameday_radius_km=args.sameday_radius_km, workers=args.workers,
+                                 search=search, memory=memory, store=store, network=network,
+                                 service_time_s=round(args.service_min * 60),
+                                 allow_unassigned=args.allow_unassigned)
+        else:
+            result = plan_routes(order_df, location_df, tuple(args.depot), args.drivers,
+                                 args.max_drops, sameday_radius_km=args.sameday_radius_km,
+                                 decompose=args.decompose, num_clusters=args.clusters,
+                                 workers=args.workers, search=search,
+                                 on_solution=None if args.quiet else print_incumbent,
+                                 memory=memory, store=store, network=network,
+                                 service_time_s=round(args.service_min * 60), portfolio=portfolio,
+                                 allow_unassigned=args.allow_unassigned)
+    except PlanningError as exc:
+        note(memory, error=str(exc))
+        print(f"dispatch-plan: {exc}", file=sys.stderr)
+        return 1
+
+    if memory is not None:
+        memory.add_frame("orders", result.orders)
+        if depot_df is None:
+            memory.add_frame("sameday", result.sameday)
+        note(memory, frames_mib={k: round(v / 1024 / 1024, 2) for k, v in memory.frames.items()})
+    if args.memory:
+        print_memory(memory)
+
+    if depot_df is None and result.portfolio is not None:
+        print(result.portfolio.to_string(index=False), file=sys.stderr)
+    unassigned = result.unassigned()
+    if len(unassigned):
+        print(f"Unassigned: {len(unassigned)} orders", file=sys.stderr)
+        print(unassigned.to_string(index=False), file=sys.stderr)
+    late = result.late()
+    if len(late):
+        print(f"Late: {len(late)} orders", file=sys.stderr)
+        print(late.to_string(index=False), file=sys.stderr)
+    with track(memory, "write"):
+        write_plan(result, args.output)
+    if memory is not None:
+        memory.note(total_seconds=round(memory.total_seconds(), 3), output=args.output)
+    counts = result.zone_counts()
+    print(f"Sameday: {counts.get('sameday', 0)} customers, "
+          f"Nextday: {counts.get('nextday', 0)} customers")
+    stats = result.stats() if depot_df is not None else result.routes.stats()
+    print(stats.to_string(index=False))
+    print(f"Wrote {args.output}")
+    return 0
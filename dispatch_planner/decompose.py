@@ -0,0 +1,200 @@
+"""Geographic decomposition of large order days.
+
+One RoutingModel over every sameday order slows down sharply past a few
+hundred nodes. Here the orders are split into spatial clusters, drivers are
+allocated to clusters in proportion to their size, and each cluster's VRP is
+solved in its own process. The cluster routes are then stacked back into a
+single :class:`~dispatch_planner.routes.Routes`, so the Driver / Drop no. /
+ETA output is unchanged.
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .distance import distance_matrix_m
+from .routes import Routes
+from .routing import CapacityError, solve_routes
+
+DECOMPOSE_METHODS = ("sweep", "kmeans", "grid")
+CLUSTER_SIZE = 150  # target orders per sub-problem when num_clusters is not given
+
+
+def local_xy(lat, lon, depot):
+    """Equirectangular km offsets from the depot; fine at city scale."""
+    y = (np.asarray(lat, dtype=np.float64) - depot[0]) * 111.32
+    x = (np.asarray(lon, dtype=np.float64) - depot[1]) * 111.32 * math.cos(math.radians(depot[0]))
+    return x, y
+
+
+def _sweep(x, y, num_clusters):
+    # contiguous, equal-sized angular sectors around the depot
+    order = np.argsort(np.arctan2(y, x), kind="stable")
+    labels = np.empty(len(x), dtype=np.int64)
+    for label, part in enumerate(np.array_split(order, num_clusters)):
+        labels[part] = label
+    return labels
+
+
+def _kmeans(x, y, num_clusters, seed=0, max_iter=50):
+    pts = np.column_stack([x, y])
+    rng = np.random.default_rng(seed)
+    centers = pts[rng.choice(len(pts), num_clusters, replace=False)]
+    labels = np.zeros(len(pts), dtype=np.int64)
+    for i in range(max_iter):
+        d2 = ((pts[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_labels = d2.argmin(axis=1)
+        if i and (new_labels == labels).all():
+            break
+        labels = new_labels
+        for k in range(num_clusters):
+            members = pts[labels == k]
+            if len(members):
+                centers[k] = members.mean(axis=0)
+    return labels
+
+
+def _grid(x, y, num_clusters):
+    # quantile cells so every row / column holds roughly the same number of orders
+    side = max(1, math.ceil(math.sqrt(num_clusters)))
+    qs = np.linspace(0, 1, side + 1)[1:-1]
+    col = np.searchsorted(np.quantile(x, qs), x, side="right")
+    row = np.searchsorted(np.quantile(y, qs), y, side="right")
+    return row * side + col
+
+
+def partition(df_zone, depot, num_clusters, method="sweep", seed=0):
+    """Cluster label (0..k-1, no gaps) for every row of ``df_zone``."""
+    if method not in DECOMPOSE_METHODS:
+        raise ValueError(f"Unknown decomposition {method!r}; expected one of {DECOMPOSE_METHODS}")
+    n = len(df_zone)
+    num_clusters = max(1, min(int(num_clusters), n))
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    x, y = local_xy(df_zone['LAT'], df_zone['LON'], depot)
+    if method == "sweep":
+        labels = _sweep(x, y, num_clusters)
+    elif method == "kmeans":
+        labels = _kmeans(x, y, num_clusters, seed)
+    else:
+        labels = _grid(x, y, num_clusters)
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def _split(total, sizes):
+    """Largest-remainder split of ``total`` proportional to ``sizes``."""
+    share = total * sizes / sizes.sum()
+    split = np.floor(share).astype(np.int64)
+    left = total - split.sum()
+    split[np.argsort(-(share - split), kind="stable")[:left]] += 1
+    return split
+
+
+def allocate_drivers(cluster_sizes, num_drivers, max_drops, strict=True):
+    """Drivers per cluster: enough for its drops, the rest shared proportionally.
+
+    When the clusters need more drivers than there are, raises
+    :class:`CapacityError`, or with ``strict=False`` gives each cluster one
+    driver while they last and splits the rest by cluster size (for partial
+    plans).
+    """
+    sizes = np.asarray(cluster_sizes, dtype=np.int64)
+    need = -(-sizes // int(max_drops))  # ceil
+    if need.sum() > num_drivers:
+        if not strict:
+            base = np.minimum(need, 1) if (need > 0).sum() <= num_drivers else np.zeros_like(need)
+            return base + _split(num_drivers - base.sum(), sizes)
+        raise CapacityError(
+            f"Clusters need {need.sum()} drivers at {max_drops} drops each, "
+            f"only {num_drivers} available."
+        )
+    spare = num_drivers - need.sum()
+    if spare == 0 or sizes.sum() == 0:
+        return need
+    return need + _split(spare, sizes)
+
+
+def _solve_cluster(points, num_drivers, max_drops, options=None, distance_matrix=None,
+                   time_windows=None, allow_unassigned=False):
+    # points[0] is the depot; runs in a worker process
+    if distance_matrix is None:
+        distance_matrix = distance_matrix_m(points)
+    return solve_routes(distance_matrix, num_drivers, max_drops, options, time_windows=time_windows,
+                        allow_unassigned=allow_unassigned)
+
+
+def default_num_clusters(num_orders, num_drivers):
+    return max(1, min(num_drivers, math.ceil(num_orders / CLUSTER_SIZE)))
+
+
+def solve_decomposed(df_zone, depot, num_drivers, max_drops, method="sweep",
+                     num_clusters=None, workers=None, options=None, network=None, time_windows=None,
+                     allow_unassigned=False):
+    """Solve every cluster's VRP in a process pool and merge the routes.
+
+    Drivers are numbered cluster by cluster. ``workers=1`` solves in-process.
+    ``options`` (:class:`~dispatch_planner.routing.SearchOptions`) applies to
+    every cluster, so a time limit bounds each sub-problem, not the total.
+    With a road ``network``, cluster matrices are computed here and shipped to
+    the workers instead of the graph. ``time_windows`` (for all of
+    ``df_zone``) is split per cluster. ``allow_unassigned`` makes every
+    cluster a partial plan (see :func:`~dispatch_planner.routing.solve_routes`).
+    """
+    num_drivers = int(num_drivers)
+    max_drops = int(max_drops)
+    total_orders = len(df_zone)
+    max_capacity = num_drivers * max_drops
+    if total_orders > max_capacity and not allow_unassigned:
+        raise CapacityError(f"Orders ({total_orders}) exceed driver capacity ({max_capacity}).")
+
+    if num_clusters is None:
+        num_clusters = default_num_clusters(total_orders, num_drivers)
+    labels = partition(df_zone, depot, num_clusters, method)
+    num_clusters = int(labels.max()) + 1 if len(labels) else 0
+    drivers = allocate_drivers(np.bincount(labels, minlength=num_clusters), num_drivers, max_drops,
+                               strict=not allow_unassigned)
+
+    lat = df_zone['LAT'].to_numpy(dtype=np.float64)
+    lon = df_zone['LON'].to_numpy(dtype=np.float64)
+    jobs = []
+    for k in range(num_clusters):
+        rows = np.flatnonzero(labels == k)
+        points = np.vstack([depot, np.column_stack([lat[rows], lon[rows]])])
+        matrix = travel = windows = None
+        if network is not None:
+            matrix = network.matrix_m(points)
+            travel = network.time_matrix_s(points) if time_windows is not None else None
+        if time_windows is not None:
+            windows = time_windows.subset(rows, travel)
+        jobs.append((rows, points, int(drivers[k]), matrix, windows))
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1 or len(jobs) <= 1:
+        solved = [_solve_cluster(points, n, max_drops, options, matrix, windows, allow_unassigned)
+                  for _, points, n, matrix, windows in jobs]
+    else:
+        # spawn: the Streamlit server is multi-threaded, so forking it is unsafe
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [pool.submit(_solve_cluster, points, n, max_drops, options, matrix, windows,
+                                   allow_unassigned)
+                       for _, points, n, matrix, windows in jobs]
+            solved = [f.result() for f in futures]
+
+    parts = [(routes, np.r_[0, rows + 1]) for (rows, *_), routes in zip(jobs, solved)]
+    routes = Routes.concat(parts)
+
+    # spare drivers that no cluster needed keep empty routes at the end
+    if routes.num_vehicles < num_drivers:
+        pad = num_drivers - routes.num_vehicles
+        padded = Routes(routes.nodes, np.r_[routes.offsets, np.repeat(routes.offsets[-1], pad)],
+                        routes.leg_m, np.r_[routes.return_m, np.zeros(pad, dtype=np.int64)])
+        padded.arrival_s, padded.origin = routes.arrival_s, routes.origin
+        padded.unassigned, padded.unassigned_reason = routes.unassigned, routes.unassigned_reason
+        padded.search = routes.search
+        routes = padded
+    return routes
@@ -0,0 +1,192 @@
+"""Persistent pairwise distance store.
+
+Customers repeat day after day, so most pairs of a new day's matrix were
+already computed on an earlier one. The store is a directory holding:
+
+- ``points.sqlite``: every known point, keyed by its coordinates rounded to
+  ``precision`` decimals (6 ≈ 0.1 m), with its slot and last-used generation
+- ``matrix.i32``: a memory-mapped ``max_points × max_points`` int32 matrix,
+  ``meters + 1`` per known pair and 0 for pairs not computed yet (so a fresh,
+  sparse file is all "unknown")
+
+Looking up a day is one fancy-index into the memmap; only the rows and
+columns of points the store has not seen are computed. When every slot is taken, the least
+recently used points are evicted and their row and column cleared.
+
+Distances are computed from the rounded coordinates, so a matrix is the same
+whether it came from the store or was just computed.
+
+The apps only keep a store when :data:`PATH_ENV` names its directory (see
+:meth:`DistanceStore.from_env`).
+"""
+
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from .distance import DEFAULT_METHOD, distance_block_m, distance_matrix_m
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "dispatch_planner", f"distances-{DEFAULT_METHOD}")
+DEFAULT_MAX_POINTS = 2_000  # matrix file is max_points² × 4 bytes (16 MB), allocated sparsely
+DEFAULT_PRECISION = 6
+PATH_ENV = "DISPATCH_DISTANCE_CACHE"
+MAX_POINTS_ENV = "DISPATCH_DISTANCE_CACHE_POINTS"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    slot INTEGER PRIMARY KEY,
+    lat INTEGER NOT NULL,
+    lon INTEGER NOT NULL,
+    used INTEGER NOT NULL,
+    UNIQUE (lat, lon)
+);
+CREATE INDEX IF NOT EXISTS points_used ON points (used);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+
+
+class DistanceStore:
+    """On-disk, size-capped LRU of int meter distances between coordinate pairs.
+
+    One store holds one distance ``method``; opening an existing directory
+    with a different method or ``max_points`` raises ``ValueError``. Without
+    ``max_points``, an existing store keeps its size and a new one holds
+    :data:`DEFAULT_MAX_POINTS`.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_points=None, method=DEFAULT_METHOD,
+                 precision=DEFAULT_PRECISION):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.method = method
+        self.precision = int(precision)
+        self.scale = 10 ** self.precision
+        self._lock = threading.Lock()
+        # Streamlit serves reruns from several threads; access is serialised by _lock
+        self._conn = sqlite3.connect(os.path.join(path, "points.sqlite"), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        if max_points is None:
+            stored = self._conn.execute("SELECT value FROM meta WHERE key = 'max_points'").fetchone()
+            max_points = DEFAULT_MAX_POINTS if stored is None else stored[0]
+        self.max_points = int(max_points)
+        with self._conn:
+            for key, value in (("method", method), ("max_points", self.max_points),
+                               ("precision", self.precision), ("generation", 0)):
+                self._conn.execute("INSERT OR IGNORE INTO meta VALUES (?, ?)", (key, value))
+        for key in ("method", "max_points", "precision"):
+            stored = self._meta(key)
+            if stored != getattr(self, key):
+                raise ValueError(f"Distance store at {path!r} was created with {key}={stored!r}")
+
+        self._matrix = self._open_matrix(reset=False)
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        """Store at ``$DISPATCH_DISTANCE_CACHE``, or None when it is unset.
+
+        ``$DISPATCH_DISTANCE_CACHE_POINTS`` sets ``max_points`` of a new store.
+        """
+        path = environ.get(PATH_ENV)
+        if not path:
+            return None
+        max_points = environ.get(MAX_POINTS_ENV)
+        return cls(path, int(max_points) if max_points else None)
+
+    def _open_matrix(self, reset):
+        matrix_path = os.path.join(self.path, "matrix.i32")
+        size = self.max_points * self.max_points * 4
+        if reset or not os.path.exists(matrix_path) or os.path.getsize(matrix_path) != size:
+            with open(matrix_path, "wb") as f:
+                f.truncate(size)  # sparse: untouched pages read as 0 = unknown
+        return np.memmap(matrix_path, dtype=np.int32, mode="r+", shape=(self.max_points, self.max_points))
+
+    def __len__(self):
+        """Number of points currently stored."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM points").fetchone()[0]
+
+    def close(self):
+        self._matrix.flush()
+        self._conn.close()
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM points")
+            del self._matrix
+            self._matrix = self._open_matrix(reset=True)
+
+    def _meta(self, key):
+        return self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def _slots(self, keys, generation):
+        """Slot of every key, assigning (and evicting for) new ones; None if they cannot fit."""
+        cur = self._conn.cursor()
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (pos INTEGER PRIMARY KEY, lat INTEGER, lon INTEGER)")
+        cur.execute("DELETE FROM wanted")
+        cur.executemany("INSERT INTO wanted VALUES (?, ?, ?)",
+                        ((i, lat, lon) for i, (lat, lon) in enumerate(keys.tolist())))
+        cur.execute("UPDATE points SET used = ? WHERE (lat, lon) IN (SELECT lat, lon FROM wanted)",
+                    (generation,))
+        rows = cur.execute("SELECT w.pos, p.slot FROM wanted w JOIN points p USING (lat, lon)").fetchall()
+        slots = np.full(len(keys), -1, dtype=np.int64)
+        if rows:
+            pos, slot = np.array(rows, dtype=np.int64).T
+            slots[pos] = slot
+
+        new = np.flatnonzero(slots < 0)
+        new_keys = np.unique(keys[new], axis=0)
+        if len(new_keys) == 0:
+            return slots
+        known = cur.execute("SELECT COUNT(*) FROM points").fetchone()[0]
+        if known - self.max_points + len(new_keys) > 0:
+            evict = known - self.max_points + len(new_keys)
+            victims = [s for (s,) in cur.execute(
+                "SELECT slot FROM points WHERE used < ? ORDER BY used LIMIT ?", (generation, evict)
+            )]
+            if len(victims) < evict:
+                return None  # more distinct points than the store can hold
+            cur.executemany("DELETE FROM points WHERE slot = ?", ((s,) for s in victims))
+            self._matrix[victims, :] = 0
+            self._matrix[:, victims] = 0
+
+        taken = np.array([s for (s,) in cur.execute("SELECT slot FROM points")], dtype=np.int64)
+        free = np.setdiff1d(np.arange(self.max_points), taken)[:len(new_keys)].tolist()
+        cur.executemany("INSERT INTO points VALUES (?, ?, ?, ?)",
+                        ((s, lat, lon, generation) for s, (lat, lon) in zip(free, new_keys.tolist())))
+        lookup = dict(zip(map(tuple, new_keys.tolist()), free))
+        slots[new] = [lookup[k] for k in map(tuple, keys[new].tolist())]
+        return slots
+
+    def matrix_m(self, points):
+        """int32 meter matrix for ``points`` (lat, lon), like :func:`distance_matrix_m`."""
+        keys = np.rint(np.asarray(points, dtype=np.float64).reshape(-1, 2) * self.scale).astype(np.int64)
+        coords = keys / self.scale
+        if len(keys) == 0:
+            return np.zeros((0, 0), dtype=np.int32)
+
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            slots = self._slots(keys, self._meta("generation"))
+            if slots is None:
+                return distance_matrix_m(coords, self.method)
+
+            # several input points may share a key; work on unique slots, expand at the end
+            uniq, first, inverse = np.unique(slots, return_index=True, return_inverse=True)
+            stored = np.asarray(self._matrix[np.ix_(uniq, uniq)])
+            np.fill_diagonal(stored, 1)
+            missing = stored == 0
+            # a new point is missing its whole row and column: compute just those
+            rows = np.flatnonzero(missing.any(axis=1))
+            cols = np.flatnonzero(missing.any(axis=0))
+            if len(rows):
+                stored[rows] = distance_block_m(coords[first[rows]], coords[first], self.method) + 1
+                self._matrix[np.ix_(uniq[rows], uniq)] = stored[rows]
+            if len(cols):
+                stored[:, cols] = distance_block_m(coords[first], coords[first[cols]], self.method) + 1
+                self._matrix[np.ix_(uniq, uniq[cols])] = stored[:, cols]
+            if len(rows) or len(cols):
+                self._matrix.flush()
+
+        return (stored - 1)[np.ix_(inverse, inverse)].astype(np.int32)
@@ -0,0 +1,256 @@
+"""Headless route planning: orders in, driver routes with ETAs out.
+
+Nothing here imports streamlit or folium, so the same engine backs the
+Streamlit apps, the ``dispatch-plan`` CLI and batch/cron jobs.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .decompose import solve_decomposed
+from .distance import distance_matrix_m
+from .ingest import merge_orders
+from .memory import note, track
+from .portfolio import DEFAULT_PORTFOLIO, solve_portfolio
+from .preprocess import DEFAULT_DEPOT, SAMEDAY_RADIUS_KM, prepare_orders, zone_flags
+from .routes import Routes, driver_name
+from .routing import (  # noqa: F401
+    SERVICE_TIME_S,
+    CapacityError,
+    Incumbent,
+    NoSolutionError,
+    PlanningError,
+    SearchOptions,
+    TimeWindows,
+    precheck,
+    solve_routes,
+)
+
+SPEED_KMPH = 30
+# the only columns the solver and ETA stages read from the sameday orders
+SAMEDAY_COLUMNS = ['Order No', 'LAT', 'LON', 'order_datetime', 'delivery_deadline']
+# the Routing Summary, before the Picking Zone flags
+SUMMARY_COLUMNS = [
+    'Order No', 'LAT', 'LON', 'distance_km', 'zone',
+    'order_datetime', 'delivery_deadline', 'Driver', 'Drop no.', 'ETA',
+]
+
+
+@dataclass
+class PlanResult:
+    orders: pd.DataFrame   # every order, with Driver / Drop no. / ETA filled for routed ones
+    sameday: pd.DataFrame  # the orders handed to the solver, in matrix node order (node = row + 1)
+    routes: Routes         # flat per-stop arrays, one route per driver
+    depot: tuple
+    portfolio: pd.DataFrame = None  # multi-start runs, cheapest first (portfolio solves only)
+
+    def summary(self):
+        """Routing Summary table as shown in the apps."""
+        if 'Picking Zone' not in self.orders.columns:
+            return self.orders[SUMMARY_COLUMNS]
+        summary = self.orders[SUMMARY_COLUMNS + ['Picking Zone']]
+        return summary.join(zone_flags(summary['Picking Zone']))
+
+    def unassigned(self):
+        """Sameday orders the routes leave out (partial plans only), with a 'Reason'."""
+        rows = self.routes.unassigned - 1
+        return self.sameday.iloc[rows].assign(Reason=self.routes.unassigned_reason).reset_index(drop=True)
+
+    def late(self):
+        """Routed orders delivered after their deadline, with 'Driver' and 'Minutes late'.
+
+        Only a search stopped before it met every delivery window keeps late
+        stops (see ``stop`` in :func:`solve_routes`).
+        """
+        late = self.routes.late_s > 0
+        rows = self.routes.nodes[late] - 1
+        return self.sameday.iloc[rows].assign(
+            Driver=[driver_name(v) for v in self.routes.vehicle[late]],
+            **{'Minutes late': -(-self.routes.late_s[late] // 60)},
+        ).reset_index(drop=True)
+
+    def zone_counts(self):
+        return self.orders['zone'].value_counts().to_dict()
+
+
+def load_orders(orders, locations, depot=DEFAULT_DEPOT, sameday_radius_km=SAMEDAY_RADIUS_KM):
+    """Ingestion + preprocessing stage: returns ``(merged_df, df_zone)``.
+
+    ``df_zone`` holds only :data:`SAMEDAY_COLUMNS` of the sameday rows.
+    """
+    merged_df = merge_orders(orders, locations)
+    merged_df = prepare_orders(merged_df, depot, sameday_radius_km)
+    columns = [c for c in SAMEDAY_COLUMNS if c in merged_df.columns]
+    df_zone = merged_df.loc[merged_df['zone'] == 'sameday', columns].reset_index(drop=True)
+    return merged_df, df_zone
+
+
+def node_points(df_zone, depot):
+    """``(lat, lon)`` of every matrix node: the depot, then the sameday orders."""
+    return [depot] + list(zip(df_zone['LAT'], df_zone['LON']))
+
+
+def build_matrix(df_zone, depot=DEFAULT_DEPOT, store=None, network=None):
+    """Depot + sameday orders distance matrix (int32 meters, depot is node 0).
+
+    With a :class:`~dispatch_planner.roads.RoadNetwork` the distances are road
+    distances. Otherwise, with a
+    :class:`~dispatch_planner.distance_store.DistanceStore`, only pairs
+    involving addresses it has not seen before are computed.
+    """
+    locs = node_points(df_zone, depot)
+    if network is not None:
+        return network.matrix_m(locs)
+    if store is not None:
+        return store.matrix_m(locs)
+    return distance_matrix_m(locs)
+
+
+def build_time_matrix(df_zone, depot=DEFAULT_DEPOT, network=None):
+    """Travel seconds between the same nodes as :func:`build_matrix`; None without a network."""
+    if network is None:
+        return None
+    return network.time_matrix_s(node_points(df_zone, depot))
+
+
+def build_time_windows(df_zone, speed_kmph=SPEED_KMPH, service_time_s=SERVICE_TIME_S,
+                       time_matrix=None):
+    """Solver :class:`TimeWindows` from ``order_datetime`` / ``delivery_deadline``.
+
+    Seconds are counted from the earliest order time; orders without a
+    deadline get a day. Returns None when no order has an order time.
+    """
+    ordered = df_zone['order_datetime'].to_numpy(dtype='datetime64[s]')
+    known = ~np.isnat(ordered)
+    if not known.any():
+        return None
+    origin = ordered[known].min()
+    ordered_s = np.where(known, (ordered - origin).astype(np.int64), 0)
+    deadline = df_zone['delivery_deadline'].to_numpy(dtype='datetime64[s]')
+    due_s = np.where(np.isnat(deadline), ordered_s + 24 * 3600, (deadline - origin).astype(np.int64))
+    return TimeWindows(ordered_s, due_s, origin, speed_kmph, int(service_time_s), time_matrix)
+
+
+def precheck_orders(df_zone, distance_matrix, time_windows=None):
+    """Sameday orders no driver can serve even alone, with a 'Reason' (see :func:`precheck`)."""
+    reasons = precheck(distance_matrix, time_windows)
+    rows = np.fromiter(reasons, dtype=np.int64, count=len(reasons)) - 1
+    return df_zone.iloc[rows].assign(Reason=list(reasons.values())).reset_index(drop=True)
+
+
+def check_orders(df_zone, distance_matrix, time_windows=None):
+    """Raise :class:`NoSolutionError` naming the orders :func:`precheck_orders` flags."""
+    flagged = precheck_orders(df_zone, distance_matrix, time_windows)
+    if flagged.empty:
+        return
+    names = ', '.join(map(str, flagged['Order No'].head(5)))
+    more = f" and {len(flagged) - 5} more" if len(flagged) > 5 else ""
+    raise NoSolutionError(f"No driver can serve order {names}{more}: {flagged['Reason'].iloc[0]}. "
+                          "Allow unassigned orders to plan the rest.")
+
+
+def assemble_result(merged_df, df_zone, routes, depot=DEFAULT_DEPOT, speed_kmph=SPEED_KMPH,
+                    time_matrix=None):
+    """Attach ETAs to ``routes`` and join Driver / Drop no. / ETA onto ``merged_df``.
+
+    The per-stop table is joined back with one merge indexed on 'Order No'.
+    ``time_matrix`` (from :func:`build_time_matrix`) replaces ``speed_kmph``.
+    """
+    routes.locate(df_zone, depot, speed_kmph, time_matrix)
+    table = routes.table()
+
+    # one row per order; a repeated Order No keeps its last visit
+    by_order = table.drop_duplicates('Order No', keep='last').set_index('Order No')
+    merged_df = merged_df.drop(columns=['Driver', 'Drop no.', 'ETA'], errors='ignore').join(
+        by_order[['Driver', 'Drop no.', 'ETA']], on='Order No'
+    )
+    return PlanResult(merged_df, df_zone, routes, depot)
+
+
+def note_solve(memory, df_zone, distance_matrix, routes):
+    """Record the problem size and the solver's search statistics on ``memory``."""
+    fields = {'sameday_orders': len(df_zone), 'drivers': routes.num_vehicles,
+              'unassigned': len(routes.unassigned)}
+    if distance_matrix is not None:
+        fields.update(matrix_nodes=len(distance_matrix),
+                      matrix_mib=round(np.asarray(distance_matrix).nbytes / 1024 / 1024, 2))
+    if routes.search is not None:
+        fields['solver'] = routes.search
+    note(memory, **fields)
+
+
+def solve(distance_matrix, num_drivers, max_drops, search=None, on_solution=None,
+          time_windows=None, portfolio=None, points=None, workers=None, allow_unassigned=False,
+          stop=None):
+    """``(routes, runs)``: :func:`solve_routes`, or a portfolio solve when ``portfolio`` is set.
+
+    ``runs`` is the portfolio's runs table, None for a single solve.
+    ``on_solution`` and ``stop`` only apply to a single solve.
+    """
+    if not portfolio:
+        return solve_routes(distance_matrix, num_drivers, max_drops, search, on_solution,
+                            time_windows=time_windows, allow_unassigned=allow_unassigned,
+                            stop=stop), None
+    strategies = DEFAULT_PORTFOLIO if portfolio is True else tuple(portfolio)
+    return solve_portfolio(distance_matrix, num_drivers, max_drops, search, strategies,
+                           points=points, time_windows=time_windows, workers=workers,
+                           allow_unassigned=allow_unassigned)
+
+
+def plan_routes(orders, locations, depot=DEFAULT_DEPOT, num_drivers=3, max_drops=2,
+                sameday_radius_km=SAMEDAY_RADIUS_KM, speed_kmph=SPEED_KMPH,
+                decompose=None, num_clusters=None, workers=None, search=None, on_solution=None,
+                memory=None, store=None, network=None, service_time_s=SERVICE_TIME_S, portfolio=None,
+                allow_unassigned=False):
+    """Plan sameday routes for ``num_drivers`` drivers.
+
+    ``orders`` is the OrderList frame, or None when ``locations`` already carries
+    ``order_datetime`` (Store version). ``decompose`` ("sweep", "kmeans" or
+    "grid") splits large days into clusters solved in parallel, see
+    :mod:`dispatch_planner.decompose`. ``search`` is a :class:`SearchOptions`
+    and ``on_solution`` receives each improved :class:`Incumbent` (monolithic
+    solve only). A :class:`~dispatch_planner.memory.MemoryReport` passed as
+    ``memory`` records wall time and peak memory per stage, plus the matrix
+    size and solver statistics as notes. Raises :class:`PlanningError`
+    when the orders cannot be routed. ``store`` and ``network`` are passed to
+    :func:`build_matrix`; with a road ``network``, travel times are its own.
+
+    Every order must be delivered by its ``delivery_deadline`` (see
+    :func:`build_time_windows`), spending ``service_time_s`` at each drop; the
+    ETAs are the solver's arrival times.
+
+    ``portfolio`` (True, or a tuple of first-solution strategies) solves a
+    monolithic day with :func:`~dispatch_planner.portfolio.solve_portfolio`
+    across ``workers`` processes; the runs table is kept as ``result.portfolio``.
+
+    Orders no driver can reach in time or within the route limit fail fast.
+    With ``allow_unassigned`` the plan is partial instead: unservable orders,
+    and any the drivers cannot fit in, are listed by ``result.unassigned()``.
+    """
+    with track(memory, "preprocess"):
+        merged_df, df_zone = load_orders(orders, locations, depot, sameday_radius_km)
+    runs = distance_matrix = None
+    if decompose:
+        time_windows = build_time_windows(df_zone, speed_kmph, service_time_s)
+        with track(memory, "solve"):
+            routes = solve_decomposed(df_zone, depot, num_drivers, max_drops, decompose,
+                                      num_clusters, workers, search, network, time_windows,
+                                      allow_unassigned)
+    else:
+        with track(memory, "matrix"):
+            distance_matrix = build_matrix(df_zone, depot, store, network)
+            time_matrix = build_time_matrix(df_zone, depot, network)
+        time_windows = build_time_windows(df_zone, speed_kmph, service_time_s, time_matrix)
+        if not allow_unassigned:
+            check_orders(df_zone, distance_matrix, time_windows)
+        with track(memory, "solve"):
+            routes, runs = solve(distance_matrix, num_drivers, max_drops, search, on_solution,
+                                 time_windows, portfolio, node_points(df_zone, depot), workers,
+                                 allow_unassigned)
+    note_solve(memory, df_zone, distance_matrix, routes)
+    with track(memory, "assemble"):
+        result = assemble_result(merged_df, df_zone, routes, depot, speed_kmph)
+    result.portfolio = runs
+    return result
@@ -0,0 +1,177 @@
+"""Downloadable route plans: an xlsx workbook or a CSV of the Routing Summary.
+
+The workbook is written with xlsxwriter in ``constant_memory`` mode, which
+flushes every row to a temporary file as soon as the next row starts. Rows
+are streamed straight from the order table's columns and the flat
+:class:`~dispatch_planner.routes.Routes` arrays, so no extra DataFrame is
+built for any sheet:
+
+- ``Summary``: the Routing Summary as shown in the apps
+- ``Route stats``: drops, distance and first / last ETA per driver
+- ``Unassigned``: orders a partial plan leaves out, with the reason (if any)
+- one sheet per driver with stops, in drop order, with ETA
+
+A :class:`~dispatch_planner.multidepot.MultiDepotResult` gets a leading
+'Depot' column and one sheet per depot and driver.
+"""
+
+import csv
+import io
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .engine import SUMMARY_COLUMNS
+from .preprocess import ZONE_TYPES
+from .routes import driver_name
+
+SHEET_NAME_MAX = 31  # Excel's limit
+STOP_COLUMNS = ['Drop no.', 'Order No', 'ETA', 'delivery_deadline', 'LAT', 'LON', 'cum_distance_km']
+STATS_COLUMNS = ['Driver', 'Drops', 'Distance (km)', 'First ETA', 'Last ETA']
+
+
+def _plans(result):
+    """``(depot name, PlanResult)`` pairs; the name is None for a single-depot plan."""
+    if hasattr(result, 'results'):
+        return list(result.results.items())
+    return [(None, result)]
+
+
+def _cell(value):
+    """A value xlsxwriter and csv can write: NaN / NaT / NA become blank, numpy scalars Python."""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _hhmm(eta):
+    """'HH:MM' strings of a datetime64 array, as in the summary's ETA column."""
+    return [s[11:16] for s in np.datetime_as_string(eta, unit='m')]
+
+
+def _summary_rows(orders):
+    """Routing Summary rows of ``orders``, read column by column (see :meth:`PlanResult.summary`)."""
+    columns = [orders[c] for c in SUMMARY_COLUMNS]
+    if 'Picking Zone' not in orders.columns:
+        return SUMMARY_COLUMNS, zip(*columns)
+    rows = ((*row, zone, *(zone == z for z in ZONE_TYPES))
+            for *row, zone in zip(*columns, orders['Picking Zone']))
+    return SUMMARY_COLUMNS + ['Picking Zone'] + list(ZONE_TYPES), rows
+
+
+def _stop_rows(plan, vehicle_id):
+    routes = plan.routes
+    s = routes.stops(vehicle_id)
+    deadline = plan.sameday['delivery_deadline'] if 'delivery_deadline' in plan.sameday else None
+    rows = routes.nodes[s] - 1
+    return zip(range(1, len(rows) + 1), routes.order_no[s], _hhmm(routes.eta[s]),
+               [None] * len(rows) if deadline is None else deadline.iloc[rows],
+               routes.lat[s], routes.lon[s], routes.cum_distance_m[s] / 1000)
+
+
+def _stats_rows(plan):
+    routes = plan.routes
+    for v in range(routes.num_vehicles):
+        s = routes.stops(v)
+        first, last = (_hhmm(routes.eta[s][[0, -1]]) if s.stop > s.start else (None, None))
+        yield (driver_name(v), int(routes.lengths[v]), routes.route_distance_m[v] / 1000, first, last)
+
+
+def _sheet_name(depot, vehicle_id, taken):
+    """Sheet name of a driver's stops, unique among the lower-cased names in ``taken``.
+
+    Depot names are cut to fit Excel's limit; names that collide after the
+    cut (Excel compares them case-insensitively) get a "~2", "~3", ... suffix.
+    """
+    driver = driver_name(vehicle_id)
+    name = driver
+    if depot is not None:
+        depot = re.sub(r"[\[\]:*?/\\']", "_", str(depot))
+        room = SHEET_NAME_MAX - len(driver) - 1
+        name, n = f"{depot[:room]} {driver}", 1
+        while name.lower() in taken:
+            n += 1
+            suffix = f"~{n}"
+            name = f"{depot[:room - len(suffix)]}{suffix} {driver}"
+    taken.add(name.lower())
+    return name
+
+
+def write_xlsx(result, target):
+    """Write the plan workbook (see the module docs) to a path or binary file object."""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(target, {'constant_memory': True,
+                                            'default_date_format': 'yyyy-mm-dd hh:mm'})
+    header = workbook.add_format({'bold': True})
+    plans = _plans(result)
+    multi = plans[0][0] is not None if plans else False
+
+    def sheet(name, columns, groups):
+        # groups: (depot, rows) pairs; constant_memory needs rows strictly in order
+        ws = workbook.add_worksheet(name)
+        ws.write_row(0, 0, (['Depot'] if multi else []) + list(columns), header)
+        ws.freeze_panes(1, 0)
+        r = 1
+        for depot, rows in groups:
+            for row in rows:
+                ws.write_row(r, 0, [_cell(v) for v in ((depot,) if multi else ()) + tuple(row)])
+                r += 1
+        return ws
+
+    summary = [(depot, _summary_rows(plan.orders)) for depot, plan in plans]
+    columns = summary[0][1][0] if summary else SUMMARY_COLUMNS
+    sheet("Summary", columns, [(depot, rows) for depot, (_, rows) in summary])
+    sheet("Route stats", STATS_COLUMNS, [(depot, _stats_rows(plan)) for depot, plan in plans])
+    if any(len(plan.routes.unassigned) for _, plan in plans):
+        unassigned = [(depot, plan.unassigned()) for depot, plan in plans]
+        sheet("Unassigned", list(unassigned[0][1].columns),
+              [(depot, df.itertuples(index=False, name=None)) for depot, df in unassigned])
+    taken = set()
+    for depot, plan in plans:
+        for v in np.flatnonzero(plan.routes.lengths > 0):
+            ws = workbook.add_worksheet(_sheet_name(depot, int(v), taken))
+            ws.write_row(0, 0, STOP_COLUMNS, header)
+            ws.freeze_panes(1, 0)
+            for r, row in enumerate(_stop_rows(plan, int(v)), start=1):
+                ws.write_row(r, 0, [_cell(x) for x in row])
+    workbook.close()
+
+
+def write_csv(result, target):
+    """Write the Routing Summary as CSV, row by row, to a path or text file object."""
+    plans = _plans(result)
+    multi = plans[0][0] is not None if plans else False
+    is_path = isinstance(target, (str, os.PathLike))
+    f = open(target, "w", newline="", encoding="utf-8") if is_path else target
+    try:
+        writer = csv.writer(f)
+        for i, (depot, plan) in enumerate(plans):
+            columns, rows = _summary_rows(plan.orders)
+            if i == 0:
+                writer.writerow((['Depot'] if multi else []) + list(columns))
+            for row in rows:
+                writer.writerow([_cell(v) for v in ((depot,) if multi else ()) + tuple(row)])
+    finally:
+        if is_path:
+            f.close()
+
+
+def xlsx_bytes(result):
+    """:func:`write_xlsx` into memory, e.g. for a download button."""
+    buffer = io.BytesIO()
+    write_xlsx(result, buffer)
+    return buffer.getvalue()
+
+
+def csv_bytes(result):
+    """:func:`write_csv` into memory (UTF-8), e.g. for a download button."""
+    buffer = io.StringIO()
+    write_csv(result, buffer)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,148 @@
+"""Fleet sizing: how many drivers does a day need?
+
+:func:`sweep_fleet` solves one VRP per ``(num_drivers, max_drops)`` pair of a
+grid in worker processes and tabulates distance against fleet size. The
+workers share one copy of the matrix (see :mod:`dispatch_planner.pool`).
+
+A ``time_budget_s`` bounds the whole sweep: each solve's time limit is cut to
+what is left of the budget, and pairs that have not started in time are
+reported as ``"out of time"``. A solve that hits its time limit without an
+on-time plan is ``"timed out"``, kept apart from ``"no solution"``, where the
+search ended without one. Pairs with fewer drop slots than orders are
+reported as ``"over capacity"`` without solving.
+"""
+
+import math
+import time
+from dataclasses import dataclass, replace
+
+import pandas as pd
+
+from .engine import (
+    SERVICE_TIME_S,
+    SPEED_KMPH,
+    NoSolutionError,
+    PlanResult,
+    SearchOptions,
+    assemble_result,
+    build_matrix,
+    build_time_matrix,
+    build_time_windows,
+    load_orders,
+    solve_routes,
+)
+from .pool import default_workers, local_state, shared_matrix_pool, worker_state
+from .preprocess import DEFAULT_DEPOT, SAMEDAY_RADIUS_KM
+
+FEASIBLE = "feasible"
+OVER_CAPACITY = "over capacity"
+NO_SOLUTION = "no solution"
+OUT_OF_TIME = "out of time"
+TIMED_OUT = "timed out"
+
+
+@dataclass
+class FleetSweep:
+    table: pd.DataFrame  # one row per (Drivers, Max Drops), fewest drivers first
+    routes: dict         # (num_drivers, max_drops) → Routes, feasible pairs only
+    plan: PlanResult = None  # the smallest feasible fleet's plan (set by size_fleet)
+
+    def smallest(self):
+        """Feasible row using the fewest drivers (shortest on ties), or None.
+
+        A fleet that leaves drivers idle proves its 'Drivers used' suffice, so
+        rows are ranked on that rather than on the fleet offered.
+        """
+        feasible = self.table[self.table['Status'] == FEASIBLE]
+        if feasible.empty:
+            return None
+        return feasible.sort_values(['Drivers used', 'Distance (km)', 'Drivers'], kind='stable').iloc[0]
+
+    def assemble(self, merged_df, df_zone, depot=DEFAULT_DEPOT, speed_kmph=SPEED_KMPH):
+        """Set :attr:`plan` to the smallest feasible fleet's :class:`PlanResult`."""
+        best = self.smallest()
+        if best is not None:
+            routes = self.routes[(int(best['Drivers']), int(best['Max Drops']))]
+            self.plan = assemble_result(merged_df, df_zone, routes, depot, speed_kmph)
+        return self
+
+
+def _solve_size(num_drivers, max_drops, deadline, state=None):
+    """``(status, routes, seconds)`` for one fleet size; ``state`` defaults to the worker's."""
+    state = worker_state() if state is None else state
+    options = state['options']
+    if deadline is not None:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return OUT_OF_TIME, None, 0.0
+        limit = remaining if options.time_limit_s is None else min(options.time_limit_s, remaining)
+        options = replace(options, time_limit_s=limit)
+
+    started = time.perf_counter()
+    try:
+        routes = solve_routes(state['matrix'], num_drivers, max_drops, options,
+                              time_windows=state['time_windows'])
+    except NoSolutionError as exc:
+        return TIMED_OUT if exc.timed_out else NO_SOLUTION, None, time.perf_counter() - started
+    return FEASIBLE, routes, time.perf_counter() - started
+
+
+def _row(num_drivers, max_drops, status, routes, seconds):
+    used = int((routes.lengths > 0).sum()) if routes is not None else None
+    distance_km = routes.route_distance_m.sum() / 1000 if routes is not None else math.nan
+    longest_km = routes.route_distance_m.max(initial=0) / 1000 if routes is not None else math.nan
+    return {'Drivers': num_drivers, 'Max Drops': max_drops, 'Status': status,
+            'Drivers used': used, 'Distance (km)': distance_km,
+            'Longest route (km)': longest_km, 'Seconds': round(seconds, 2)}
+
+
+def sweep_fleet(distance_matrix, driver_counts, drop_limits, options=None, time_windows=None,
+                workers=None, time_budget_s=None):
+    """Solve every ``driver_counts`` × ``drop_limits`` pair and return a :class:`FleetSweep`.
+
+    ``options`` (:class:`SearchOptions`) applies to each solve. ``workers=1``
+    solves in-process; solves still respect ``time_budget_s``.
+    """
+    options = options or SearchOptions()
+    num_orders = len(distance_matrix) - 1
+    pairs = sorted({(int(n), int(d)) for n in driver_counts for d in drop_limits})
+    jobs = [p for p in pairs if p[0] * p[1] >= num_orders]
+    deadline = None if time_budget_s is None else time.time() + time_budget_s
+
+    workers = workers or default_workers(len(jobs))
+    if workers <= 1 or len(jobs) <= 1:
+        state = local_state(distance_matrix, time_windows, options)
+        solved = [_solve_size(n, d, deadline, state) for n, d in jobs]
+    else:
+        with shared_matrix_pool(distance_matrix, time_windows, options, workers) as pool:
+            futures = [pool.submit(_solve_size, n, d, deadline) for n, d in jobs]
+            solved = [f.result() for f in futures]
+
+    outcomes = dict(zip(jobs, solved))
+    rows, routes = [], {}
+    for pair in pairs:
+        status, solution, seconds = outcomes.get(pair, (OVER_CAPACITY, None, 0.0))
+        rows.append(_row(*pair, status, solution, seconds))
+        if solution is not None:
+            routes[pair] = solution
+    table = pd.DataFrame(rows, columns=['Drivers', 'Max Drops', 'Status', 'Drivers used',
+                                        'Distance (km)', 'Longest route (km)', 'Seconds'])
+    table['Drivers used'] = table['Drivers used'].astype('Int64')
+    return FleetSweep(table, routes)
+
+
+def size_fleet(orders, locations, depot=DEFAULT_DEPOT, driver_counts=range(1, 11), drop_limits=(2,),
+               sameday_radius_km=SAMEDAY_RADIUS_KM, speed_kmph=SPEED_KMPH, workers=None, search=None,
+               time_budget_s=None, store=None, network=None, service_time_s=SERVICE_TIME_S):
+    """:func:`sweep_fleet` for an order day, like :func:`~dispatch_planner.engine.plan_routes`.
+
+    The returned sweep's ``plan`` is the full :class:`PlanResult` of
+    :meth:`FleetSweep.smallest` (None when no pair is feasible).
+    """
+    merged_df, df_zone = load_orders(orders, locations, depot, sameday_radius_km)
+    distance_matrix = build_matrix(df_zone, depot, store, network)
+    time_matrix = build_time_matrix(df_zone, depot, network)
+    time_windows = build_time_windows(df_zone, speed_kmph, service_time_s, time_matrix)
+    sweep = sweep_fleet(distance_matrix, driver_counts, drop_limits, search, time_windows, workers,
+                        time_budget_s)
+    return sweep.assemble(merged_df, df_zone, depot, speed_kmph)
@@ -0,0 +1,138 @@
+"""Incremental re-planning for late orders.
+
+Instead of rebuilding the manager, matrix and solution from scratch, the
+planner keeps the previous plan: only the new rows/columns of the distance
+matrix are computed, new orders are inserted into the existing routes at their
+cheapest feasible (and on-time) position, and the solver is warm-started from that plan with
+already-dispatched stops locked in place.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .distance import extend_matrix_m
+from .engine import (
+    SERVICE_TIME_S,
+    SPEED_KMPH,
+    assemble_result,
+    build_matrix,
+    build_time_matrix,
+    build_time_windows,
+    load_orders,
+)
+from .preprocess import DEFAULT_DEPOT, SAMEDAY_RADIUS_KM
+from .routing import cheapest_insertion, solve_routes
+
+
+class IncrementalPlanner:
+    """Keeps the current plan and its matrix so late orders are cheap to add.
+
+    ``plan()`` solves from scratch once; each ``add_orders()`` call afterwards
+    only extends the matrix for the new orders and warm-starts the solver.
+    """
+
+    def __init__(self, depot=DEFAULT_DEPOT, num_drivers=3, max_drops=2,
+                 sameday_radius_km=SAMEDAY_RADIUS_KM, speed_kmph=SPEED_KMPH, search=None, store=None,
+                 network=None, service_time_s=SERVICE_TIME_S, allow_unassigned=False):
+        self.depot = (float(depot[0]), float(depot[1]))
+        self.num_drivers = int(num_drivers)
+        self.max_drops = int(max_drops)
+        self.sameday_radius_km = sameday_radius_km
+        self.speed_kmph = speed_kmph
+        self.search = search
+        self.store = store
+        self.network = network
+        self.service_time_s = service_time_s
+        self.allow_unassigned = allow_unassigned  # keep orders that fit nowhere out of the plan
+        self.merged_df = None
+        self.df_zone = None
+        self.distance_matrix = None
+        self.time_matrix = None
+        self.result = None
+        self.dispatched = set()
+
+    @classmethod
+    def from_plan(cls, result, num_drivers, max_drops, distance_matrix=None, time_matrix=None,
+                  **kwargs):
+        """Continue from an existing :class:`PlanResult` (matrices not given are rebuilt).
+
+        :meth:`PlanCache.replanner <dispatch_planner.cache.PlanCache.replanner>`
+        passes the matrices it already holds for the plan's uploads.
+        """
+        planner = cls(result.depot, num_drivers, max_drops, **kwargs)
+        planner.merged_df = result.orders.drop(columns=['Driver', 'Drop no.', 'ETA'], errors='ignore')
+        planner.df_zone = result.sameday
+        planner.distance_matrix = (distance_matrix if distance_matrix is not None
+                                   else build_matrix(result.sameday, planner.depot, planner.store,
+                                                     planner.network))
+        planner.time_matrix = (time_matrix if time_matrix is not None
+                               else build_time_matrix(result.sameday, planner.depot, planner.network))
+        planner.result = result
+        return planner
+
+    def plan(self, orders, locations, on_solution=None):
+        """Initial full solve."""
+        self.merged_df, self.df_zone = load_orders(orders, locations, self.depot, self.sameday_radius_km)
+        self.distance_matrix = build_matrix(self.df_zone, self.depot, self.store, self.network)
+        self.time_matrix = build_time_matrix(self.df_zone, self.depot, self.network)
+        routes = solve_routes(self.distance_matrix, self.num_drivers, self.max_drops,
+                              self.search, on_solution, time_windows=self._time_windows(),
+                              allow_unassigned=self.allow_unassigned)
+        self.result = assemble_result(self.merged_df, self.df_zone, routes, self.depot, self.speed_kmph)
+        self.dispatched = set()
+        return self.result
+
+    def _time_windows(self):
+        return build_time_windows(self.df_zone, self.speed_kmph, self.service_time_s, self.time_matrix)
+
+    def mark_dispatched(self, order_nos):
+        """Orders whose driver has already left; they and every earlier stop stay put."""
+        self.dispatched.update(order_nos)
+
+    def _locked_prefixes(self, routes):
+        locked = []
+        for v in range(routes.num_vehicles):
+            stop_orders = routes.order_no[routes.stops(v)]
+            hits = np.flatnonzero(pd.Series(stop_orders).isin(self.dispatched).to_numpy())
+            locked.append(int(hits[-1]) + 1 if len(hits) else 0)
+        return locked
+
+    def add_orders(self, orders, locations, on_solution=None):
+        """Insert late orders (same frame shapes as :func:`plan_routes`) into the plan."""
+        if self.result is None:
+            return self.plan(orders, locations, on_solution)
+
+        new_merged, new_zone = load_orders(orders, locations, self.depot, self.sameday_radius_km)
+        known = set(self.merged_df['Order No'])
+        new_merged = new_merged[~new_merged['Order No'].isin(known)]
+        new_zone = new_zone[~new_zone['Order No'].isin(known)].reset_index(drop=True)
+
+        points = np.column_stack([self.df_zone['LAT'], self.df_zone['LON']])
+        new_points = np.column_stack([new_zone['LAT'], new_zone['LON']])
+        if self.network is not None:
+            known_points = np.vstack([self.depot, points])
+            self.distance_matrix = self.network.extend_matrix_m(self.distance_matrix, known_points,
+                                                                new_points)
+            self.time_matrix = self.network.extend_time_matrix_s(self.time_matrix, known_points,
+                                                                 new_points)
+        elif self.store is not None:
+            self.distance_matrix = self.store.matrix_m(np.vstack([self.depot, points, new_points]))
+        else:
+            self.distance_matrix = extend_matrix_m(
+                self.distance_matrix, np.vstack([self.depot, points]), new_points
+            )
+        first_new = len(self.df_zone) + 1
+        self.merged_df = pd.concat([self.merged_df, new_merged], ignore_index=True)
+        self.df_zone = pd.concat([self.df_zone, new_zone], ignore_index=True)  # new nodes go last
+
+        routes = self.result.routes
+        locked = self._locked_prefixes(routes)
+        time_windows = self._time_windows()
+        initial = cheapest_insertion(routes.node_lists(), range(first_new, first_new + len(new_zone)),
+                                     self.distance_matrix, self.max_drops, locked,
+                                     time_windows=time_windows, allow_unassigned=self.allow_unassigned)
+        routes = solve_routes(self.distance_matrix, self.num_drivers, self.max_drops, self.search,
+                              on_solution, initial_routes=initial, locked=locked,
+                              time_windows=time_windows, allow_unassigned=self.allow_unassigned)
+        self.result = assemble_result(self.merged_df, self.df_zone, routes, self.depot, self.speed_kmph)
+        return self.result
@@ -0,0 +1,110 @@
+"""Reading OrderList / OrderLocation inputs.
+
+Only the columns the planner uses are read, with explicit (compact) dtypes. xlsx files go
+through the calamine engine when ``python-calamine`` is installed (several
+times faster than openpyxl). CSV and Parquet are accepted as well, and Parquet
+is the recommended format for large daily files: see :func:`convert_to_parquet`.
+"""
+
+import os
+
+import pandas as pd
+
+try:
+    import python_calamine  # noqa: F401
+    XLSX_ENGINE = "calamine"
+except ImportError:
+    XLSX_ENGINE = None  # pandas default (openpyxl)
+
+ORDER_COLUMNS = ['Order No', 'Order Date', 'Order Time', 'Picking Zone']
+LOCATION_COLUMNS = ['Order No', 'LAT', 'LON', 'order_datetime', 'Depot']  # Store version extras
+DEPOT_COLUMNS = ['Depot', 'LAT', 'LON', 'Drivers', 'Max Drops']
+COLUMN_DTYPES = {
+    'Depot': str,
+    'Order No': str,
+    'Order Date': str,
+    'Order Time': str,
+    'Picking Zone': str,
+    'LAT': 'float32',  # ~1 m at Bangkok's longitude, below GPS error
+    'LON': 'float32',
+}
+DATETIME_COLUMNS = ['order_datetime']  # CSV has no datetime type
+UPLOAD_TYPES = ["xlsx", "csv", "parquet"]
+
+
+def _source_name(src):
+    # Streamlit's UploadedFile carries the original file name in ``.name``.
+    return getattr(src, "name", src if isinstance(src, (str, os.PathLike)) else "")
+
+
+def _parquet_columns(src, columns):
+    import pyarrow.parquet as pq
+
+    present = set(pq.read_schema(src).names)
+    if hasattr(src, "seek"):
+        src.seek(0)
+    return [c for c in columns if c in present]
+
+
+def read_table(src, columns=None, dtypes=None):
+    """Read an .xlsx, .csv or .parquet file (path or file-like) into a DataFrame.
+
+    ``columns`` projects the read onto those columns (missing ones are
+    skipped) and applies :data:`COLUMN_DTYPES`, updated with ``dtypes``, to them.
+    """
+    name = str(_source_name(src)).lower()
+    if hasattr(src, "seek"):
+        src.seek(0)  # uploads may already have been read on a previous rerun
+
+    usecols = None
+    dtype = None
+    if columns is not None:
+        wanted = set(columns)
+        usecols = wanted.__contains__
+        dtype = {c: t for c, t in {**COLUMN_DTYPES, **(dtypes or {})}.items() if c in wanted}
+
+    if name.endswith(".parquet"):
+        df = pd.read_parquet(src, columns=_parquet_columns(src, columns) if columns else None)
+        return df.astype({c: t for c, t in (dtype or {}).items() if c in df.columns})
+    if name.endswith(".csv"):
+        df = pd.read_csv(src, usecols=usecols, dtype=dtype)
+        for col in DATETIME_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col])
+        return df
+    return pd.read_excel(src, usecols=usecols, dtype=dtype, engine=XLSX_ENGINE)
+
+
+def read_orders(src):
+    """OrderList: 'Order No', 'Order Date', 'Order Time', 'Picking Zone'."""
+    return read_table(src, ORDER_COLUMNS)
+
+
+def read_locations(src):
+    """OrderLocation: 'Order No', 'LAT', 'LON' (+ 'order_datetime' and 'Depot' for stores)."""
+    return read_table(src, LOCATION_COLUMNS)
+
+
+def read_depots(src):
+    """Depot table: 'Depot', 'LAT', 'LON' and optionally 'Drivers', 'Max Drops'."""
+    # depot coordinates stay float64: every order's distance is measured from them
+    return read_table(src, DEPOT_COLUMNS, {'LAT': 'float64', 'LON': 'float64'})
+
+
+def convert_to_parquet(src, dest, columns=None):
+    """Write a (projected) xlsx/csv export as Parquet for faster re-reads."""
+    read_table(src, columns).to_parquet(dest, index=False)
+    return dest
+
+
+def merge_orders(order_df, location_df):
+    """Join OrderList onto OrderLocation by 'Order No'.
+
+    The location table is indexed on 'Order No' once and joined. Without an
+    OrderList (Store version), the location file is expected to carry its own
+    ``order_datetime`` column.
+    """
+    if order_df is None:
+        return location_df.drop_duplicates(subset=['Order No', 'LAT', 'LON'])
+    merged_df = order_df.join(location_df.set_index('Order No'), on='Order No', how='inner')
+    return merged_df.reset_index(drop=True).drop_duplicates(subset=['Order No', 'LAT', 'LON'])
@@ -0,0 +1,153 @@
+"""Solving in a background process, with live progress and cancel.
+
+OR-Tools keeps the GIL for the whole search (the transits are native, so
+nothing calls back into Python), so a solve on a thread would still freeze
+the Streamlit script thread. :class:`SolveJob` runs the solve in a spawned
+process instead. Each improved :class:`~dispatch_planner.routing.Incumbent`
+is streamed back over a queue, and :meth:`SolveJob.cancel` raises a shared
+flag that the search polls (see ``stop`` in
+:func:`~dispatch_planner.routing.solve_routes`): the search ends within
+milliseconds and keeps its best solution, as if it had hit its time limit.
+"""
+
+import multiprocessing
+import queue
+import time
+
+from .routing import PlanningError
+
+
+def _run(results, stop, func, args, kwargs):
+    # runs in the job process
+    def report(incumbent):
+        results.put(('incumbent', incumbent))
+
+    if kwargs.pop('stoppable', True):
+        kwargs['stop'] = lambda: stop.value != 0
+    try:
+        value = func(*args, on_solution=report, **kwargs)
+    except PlanningError as exc:
+        results.put(('error', exc))
+    except Exception as exc:  # report instead of dying silently; tracebacks do not pickle
+        results.put(('error', RuntimeError(f"The solve failed: {exc!r}")))
+    else:
+        results.put(('done', value))
+
+
+class SolveJob:
+    """``func(*args, on_solution=..., stop=..., **kwargs)`` in a spawned process.
+
+    :meth:`poll` collects what the process sent so far: ``incumbents`` grows
+    as the search improves, and :attr:`done` turns True once the value or an
+    error has arrived. ``finish(job, memory)``, if set, post-processes the
+    value once, in this process, when :meth:`result` is first called.
+    ``stoppable=False`` is for functions without a ``stop`` argument (e.g. a
+    portfolio solve): :meth:`cancel` then ends the process instead.
+    """
+
+    def __init__(self, func, *args, stoppable=True, **kwargs):
+        ctx = multiprocessing.get_context("spawn")  # the Streamlit server is multi-threaded
+        self._results = ctx.Queue()
+        self._stop = ctx.RawValue('b', 0)
+        self._process = ctx.Process(target=_run, args=(self._results, self._stop, func, args,
+                                                        {**kwargs, 'stoppable': stoppable}))
+        self.stoppable = stoppable
+        self.finish = None
+        self.incumbents = []
+        self.value = None
+        self.error = None
+        self.cancelled = False
+        self.closed = False
+        self.done = False
+        self.started = time.time()
+        self.ended = None
+        self._process.start()
+
+    @classmethod
+    def completed(cls, value=None, error=None):
+        """A job that is already done, e.g. for a cached plan."""
+        job = cls.__new__(cls)
+        job._process = None
+        job.stoppable = True
+        job.finish = None
+        job.incumbents = []
+        job.value, job.error = value, error
+        job.cancelled = False
+        job.closed = False
+        job.done = True
+        job.started = job.ended = time.time()
+        return job
+
+    def _end(self, value=None, error=None):
+        self.value, self.error = value, error
+        self.done = True
+        self.ended = time.time()
+
+    def poll(self):
+        """Collect incumbents and the outcome sent so far; returns the job."""
+        if self.done or self._process is None:
+            return self
+        while True:
+            try:
+                kind, payload = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'incumbent':
+                self.incumbents.append(payload)
+            else:
+                self._end(*((payload, None) if kind == 'done' else (None, payload)))
+                self._process.join()
+                return self
+        if not self._process.is_alive() and self._results.empty():
+            self._end(error=RuntimeError(f"The solver process exited with code {self._process.exitcode}."))
+        return self
+
+    @property
+    def best(self):
+        """The latest (cheapest) :class:`~dispatch_planner.routing.Incumbent`, or None."""
+        return self.incumbents[-1] if self.incumbents else None
+
+    @property
+    def elapsed(self):
+        return (self.ended or time.time()) - self.started
+
+    def cancel(self):
+        """Stop the search early; the job finishes with its best solution so far."""
+        if self.done:
+            return
+        self.cancelled = True
+        if self.stoppable:
+            self._stop.value = 1
+        else:
+            self._terminate()
+            self._end(error=PlanningError("The solve was cancelled."))
+
+    def wait(self, timeout=None, interval=0.05):
+        """Poll until done or ``timeout`` seconds have passed; returns :attr:`done`."""
+        deadline = None if timeout is None else time.time() + timeout
+        while not self.poll().done and (deadline is None or time.time() < deadline):
+            time.sleep(interval)
+        return self.done
+
+    def result(self, memory=None):
+        """The (finished) value, or raise the job's error. The job must be done."""
+        if not self.poll().done:
+            raise RuntimeError("The job is still running.")
+        if self.error is None and self.finish is not None:
+            finish, self.finish = self.finish, None
+            self.value = finish(self, memory)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def _terminate(self):
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+
+    def close(self):
+        """End the process if it still runs: the job is abandoned and must not be reused."""
+        self._terminate()
+        if not self.done:
+            self._end(error=PlanningError("The solve was abandoned."))
+        self.closed = True
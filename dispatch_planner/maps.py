@@ -0,0 +1,150 @@
+"""Folium maps built from vectorized GeoJSON layers.
+
+One ``folium.CircleMarker`` / ``folium.Marker`` per customer produces many
+megabytes of HTML on large days. Here each map is a handful of layers: one
+GeoJSON FeatureCollection for the customers, one LineString feature per
+driver and one point layer for the stops. Above ``cluster_threshold`` points
+the point layers switch to ``FastMarkerCluster``, which ships the raw
+coordinates once and clusters them in the browser.
+
+This module imports folium, so it is not re-exported from the package root.
+"""
+
+import folium
+import numpy as np
+from folium.plugins import FastMarkerCluster
+
+ZONE_COLORS = {'sameday': 'green', 'nextday': 'red'}
+ROUTE_COLORS = ['red', 'blue', 'green', 'purple', 'orange', 'darkred']
+CLUSTER_THRESHOLD = 2000
+
+# FastMarkerCluster callback: row = [lat, lon, color, popup]
+_CIRCLE_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+                                {radius: 5, color: row[2], fill: true});
+    marker.bindPopup(row[3]);
+    return marker;
+};
+"""
+
+
+def _point_features(lat, lon, properties):
+    """GeoJSON Point features; ``properties`` maps name → per-point array."""
+    names = list(properties)
+    columns = [np.asarray(properties[n]).tolist() for n in names]
+    return [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [x, y]},
+            'properties': dict(zip(names, values)),
+        }
+        for y, x, *values in zip(np.asarray(lat).tolist(), np.asarray(lon).tolist(), *columns)
+    ]
+
+
+def _add_points(fmap, lat, lon, color, popup, cluster_threshold, name):
+    """One GeoJSON circle layer, or a FastMarkerCluster on very large days."""
+    if len(lat) > cluster_threshold:
+        data = list(zip(np.asarray(lat).tolist(), np.asarray(lon).tolist(),
+                        np.asarray(color).tolist(), np.asarray(popup).tolist()))
+        FastMarkerCluster(data, callback=_CIRCLE_CALLBACK, name=name).add_to(fmap)
+        return
+    collection = {
+        'type': 'FeatureCollection',
+        'features': _point_features(lat, lon, {'color': color, 'popup': popup}),
+    }
+    folium.GeoJson(
+        collection,
+        name=name,
+        marker=folium.CircleMarker(radius=5, fill=True),
+        style_function=lambda f: {'color': f['properties']['color'], 'fillColor': f['properties']['color']},
+        popup=folium.GeoJsonPopup(fields=['popup'], labels=False),
+    ).add_to(fmap)
+
+
+def _layer(name, label):
+    # per-depot layer names, so LayerControl can toggle each depot
+    return name if label == 'Depot' else f'{name} ({label})'
+
+
+def customer_map(merged_df, depot, sameday_radius_km=5, cluster_threshold=CLUSTER_THRESHOLD,
+                 fmap=None, label='Depot', **map_kwargs):
+    """Map visualization 1: customers coloured by zone around the depot.
+
+    Pass ``fmap`` to draw onto an existing map (one call per depot).
+    """
+    if fmap is None:
+        fmap = folium.Map(location=depot, zoom_start=12, **map_kwargs)
+    folium.Marker(location=depot, popup=label, icon=folium.Icon(color='blue')).add_to(fmap)
+
+    zone = merged_df['zone'].astype(str)
+    popup = ("Customer: " + merged_df['Order No'].astype(str) + " | " + zone + " | "
+             + merged_df['distance_km'].map('{:.2f}'.format) + " km")
+    _add_points(fmap, merged_df['LAT'].to_numpy(), merged_df['LON'].to_numpy(),
+                zone.map(ZONE_COLORS).to_numpy(), popup.to_numpy(), cluster_threshold,
+                _layer('Customers', label))
+
+    # เพิ่มวงรัศมี sameday (เส้นขอบโซน sameday)
+    folium.Circle(location=depot, radius=sameday_radius_km * 1000, color='gray', fill=False).add_to(fmap)
+    return fmap
+
+
+def route_map(routes, depot, cluster_threshold=CLUSTER_THRESHOLD, fmap=None, label='Depot',
+              **map_kwargs):
+    """Map visualization 2: one polyline feature per driver plus the stops.
+
+    Pass ``fmap`` to draw onto an existing map (one call per depot).
+    """
+    if fmap is None:
+        fmap = folium.Map(location=depot, zoom_start=12, **map_kwargs)
+    folium.Marker(depot, popup=label, icon=folium.Icon(color='black')).add_to(fmap)
+    prefix = '' if label == 'Depot' else f'{label} · '
+
+    colors = np.array(ROUTE_COLORS, dtype=object)
+    lines = []
+    for vehicle_id in range(routes.num_vehicles):
+        coords = routes.coords(vehicle_id)
+        lines.append({
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': coords[:, ::-1].tolist()},
+            'properties': {'driver': prefix + routes.driver(vehicle_id),
+                           'color': ROUTE_COLORS[vehicle_id % len(ROUTE_COLORS)]},
+        })
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': lines},
+        name=_layer('Routes', label),
+        style_function=lambda f: {'color': f['properties']['color'], 'weight': 5, 'opacity': 0.8},
+        popup=folium.GeoJsonPopup(fields=['driver'], labels=False),
+    ).add_to(fmap)
+
+    vehicle = routes.vehicle
+    popup = [f"{prefix}Driver {v + 1} - Stop {d}"
+             for v, d in zip(vehicle.tolist(), routes.drop_no.tolist())]
+    _add_points(fmap, routes.lat, routes.lon, colors[vehicle % len(ROUTE_COLORS)], popup,
+                cluster_threshold, _layer('Stops', label))
+    return fmap
+
+
+def _depots_map(result, map_kwargs):
+    center = (result.depots['LAT'].mean(), result.depots['LON'].mean())
+    return folium.Map(location=center, zoom_start=11, **map_kwargs)
+
+
+def depots_customer_map(result, sameday_radius_km=5, cluster_threshold=CLUSTER_THRESHOLD,
+                        **map_kwargs):
+    """:func:`customer_map` for every depot of a :class:`~dispatch_planner.multidepot.MultiDepotResult`."""
+    fmap = _depots_map(result, map_kwargs)
+    for name, plan in result.results.items():
+        customer_map(plan.orders, plan.depot, sameday_radius_km, cluster_threshold, fmap, name)
+    folium.LayerControl().add_to(fmap)
+    return fmap
+
+
+def depots_route_map(result, cluster_threshold=CLUSTER_THRESHOLD, **map_kwargs):
+    """:func:`route_map` for every depot of a :class:`~dispatch_planner.multidepot.MultiDepotResult`."""
+    fmap = _depots_map(result, map_kwargs)
+    for name, plan in result.results.items():
+        route_map(plan.routes, plan.depot, cluster_threshold, fmap, name)
+    folium.LayerControl().add_to(fmap)
+    return fmap
@@ -0,0 +1,131 @@
+"""Wall time and peak memory per planning stage.
+
+``tracemalloc`` sees every Python, NumPy and pandas allocation but not the
+OR-Tools C++ heap or cluster worker processes, so the process high-water mark
+(``ru_maxrss``) is recorded alongside where the platform provides it.
+
+Tracing slows the pandas stages down; ``MemoryReport(trace=False)`` only
+times the stages and reads the high-water mark, cheap enough to leave on in
+the apps. Every finished stage and every :meth:`MemoryReport.note` is also
+logged as one JSON object on the ``dispatch_planner.perf`` logger, for
+headless runs (``dispatch-plan --log-json``).
+"""
+
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("dispatch_planner.perf")
+MIB = 1024 * 1024
+
+
+@dataclass
+class StageMemory:
+    stage: str
+    peak_bytes: int      # highest traced allocation above the stage's starting point (None untraced)
+    retained_bytes: int  # still allocated when the stage finished (None untraced)
+    max_rss_bytes: int   # process high-water mark so far (None if unavailable)
+    seconds: float = None  # wall time
+
+
+def max_rss_bytes():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # Linux reports KiB
+
+
+def frame_bytes(df):
+    """Deep memory footprint of a DataFrame (object columns included)."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _mib(num_bytes, digits):
+    return None if num_bytes is None else round(num_bytes / MIB, digits)
+
+
+class MemoryReport:
+    """Collects one :class:`StageMemory` per ``with report.stage(name):`` block.
+
+    ``notes`` holds facts about the run recorded by the stages themselves,
+    e.g. the matrix size and the solver's search statistics.
+    """
+
+    def __init__(self, trace=True):
+        self.trace = trace
+        self.stages = []
+        self.frames = {}
+        self.notes = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = self.trace and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if self.trace:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            seconds = time.perf_counter() - t0
+            peak = retained = None
+            if self.trace:
+                current, peak = tracemalloc.get_traced_memory()
+                peak, retained = peak - before, current - before
+            if started:
+                tracemalloc.stop()
+            record = StageMemory(name, peak, retained, max_rss_bytes(), seconds)
+            self.stages.append(record)
+            self._log(event="stage", **asdict(record))
+
+    def add_frame(self, name, df):
+        self.frames[name] = frame_bytes(df)
+
+    def note(self, **fields):
+        self.notes.update(fields)
+        self._log(event="note", **fields)
+
+    def _log(self, **event):
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({'time': round(time.time(), 3), **event}, default=str))
+
+    def total_seconds(self):
+        return sum(s.seconds for s in self.stages)
+
+    def to_frame(self):
+        return pd.DataFrame({
+            'Stage': [s.stage for s in self.stages],
+            'Seconds': [round(s.seconds, 3) for s in self.stages],
+            'Peak (MiB)': [_mib(s.peak_bytes, 2) for s in self.stages],
+            'Retained (MiB)': [_mib(s.retained_bytes, 2) for s in self.stages],
+            'Max RSS (MiB)': [_mib(s.max_rss_bytes, 1) for s in self.stages],
+        })
+
+    def to_dict(self):
+        """Stages, frame sizes and notes as plain JSON-able data."""
+        return {'stages': [asdict(s) for s in self.stages], 'frames': dict(self.frames),
+                'notes': dict(self.notes)}
+
+
+def track(report, name):
+    """``report.stage(name)``, or a no-op when ``report`` is None."""
+    return report.stage(name) if report is not None else nullcontext()
+
+
+def note(report, **fields):
+    """``report.note(**fields)``, or nothing when ``report`` is None."""
+    if report is not None:
+        report.note(**fields)
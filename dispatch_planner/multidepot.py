@@ -0,0 +1,191 @@
+"""Multi-depot planning: one routing model per depot, solved in parallel.
+
+Orders go to the depot named in their 'Depot' column (Store version location
+files may carry one) or, failing that, to the nearest depot. Each depot is
+then planned on its own, exactly as :func:`~dispatch_planner.engine.plan_routes`
+would with that depot, its own driver count and ``max_drops``: the sameday
+radius, matrix and delivery windows are all per depot. Matrices are built in
+this process (so a distance store or road network is not shipped to the
+workers) and the per-depot VRPs are solved concurrently in a process pool.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .distance import haversine_km
+from .engine import (
+    SERVICE_TIME_S,
+    SPEED_KMPH,
+    PlanningError,
+    assemble_result,
+    build_matrix,
+    build_time_matrix,
+    build_time_windows,
+    check_orders,
+    load_orders,
+    solve_routes,
+)
+from .ingest import merge_orders
+from .memory import note, track
+from .preprocess import SAMEDAY_RADIUS_KM
+
+DEPOT_COLUMN = 'Depot'
+
+
+@dataclass
+class MultiDepotResult:
+    results: dict          # depot name → PlanResult, in depot table order
+    depots: pd.DataFrame   # Depot / LAT / LON / Drivers / Max Drops as planned
+
+    def _stack(self, frames):
+        frames = [df.assign(Depot=name) for name, df in frames]
+        if not frames:
+            return pd.DataFrame(columns=[DEPOT_COLUMN])
+        stacked = pd.concat(frames, ignore_index=True)
+        return stacked[[DEPOT_COLUMN] + [c for c in stacked.columns if c != DEPOT_COLUMN]]
+
+    @property
+    def orders(self):
+        return self._stack((name, r.orders.drop(columns=DEPOT_COLUMN, errors='ignore'))
+                           for name, r in self.results.items())
+
+    def summary(self):
+        """The Routing Summary of every depot, with a leading 'Depot' column."""
+        return self._stack((name, r.summary()) for name, r in self.results.items())
+
+    def stats(self):
+        """Drops and distance per depot and driver."""
+        return self._stack((name, r.routes.stats()) for name, r in self.results.items())
+
+    def unassigned(self):
+        """Orders no depot's routes could serve, with a leading 'Depot' column."""
+        return self._stack((name, r.unassigned()) for name, r in self.results.items())
+
+    def late(self):
+        """Orders routed past their deadline, with a leading 'Depot' column."""
+        return self._stack((name, r.late()) for name, r in self.results.items())
+
+    def zone_counts(self):
+        counts = {}
+        for result in self.results.values():
+            for zone, n in result.zone_counts().items():
+                counts[zone] = counts.get(zone, 0) + n
+        return counts
+
+
+def normalize_depots(depots, num_drivers=3, max_drops=2):
+    """Depot table with unique string names and per-depot 'Drivers' / 'Max Drops'.
+
+    Missing counts default to ``num_drivers`` / ``max_drops``.
+    """
+    depots = pd.DataFrame(depots).reset_index(drop=True)
+    if DEPOT_COLUMN not in depots.columns:
+        depots[DEPOT_COLUMN] = [f"Depot {i + 1}" for i in range(len(depots))]
+    depots[DEPOT_COLUMN] = depots[DEPOT_COLUMN].astype(str)
+    if depots[DEPOT_COLUMN].duplicated().any():
+        raise ValueError("Depot names must be unique.")
+    if len(depots) == 0:
+        raise ValueError("The depot table is empty.")
+    for column, default in (('Drivers', num_drivers), ('Max Drops', max_drops)):
+        values = depots[column] if column in depots.columns else pd.Series(np.nan, index=depots.index)
+        depots[column] = values.fillna(default).astype(int)
+    depots['LAT'] = depots['LAT'].astype(np.float64)
+    depots['LON'] = depots['LON'].astype(np.float64)
+    return depots[[DEPOT_COLUMN, 'LAT', 'LON', 'Drivers', 'Max Drops']]
+
+
+def assign_depots(merged_df, depots):
+    """Index into ``depots`` for every order: its 'Depot' column, else the nearest depot."""
+    # orders × depots is small (dozens of depots); haversine is plenty to pick the nearest
+    dist = haversine_km(
+        merged_df['LAT'].to_numpy(dtype=np.float64)[:, None],
+        merged_df['LON'].to_numpy(dtype=np.float64)[:, None],
+        depots['LAT'].to_numpy()[None, :], depots['LON'].to_numpy()[None, :],
+    )
+    nearest = dist.argmin(axis=1)
+    if DEPOT_COLUMN not in merged_df.columns:
+        return nearest
+    named = pd.Index(depots[DEPOT_COLUMN]).get_indexer(merged_df[DEPOT_COLUMN].astype(str))
+    return np.where(named >= 0, named, nearest)
+
+
+def _solve_depot(distance_matrix, num_drivers, max_drops, options, time_windows, allow_unassigned):
+    # runs in a worker process
+    return solve_routes(distance_matrix, num_drivers, max_drops, options, time_windows=time_windows,
+                        allow_unassigned=allow_unassigned)
+
+
+def _named(name, func, *args):
+    """``func(*args)``, with planning errors prefixed by the depot name."""
+    try:
+        return func(*args)
+    except PlanningError as exc:
+        raise type(exc)(f"{name}: {exc}") from exc
+
+
+def plan_depots(orders, locations, depots, num_drivers=3, max_drops=2,
+                sameday_radius_km=SAMEDAY_RADIUS_KM, speed_kmph=SPEED_KMPH, workers=None,
+                search=None, memory=None, store=None, network=None, service_time_s=SERVICE_TIME_S,
+                allow_unassigned=False):
+    """Plan every depot of ``depots`` and return a :class:`MultiDepotResult`.
+
+    ``depots`` is a table with 'LAT', 'LON' and optionally 'Depot', 'Drivers'
+    and 'Max Drops' (see :func:`~dispatch_planner.ingest.read_depots`);
+    ``num_drivers`` / ``max_drops`` fill in missing counts. ``workers=1``
+    solves in-process. ``search`` applies to every depot, so a time limit
+    bounds each depot's solve, not the total. Raises :class:`PlanningError`,
+    prefixed with the depot name, when a depot's orders cannot be routed,
+    unless ``allow_unassigned`` plans each depot partially instead. As in
+    :func:`~dispatch_planner.engine.plan_routes`, orders no driver can serve
+    fail before any depot is solved.
+    """
+    depots = normalize_depots(depots, num_drivers, max_drops)
+    names = depots[DEPOT_COLUMN].tolist()
+    points = list(zip(depots['LAT'].tolist(), depots['LON'].tolist()))
+    with track(memory, "preprocess"):
+        merged_df = merge_orders(orders, locations).reset_index(drop=True)
+        labels = assign_depots(merged_df, depots)
+        frames = [load_orders(None, merged_df[labels == k].reset_index(drop=True), point,
+                              sameday_radius_km)
+                  for k, point in enumerate(points)]
+
+    jobs = []
+    with track(memory, "matrix"):
+        for name, point, n, drops, (_, df_zone) in zip(names, points, depots['Drivers'].tolist(),
+                                                        depots['Max Drops'].tolist(), frames):
+            distance_matrix = build_matrix(df_zone, point, store, network)
+            time_matrix = build_time_matrix(df_zone, point, network)
+            time_windows = build_time_windows(df_zone, speed_kmph, service_time_s, time_matrix)
+            if not allow_unassigned:
+                _named(name, check_orders, df_zone, distance_matrix, time_windows)
+            jobs.append((distance_matrix, n, drops, search, time_windows, allow_unassigned))
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    with track(memory, "solve"):
+        if workers <= 1 or len(jobs) <= 1:
+            solved = [_named(name, _solve_depot, *job) for name, job in zip(names, jobs)]
+        else:
+            # spawn: the Streamlit server is multi-threaded, so forking it is unsafe
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                futures = [pool.submit(_solve_depot, *job) for job in jobs]
+                try:
+                    solved = [_named(name, f.result) for name, f in zip(names, futures)]
+                except PlanningError:
+                    for f in futures:
+                        f.cancel()
+                    raise
+
+    note(memory, depots={name: {'sameday_orders': len(df_zone), 'solver': routes.search}
+                         for name, (_, df_zone), routes in zip(names, frames, solved)})
+    with track(memory, "assemble"):
+        results = {
+            name: assemble_result(merged, df_zone, routes, point, speed_kmph)
+            for name, point, (merged, df_zone), routes in zip(names, points, frames, solved)
+        }
+    return MultiDepotResult(results, depots)
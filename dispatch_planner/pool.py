@@ -0,0 +1,87 @@
+"""Solver process pools whose workers share one distance matrix.
+
+Fleet sweeps and multi-start portfolios solve the same matrix many times
+over. :func:`shared_matrix_pool` copies the matrix (and a road network's
+travel-time matrix) once into ``multiprocessing.shared_memory``; every
+worker maps it in the pool initializer instead of unpickling a copy per
+task. Tasks read it back through :func:`worker_state`.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+# worker-process state set by _attach: the mapped arrays, their blocks and the solve settings
+_state = {}
+
+
+def worker_state():
+    """``{'matrix', 'time_windows', 'options'}`` of the current pool worker."""
+    return _state
+
+
+def local_state(distance_matrix, time_windows=None, options=None):
+    """The same mapping for solving in-process."""
+    return {'matrix': distance_matrix, 'time_windows': time_windows, 'options': options}
+
+
+def _share(array):
+    """Copy ``array`` into a new shared memory block; returns the block and its spec."""
+    array = np.ascontiguousarray(array)
+    shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _attach(matrix_spec, travel_spec, time_windows, options):
+    # pool initializer: map the parent's blocks once per worker
+    arrays = []
+    for spec in (matrix_spec, travel_spec):
+        if spec is None:
+            arrays.append(None)
+            continue
+        name, shape, dtype = spec
+        # spawned workers share the parent's resource tracker; the parent unlinks the block
+        shm = SharedMemory(name=name)
+        _state.setdefault('blocks', []).append(shm)
+        arrays.append(np.ndarray(shape, dtype, buffer=shm.buf))
+    matrix, travel_s = arrays
+    if time_windows is not None and travel_s is not None:
+        time_windows = replace(time_windows, travel_s=travel_s)
+    _state.update(local_state(matrix, time_windows, options))
+
+
+def default_workers(num_tasks):
+    return max(1, min(num_tasks, os.cpu_count() or 1))
+
+
+@contextmanager
+def shared_matrix_pool(distance_matrix, time_windows=None, options=None, workers=None):
+    """A spawn ``ProcessPoolExecutor`` whose workers see the matrix via :func:`worker_state`.
+
+    The shared blocks are unlinked when the pool is closed.
+    """
+    travel_s = time_windows.travel_s if time_windows is not None else None
+    blocks = []
+    try:
+        shm, matrix_spec = _share(np.asarray(distance_matrix, dtype=np.int32))
+        blocks.append(shm)
+        travel_spec = None
+        if travel_s is not None:
+            shm, travel_spec = _share(np.asarray(travel_s, dtype=np.int32))
+            blocks.append(shm)
+            time_windows = replace(time_windows, travel_s=None)  # workers map the shared copy
+        # spawn: the Streamlit server is multi-threaded, so forking it is unsafe
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_attach,
+                                 initargs=(matrix_spec, travel_spec, time_windows, options)) as pool:
+            yield pool
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
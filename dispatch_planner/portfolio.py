@@ -0,0 +1,124 @@
+"""Multi-start solving: a portfolio of search configurations, best one wins.
+
+One ``SolveWithParameters`` call runs on one core, and which first-solution
+strategy ends up with the best local optimum varies from day to day.
+:func:`solve_portfolio` runs several first-solution strategies (times
+optionally several local-search metaheuristics) concurrently, each with the
+caller's time limit, so the portfolio takes the same wall-clock time as a
+single solve on a machine with enough cores. The lowest-cost solution is kept
+and the table of runs records which configuration won.
+
+OR-Tools' own SWEEP strategy needs a sweep arranger, which the Python wrapper
+does not expose, so ``"sweep"`` here seeds the search with routes built from
+orders sorted by angle around the depot (warm start). If those routes violate
+a delivery window or the route length cap, that run falls back to
+path-cheapest-arc, and the table says so.
+"""
+
+import time
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from .decompose import local_xy
+from .pool import default_workers, local_state, shared_matrix_pool, worker_state
+from .routing import WINDOW_INSERTION, CapacityError, NoSolutionError, SearchOptions, solve_routes
+
+SWEEP = "sweep"
+DEFAULT_PORTFOLIO = ("path_cheapest_arc", "savings", SWEEP, "christofides",
+                     "parallel_cheapest_insertion", WINDOW_INSERTION)
+
+
+def sweep_routes(points, num_drivers, max_drops, time_windows=None):
+    """Seed routes: customers by angle around the depot, ``max_drops`` per driver.
+
+    ``points[0]`` is the depot. Within a route, stops are visited in order time
+    when there are delivery windows, else by angle. Customers beyond the
+    ``num_drivers * max_drops`` drop slots are left out of the seed.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    x, y = local_xy(points[1:, 0], points[1:, 1], points[0])
+    by_angle = np.argsort(np.arctan2(y, x), kind="stable")
+    routes = [[] for _ in range(int(num_drivers))]
+    for vehicle_id, start in enumerate(range(0, len(by_angle), int(max_drops))):
+        if vehicle_id == len(routes):
+            break
+        rows = by_angle[start:start + int(max_drops)]
+        if time_windows is not None:
+            rows = rows[np.argsort(np.asarray(time_windows.ordered_s)[rows], kind="stable")]
+        routes[vehicle_id] = (rows + 1).tolist()
+    return routes
+
+
+def _solve_config(num_drivers, max_drops, first_solution, metaheuristic, initial_routes,
+                  allow_unassigned=False, state=None):
+    """``(routes, status, seconds)`` for one configuration; ``state`` defaults to the worker's."""
+    state = worker_state() if state is None else state
+    options = replace(state['options'], metaheuristic=metaheuristic,
+                      first_solution="path_cheapest_arc" if first_solution == SWEEP else first_solution)
+    started = time.perf_counter()
+    try:
+        routes = solve_routes(state['matrix'], num_drivers, max_drops, options,
+                              initial_routes=initial_routes, time_windows=state['time_windows'],
+                              allow_unassigned=allow_unassigned)
+    except NoSolutionError as exc:
+        return None, "timed out" if exc.timed_out else "no solution", time.perf_counter() - started
+    status = "solved"
+    if initial_routes is not None and not routes.warm_started:
+        status = "seed infeasible, path_cheapest_arc used"
+    return routes, status, time.perf_counter() - started
+
+
+def solve_portfolio(distance_matrix, num_drivers, max_drops, options=None,
+                    strategies=DEFAULT_PORTFOLIO, metaheuristics=None, points=None,
+                    time_windows=None, workers=None, allow_unassigned=False):
+    """Solve every strategy × metaheuristic configuration; return ``(routes, runs)``.
+
+    ``options`` (:class:`SearchOptions`) supplies the limits of each run;
+    ``metaheuristics`` defaults to its metaheuristic alone. The ``"sweep"``
+    strategy needs the ``points`` (depot first) and is skipped without them.
+    ``runs`` has one row per configuration, cheapest first, with 'Best' marking
+    the routes returned. Raises :class:`NoSolutionError` when no run succeeds.
+    ``allow_unassigned`` makes every run a partial plan, see
+    :func:`~dispatch_planner.routing.solve_routes`.
+    """
+    options = options or SearchOptions()
+    metaheuristics = metaheuristics or (options.metaheuristic,)
+    configs = [(s, m) for s in strategies for m in metaheuristics if s != SWEEP or points is not None]
+    if not configs:
+        raise ValueError("The portfolio has no configuration to run.")
+    total_orders = len(distance_matrix) - 1
+    max_capacity = int(num_drivers) * int(max_drops)
+    if total_orders > max_capacity and not allow_unassigned:
+        raise CapacityError(f"Orders ({total_orders}) exceed driver capacity ({max_capacity}).")
+    seed = sweep_routes(points, num_drivers, max_drops, time_windows) if points is not None else None
+    jobs = [(num_drivers, max_drops, s, m, seed if s == SWEEP else None, allow_unassigned)
+            for s, m in configs]
+
+    workers = workers or default_workers(len(jobs))
+    if workers <= 1 or len(jobs) <= 1:
+        state = local_state(distance_matrix, time_windows, options)
+        solved = [_solve_config(*job, state) for job in jobs]
+    else:
+        with shared_matrix_pool(distance_matrix, time_windows, options, workers) as pool:
+            futures = [pool.submit(_solve_config, *job) for job in jobs]
+            solved = [f.result() for f in futures]
+
+    runs = pd.DataFrame({
+        'First solution': [s for s, _ in configs],
+        'Local search': [m for _, m in configs],
+        'Cost': pd.array([r.cost if r is not None else None for r, _, _ in solved], dtype='Int64'),
+        'Distance (km)': [r.route_distance_m.sum() / 1000 if r is not None else np.nan
+                          for r, _, _ in solved],
+        'Seconds': [round(seconds, 2) for _, _, seconds in solved],
+        'Status': [status for _, status, _ in solved],
+    })
+    if runs['Cost'].isna().all():
+        if time_windows is not None:
+            raise NoSolutionError("No routing solution meets every delivery window.")
+        raise NoSolutionError("No routing solution found.")
+    best = int(runs['Cost'].astype('float64').idxmin())
+    runs['Best'] = runs.index == best
+    runs = runs.sort_values('Cost', kind='stable', na_position='last').reset_index(drop=True)
+    return solved[best][0], runs
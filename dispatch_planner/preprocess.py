@@ -0,0 +1,77 @@
+"""Zone classification and delivery deadlines for merged orders.
+
+Every step is column-wise: no ``DataFrame.apply`` over rows. 'Picking Zone'
+and 'zone' are stored as categoricals; the per-temperature True/False columns
+are only built for display by :func:`zone_flags`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .distance import vincenty_km
+
+DEFAULT_DEPOT = (13.737469640166223, 100.63594745151381)
+SAMEDAY_RADIUS_KM = 5
+DELIVERY_WINDOW = pd.Timedelta(hours=3)
+
+# ✅ Map Picking Zone code → readable name
+ZONE_MAP = {
+    'AM': 'Ambient', 'AS': 'Ambient', 'AH': 'Ambient',
+    'VM': 'VM+01 C',
+    '20F': '20 C',
+    '01F': 'Frozen', 'FZ': 'Frozen'
+}
+ZONE_TYPES = ['Ambient', 'VM+01 C', '20 C', 'Frozen']
+ZONES = pd.CategoricalDtype(['sameday', 'nextday'])
+
+
+def map_picking_zones(merged_df):
+    """Translate Picking Zone codes into a categorical of readable names.
+
+    Unknown codes are kept as they are, as extra categories after ZONE_TYPES.
+    """
+    if 'Picking Zone' in merged_df.columns:
+        names = merged_df['Picking Zone'].map(ZONE_MAP).fillna(merged_df['Picking Zone'])
+        extra = sorted(set(names.dropna().unique()) - set(ZONE_TYPES))
+        merged_df['Picking Zone'] = names.astype(pd.CategoricalDtype(ZONE_TYPES + extra))
+    return merged_df
+
+
+def zone_flags(picking_zone):
+    """One True/False column per ZONE_TYPES entry, for the summary table."""
+    zone = pd.Series(picking_zone)
+    return pd.DataFrame({z: (zone == z).to_numpy() for z in ZONE_TYPES}, index=zone.index)
+
+
+def add_order_datetime(merged_df):
+    merged_df['order_datetime'] = pd.to_datetime(
+        merged_df['Order Date'].astype(str) + ' ' + merged_df['Order Time'].astype(str),
+        format='%d/%m/%Y %H:%M:%S', errors='coerce'
+    )
+    return merged_df
+
+
+def classify_zones(merged_df, depot, sameday_radius_km=SAMEDAY_RADIUS_KM):
+    """Add distance_km, zone (sameday/nextday) and delivery_deadline.
+
+    ``distance_km`` is the WGS-84 depot distance (matches ``geopy.geodesic``
+    to well under a millimetre); sameday orders get ``order_datetime + 3 h``.
+    """
+    merged_df['distance_km'] = vincenty_km(
+        merged_df['LAT'].to_numpy(dtype=np.float64), merged_df['LON'].to_numpy(dtype=np.float64),
+        depot[0], depot[1],
+    )
+    sameday = merged_df['distance_km'].to_numpy() <= sameday_radius_km
+    merged_df['zone'] = pd.Categorical.from_codes(np.where(sameday, 0, 1), dtype=ZONES)
+    merged_df['delivery_deadline'] = (
+        pd.to_datetime(merged_df['order_datetime']) + DELIVERY_WINDOW
+    ).where(sameday)
+    return merged_df
+
+
+def prepare_orders(merged_df, depot, sameday_radius_km=SAMEDAY_RADIUS_KM):
+    """Full preprocessing stage for a merged order table (modified in place)."""
+    merged_df = map_picking_zones(merged_df)
+    if 'Order Date' in merged_df.columns and 'Order Time' in merged_df.columns:
+        merged_df = add_order_datetime(merged_df)
+    return classify_zones(merged_df, depot, sameday_radius_km)
@@ -0,0 +1,205 @@
+"""Offline road-network distances and travel times.
+
+Straight-line distance at a fixed 30 km/h is a poor fit for Bangkok roads.
+:class:`RoadNetwork` loads a preprocessed road graph (e.g. exported from an
+OSM extract) and computes many-to-many shortest paths with SciPy's
+``csgraph.dijkstra``, one C-level Dijkstra per unique source, in batches.
+
+Input tables (``.csv``/``.parquet``/``.xlsx``):
+
+- nodes: ``node``, ``lat``, ``lon``
+- edges: ``u``, ``v``, ``length_m`` and optionally ``speed_kmph`` and
+  ``oneway`` (edges are two-way unless ``oneway`` is true)
+
+The parsed graph is cached next to the edges file as an uncompressed ``.npz``
+so later runs start in milliseconds. SciPy is an optional dependency, only
+needed when a road network is used.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .ingest import read_table
+
+DEFAULT_ROAD_SPEED_KMPH = 30  # edges without a speed
+ACCESS_SPEED_KMPH = 10        # point → nearest graph node (soi, car park, last metres)
+UNREACHABLE = 10 ** 9         # stands in for "no path"; far beyond any route cap
+BATCH_SOURCES = 64            # Dijkstra sources per batch (bounds memory to 64 × nodes)
+
+
+def _csgraph():
+    try:
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import dijkstra
+        from scipy.spatial import cKDTree
+    except ImportError as exc:
+        raise ImportError("The road-network backend needs SciPy: pip install scipy") from exc
+    return csr_matrix, dijkstra, cKDTree
+
+
+class RoadNetwork:
+    """Directed road graph with ``length_m`` and ``time_s`` edge weights.
+
+    :meth:`matrix_m` plugs in wherever a :func:`~dispatch_planner.distance.distance_matrix_m`
+    matrix is used (depot at row 0); :meth:`time_matrix_s` gives the matching
+    travel times used for ETAs.
+    """
+
+    def __init__(self, node_ids, lat, lon, u, v, length_m, time_s):
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.lat = np.asarray(lat, dtype=np.float32)
+        self.lon = np.asarray(lon, dtype=np.float32)
+        self.u = np.asarray(u, dtype=np.int32)
+        self.v = np.asarray(v, dtype=np.int32)
+        self.length_m = np.asarray(length_m, dtype=np.float32)
+        self.time_s = np.asarray(time_s, dtype=np.float32)
+        self._graphs = {}
+        self._tree = None
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    # -- loading ----------------------------------------------------------------
+
+    @classmethod
+    def from_tables(cls, nodes, edges, default_speed_kmph=DEFAULT_ROAD_SPEED_KMPH):
+        nodes = nodes.drop_duplicates('node').sort_values('node')
+        node_ids = nodes['node'].to_numpy(dtype=np.int64)
+
+        speed = (edges['speed_kmph'].fillna(default_speed_kmph) if 'speed_kmph' in edges.columns
+                 else pd.Series(default_speed_kmph, index=edges.index))
+        oneway = (edges['oneway'].fillna(False).astype(bool) if 'oneway' in edges.columns
+                  else pd.Series(False, index=edges.index))
+        forward = pd.DataFrame({
+            'u': edges['u'].to_numpy(dtype=np.int64),
+            'v': edges['v'].to_numpy(dtype=np.int64),
+            'length_m': edges['length_m'].to_numpy(dtype=np.float64),
+            'time_s': (edges['length_m'] / (speed / 3.6)).to_numpy(dtype=np.float64),
+        })
+        backward = forward[~oneway.to_numpy()].rename(columns={'u': 'v', 'v': 'u'})
+        arcs = pd.concat([forward, backward], ignore_index=True)
+
+        # node ids → 0..n-1; arcs to unknown nodes are dropped
+        u_ids, v_ids = arcs['u'].to_numpy(), arcs['v'].to_numpy()
+        u = np.searchsorted(node_ids, u_ids).clip(max=len(node_ids) - 1)
+        v = np.searchsorted(node_ids, v_ids).clip(max=len(node_ids) - 1)
+        known = (node_ids[u] == u_ids) & (node_ids[v] == v_ids)
+        arcs = arcs.assign(u=u, v=v)[known]
+        # parallel arcs: keep the shortest and the fastest independently
+        arcs = arcs.groupby(['u', 'v'], sort=True, as_index=False).min()
+        return cls(node_ids, nodes['lat'], nodes['lon'], arcs['u'], arcs['v'],
+                   arcs['length_m'], arcs['time_s'])
+
+    @classmethod
+    def from_files(cls, nodes_path, edges_path, cache=True):
+        """Read node/edge tables, using (and refreshing) the ``<edges>.npz`` cache."""
+        cache_path = f"{edges_path}.npz"
+        if cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= max(
+            os.path.getmtime(nodes_path), os.path.getmtime(edges_path)
+        ):
+            return cls.load(cache_path)
+        network = cls.from_tables(read_table(nodes_path), read_table(edges_path))
+        if cache:
+            network.save(cache_path)
+        return network
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, node_ids=self.node_ids, lat=self.lat, lon=self.lon, u=self.u, v=self.v,
+                     length_m=self.length_m, time_s=self.time_s)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(*(data[k] for k in ("node_ids", "lat", "lon", "u", "v", "length_m", "time_s")))
+
+    # -- queries ----------------------------------------------------------------
+
+    def _xy(self, lat, lon):
+        # equirectangular metres around the graph's mean latitude; fine at city scale
+        lat0 = np.radians(float(self.lat.mean()))
+        return np.column_stack([np.radians(lon) * 6_371_000 * np.cos(lat0),
+                                np.radians(lat) * 6_371_000])
+
+    def snap(self, points):
+        """Nearest graph node and straight-line metres to it, for every ``(lat, lon)``."""
+        _, _, cKDTree = _csgraph()
+        if self._tree is None:
+            self._tree = cKDTree(self._xy(self.lat.astype(np.float64), self.lon.astype(np.float64)))
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        access_m, nodes = self._tree.query(self._xy(points[:, 0], points[:, 1]))
+        return nodes.astype(np.int64), access_m
+
+    def _graph(self, weight, reverse=False):
+        key = (weight, reverse)
+        if key not in self._graphs:
+            csr_matrix, _, _ = _csgraph()
+            # zero weights would read as "no edge" in a sparse graph
+            data = np.maximum(getattr(self, weight).astype(np.float64), 1e-3)
+            u, v = (self.v, self.u) if reverse else (self.u, self.v)
+            self._graphs[key] = csr_matrix((data, (u, v)), shape=(len(self), len(self)))
+        return self._graphs[key]
+
+    def _between(self, sources, targets, weight, reverse=False):
+        """Graph distances sources × targets (node indices), batched by unique source."""
+        _, dijkstra, _ = _csgraph()
+        uniq, inverse = np.unique(sources, return_inverse=True)
+        graph = self._graph(weight, reverse)
+        out = np.empty((len(uniq), len(targets)))
+        for start in range(0, len(uniq), BATCH_SOURCES):
+            rows = dijkstra(graph, directed=True, indices=uniq[start:start + BATCH_SOURCES])
+            out[start:start + BATCH_SOURCES] = rows[:, targets]
+        return out[inverse]
+
+    @staticmethod
+    def _finish(values):
+        values[~np.isfinite(values)] = UNREACHABLE
+        return np.rint(np.minimum(values, UNREACHABLE)).astype(np.int32)
+
+    def _matrix(self, points, weight, access_scale):
+        nodes, access_m = self.snap(points)
+        if len(nodes) == 0:
+            return np.zeros((0, 0), dtype=np.int32)
+        access = access_m * access_scale
+        full = self._between(nodes, nodes, weight) + access[:, None] + access[None, :]
+        np.fill_diagonal(full, 0)
+        return self._finish(full)
+
+    def _extend(self, matrix, points, new_points, weight, access_scale):
+        """Add rows/columns for ``new_points``: Dijkstra from the new nodes only.
+
+        Old → new paths come from searching the reversed graph from the new nodes.
+        """
+        old_nodes, old_access = self.snap(points)
+        new_nodes, new_access = self.snap(new_points)
+        if len(new_nodes) == 0:
+            return np.asarray(matrix, dtype=np.int32)
+        old_access, new_access = old_access * access_scale, new_access * access_scale
+        nodes = np.r_[old_nodes, new_nodes]
+        access = np.r_[old_access, new_access]
+
+        new_rows = self._between(new_nodes, nodes, weight) + new_access[:, None] + access[None, :]
+        new_rows[:, len(old_nodes):][np.diag_indices(len(new_nodes))] = 0
+        old_to_new = (self._between(new_nodes, old_nodes, weight, reverse=True).T
+                      + old_access[:, None] + new_access[None, :])
+        return np.block([[np.asarray(matrix, dtype=np.int32), self._finish(old_to_new)],
+                         [self._finish(new_rows)]])
+
+    def matrix_m(self, points):
+        """int32 shortest road distance in metres (access legs included)."""
+        return self._matrix(points, "length_m", 1.0)
+
+    def time_matrix_s(self, points):
+        """int32 fastest travel time in seconds (access legs at ACCESS_SPEED_KMPH)."""
+        return self._matrix(points, "time_s", 3.6 / ACCESS_SPEED_KMPH)
+
+    def extend_matrix_m(self, distance_matrix, points, new_points):
+        """:meth:`matrix_m` of ``points + new_points``, reusing ``distance_matrix``."""
+        return self._extend(distance_matrix, points, new_points, "length_m", 1.0)
+
+    def extend_time_matrix_s(self, time_matrix, points, new_points):
+        """:meth:`time_matrix_s` of ``points + new_points``, reusing ``time_matrix``."""
+        return self._extend(time_matrix, points, new_points, "time_s", 3.6 / ACCESS_SPEED_KMPH)
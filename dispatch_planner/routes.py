@@ -0,0 +1,251 @@
+"""Compact, array-backed representation of a routing solution.
+
+The solution is walked once; every consumer (summary table, route map,
+exports, CLI) reads the flat arrays instead of re-walking ``NextVar``.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEPOT_NODE = 0
+NO_ROUTE = "no driver can fit it in"  # left out by the solver rather than the precheck
+
+
+def driver_name(vehicle_id):
+    return f"Driver {vehicle_id + 1}"
+
+
+def _previous_nodes(nodes, offsets):
+    """Node visited before every stop; the depot for each route's first stop."""
+    lengths = np.diff(offsets)
+    prev = np.zeros_like(nodes)
+    prev[1:] = nodes[:-1]
+    prev[offsets[:-1][lengths > 0]] = DEPOT_NODE  # every route leaves from the depot
+    return prev
+
+
+class Routes:
+    """Stops of vehicle ``v`` are ``nodes[offsets[v]:offsets[v + 1]]``.
+
+    Per-stop arrays (all aligned with ``nodes``):
+
+    - ``cum_distance_m``: meters driven from the depot up to the stop
+    - ``arrival_s``: solver arrival time, seconds from ``origin`` (when the
+      model had time windows)
+    - ``late_s``: seconds past the stop's due time; only a search stopped
+      before it met every delivery window leaves any
+    - ``eta`` / ``order_no`` / ``lat`` / ``lon``: filled by :meth:`locate`
+
+    ``route_distance_m`` holds each vehicle's total, including the return leg.
+    ``unassigned`` lists the customer nodes of a partial plan that no route
+    visits, with the matching ``unassigned_reason``.
+    """
+
+    def __init__(self, nodes, offsets, leg_m, return_m):
+        self.nodes = np.asarray(nodes, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.leg_m = np.asarray(leg_m, dtype=np.int64)      # meters into each stop
+        self.return_m = np.asarray(return_m, dtype=np.int64)  # last stop → depot, per vehicle
+
+        cum = np.cumsum(self.leg_m)
+        cum -= np.repeat(np.r_[0, cum][self.offsets[:-1]], self.lengths)  # restart at each route
+        self.cum_distance_m = cum
+        last = self.offsets[1:] - 1
+        has_stops = self.lengths > 0
+        self.route_distance_m = self.return_m.copy()
+        self.route_distance_m[has_stops] += cum[last[has_stops]]
+
+        self.arrival_s = None
+        self.origin = None
+        self.late_s = np.zeros(len(self.nodes), dtype=np.int64)
+        self.unassigned = np.empty(0, dtype=np.int32)
+        self.unassigned_reason = np.empty(0, dtype=object)
+        self.cost = None            # solver objective, when the routes come from a solve
+        self.warm_started = False   # the solve started from the given initial routes
+        self.search = None          # solver statistics, see routing.search_stats
+        self.eta = None
+        self.order_no = None
+        self.lat = None
+        self.lon = None
+        self.depot = None
+
+    @classmethod
+    def from_matrix(cls, nodes, offsets, distance_matrix):
+        """Leg and return distances looked up in a depot-at-0 ``distance_matrix``."""
+        nodes = np.asarray(nodes, dtype=np.int32)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        lengths = np.diff(offsets)
+        matrix = np.asarray(distance_matrix)
+        leg_m = matrix[_previous_nodes(nodes, offsets), nodes]
+
+        return_m = np.zeros(len(lengths), dtype=np.int64)
+        last = offsets[1:][lengths > 0] - 1
+        return_m[lengths > 0] = matrix[nodes[last], DEPOT_NODE]
+        return cls(nodes, offsets, leg_m, return_m)
+
+    @classmethod
+    def from_node_lists(cls, node_routes, distance_matrix):
+        lengths = [len(r) for r in node_routes]
+        nodes = np.fromiter((n for r in node_routes for n in r), dtype=np.int32, count=sum(lengths))
+        return cls.from_matrix(nodes, np.r_[0, np.cumsum(lengths, dtype=np.int64)], distance_matrix)
+
+    @classmethod
+    def from_solution(cls, manager, routing, solution, distance_matrix, time_windows=None):
+        """Single ``NextVar`` walk over every vehicle, reading "Time" cumuls if present."""
+        time_dim = routing.GetDimensionOrDie("Time") if time_windows is not None else None
+        nodes = []
+        arrival_s = []
+        offsets = [0]
+        for vehicle_id in range(routing.vehicles()):
+            index = solution.Value(routing.NextVar(routing.Start(vehicle_id)))
+            while not routing.IsEnd(index):
+                nodes.append(manager.IndexToNode(index))
+                if time_dim is not None:
+                    arrival_s.append(solution.Min(time_dim.CumulVar(index)))
+                index = solution.Value(routing.NextVar(index))
+            offsets.append(len(nodes))
+        routes = cls.from_matrix(nodes, offsets, distance_matrix)
+        if time_dim is not None:
+            routes.arrival_s = np.asarray(arrival_s, dtype=np.int64)
+            routes.origin = time_windows.origin
+        return routes
+
+    def set_unassigned(self, num_customers, reasons=None):
+        """Record customers ``1..num_customers`` missing from the routes.
+
+        ``reasons`` maps nodes to why they were left out (see
+        :func:`~dispatch_planner.routing.precheck`); others get :data:`NO_ROUTE`.
+        """
+        missing = np.setdiff1d(np.arange(1, int(num_customers) + 1), self.nodes).astype(np.int32)
+        reasons = reasons or {}
+        self.unassigned = missing
+        self.unassigned_reason = np.array([reasons.get(int(n), NO_ROUTE) for n in missing], dtype=object)
+        return self
+
+    @classmethod
+    def concat(cls, parts):
+        """Stack ``(routes, node_map)`` pairs; ``node_map[local_node]`` gives the global node."""
+        nodes, offsets, legs, returns = [], [np.zeros(1, dtype=np.int64)], [], []
+        total = 0
+        for routes, node_map in parts:
+            nodes.append(np.asarray(node_map)[routes.nodes])
+            offsets.append(routes.offsets[1:] + total)
+            legs.append(routes.leg_m)
+            returns.append(routes.return_m)
+            total += len(routes.nodes)
+        if not parts:
+            return cls(np.empty(0), offsets[0], np.empty(0), np.empty(0))
+        merged = cls(np.concatenate(nodes), np.concatenate(offsets), np.concatenate(legs),
+                     np.concatenate(returns))
+        if all(routes.arrival_s is not None for routes, _ in parts):
+            # clusters share the windows' origin
+            merged.arrival_s = np.concatenate([routes.arrival_s for routes, _ in parts])
+            merged.origin = parts[0][0].origin
+        merged.late_s = np.concatenate([routes.late_s for routes, _ in parts])
+        merged.unassigned = np.concatenate(
+            [np.asarray(node_map)[routes.unassigned] for routes, node_map in parts]).astype(np.int32)
+        merged.unassigned_reason = np.concatenate([routes.unassigned_reason for routes, _ in parts])
+        searches = [routes.search for routes, _ in parts if routes.search is not None]
+        if searches:
+            # one search per part, run side by side: counts add up, the wall time is the slowest
+            merged.search = {key: sum(s[key] for s in searches)
+                             for key in ('branches', 'failures', 'solutions', 'vehicles', 'nodes', 'objective')}
+            merged.search.update(status=', '.join(sorted({s['status'] for s in searches})),
+                                 seconds=max(s['seconds'] for s in searches), parts=len(searches))
+        return merged
+
+    # -- shape ----------------------------------------------------------------
+
+    @property
+    def num_vehicles(self):
+        return len(self.offsets) - 1
+
+    def __len__(self):
+        return self.num_vehicles
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    @property
+    def vehicle(self):
+        """Vehicle id of every stop."""
+        return np.repeat(np.arange(self.num_vehicles), self.lengths)
+
+    @property
+    def drop_no(self):
+        """1-based position of every stop within its route."""
+        return np.arange(len(self.nodes)) - np.repeat(self.offsets[:-1], self.lengths) + 1
+
+    def driver(self, vehicle_id):
+        return driver_name(vehicle_id)
+
+    def stops(self, vehicle_id):
+        return slice(self.offsets[vehicle_id], self.offsets[vehicle_id + 1])
+
+    def node_lists(self):
+        return [self.nodes[self.stops(v)].tolist() for v in range(self.num_vehicles)]
+
+    # -- data attached from the order table -----------------------------------
+
+    def legs(self, matrix):
+        """``matrix[previous node, node]`` for every stop, e.g. leg travel times."""
+        return np.asarray(matrix)[_previous_nodes(self.nodes, self.offsets), self.nodes]
+
+    def locate(self, df_zone, depot, speed_kmph, time_matrix=None):
+        """Fill order numbers, coordinates and ETAs from ``df_zone`` (node = row + 1).
+
+        ETAs are the solver's arrival times when the model had time windows.
+        Otherwise they start from each route's first-stop ``order_datetime``
+        and add the travel time of every leg: from ``time_matrix`` (seconds,
+        e.g. a road network's) when given, else distance at ``speed_kmph``.
+        """
+        rows = self.nodes - 1
+        self.order_no = df_zone['Order No'].to_numpy()[rows]
+        self.lat = df_zone['LAT'].to_numpy(dtype=np.float64)[rows]
+        self.lon = df_zone['LON'].to_numpy(dtype=np.float64)[rows]
+        self.depot = (float(depot[0]), float(depot[1]))
+
+        if self.arrival_s is not None:
+            self.eta = (np.datetime64(self.origin, 'us')
+                        + self.arrival_s.astype('timedelta64[s]').astype('timedelta64[us]'))
+            return self
+        if time_matrix is not None:
+            leg_us = self.legs(time_matrix).astype(np.int64) * 1_000_000
+        else:
+            # integer microseconds per leg, matching timedelta(hours=km / speed) rounding
+            leg_us = np.rint(self.leg_m / 1000 / speed_kmph * 3600e6).astype(np.int64)
+        cum_us = np.cumsum(leg_us)
+        cum_us -= np.repeat(np.r_[0, cum_us][self.offsets[:-1]], self.lengths)
+        first = self.offsets[:-1][self.lengths > 0]
+        base_time = np.repeat(
+            df_zone['order_datetime'].to_numpy(dtype='datetime64[us]')[rows[first]],
+            self.lengths[self.lengths > 0],
+        )
+        self.eta = base_time + cum_us.astype('timedelta64[us]')
+        return self
+
+    def coords(self, vehicle_id):
+        """``(k + 2, 2)`` lat/lon polyline: depot → stops → depot."""
+        s = self.stops(vehicle_id)
+        depot = np.asarray([self.depot])
+        return np.concatenate([depot, np.column_stack([self.lat[s], self.lon[s]]), depot])
+
+    def table(self):
+        """One row per stop: Order No / Driver / Drop no. / ETA / distance."""
+        drivers = [driver_name(v) for v in range(self.num_vehicles)]
+        return pd.DataFrame({
+            'Order No': self.order_no,
+            'Driver': pd.Categorical.from_codes(self.vehicle, drivers),
+            'Drop no.': pd.array(self.drop_no, dtype='Int64'),
+            'ETA': pd.Series(self.eta).dt.strftime("%H:%M").to_numpy(dtype=object),
+            'cum_distance_km': self.cum_distance_m / 1000,
+        })
+
+    def stats(self):
+        """One row per driver: number of drops and total route distance."""
+        return pd.DataFrame({
+            'Driver': [driver_name(v) for v in range(self.num_vehicles)],
+            'Drops': self.lengths,
+            'Distance (km)': self.route_distance_m / 1000,
+        })
@@ -0,0 +1,544 @@
+"""OR-Tools routing model built from precomputed transit data.
+
+Distances, travel times and drop counts are handed to the solver as native
+matrix / vector transits, so the local search never calls back into Python.
+With :class:`TimeWindows`, a "Time" dimension enforces every order's delivery
+window and the ETAs are read from its cumul variables. The due times are soft
+bounds whose penalty outweighs any routing cost, so the first-solution
+heuristic always finds a (possibly late) plan for the local search to repair;
+a plan that still delivers late is rejected after the search. OR-Tools'
+heuristics ignore the windows and leave the local search a lot of lateness
+to remove, so by default a windowed search starts from
+:func:`insertion_routes` instead, which are on time wherever possible.
+Reported costs never include the lateness penalty.
+
+:func:`precheck` finds orders no driver could serve even alone, before any
+search. With ``allow_unassigned`` every order becomes an optional visit
+(``AddDisjunction``) whose penalty outweighs any routing cost, so the solver
+returns the largest feasible partial plan and lists the orders it dropped.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .routes import Routes
+
+DEPOT_NODE = 0
+MAX_ROUTE_M = 10000
+VEHICLE_FIXED_COST = 1000
+SERVICE_TIME_S = 0  # hand-over time per drop
+
+# OR-Tools enum names; ortools is only imported once a model is built (it is slow to load)
+METAHEURISTICS = {
+    "automatic": "AUTOMATIC",
+    "greedy_descent": "GREEDY_DESCENT",
+    "guided_local_search": "GUIDED_LOCAL_SEARCH",
+    "simulated_annealing": "SIMULATED_ANNEALING",
+    "tabu_search": "TABU_SEARCH",
+}
+FIRST_SOLUTIONS = {
+    "path_cheapest_arc": "PATH_CHEAPEST_ARC",
+    "savings": "SAVINGS",
+    "christofides": "CHRISTOFIDES",
+    "parallel_cheapest_insertion": "PARALLEL_CHEAPEST_INSERTION",
+    "local_cheapest_insertion": "LOCAL_CHEAPEST_INSERTION",
+    "global_cheapest_arc": "GLOBAL_CHEAPEST_ARC",
+    "automatic": "AUTOMATIC",
+}
+# built here rather than by OR-Tools: cheapest on-time insertion, see insertion_routes
+WINDOW_INSERTION = "window_insertion"
+# statuses of a search that ran out of time rather than out of options
+TIMEOUT_STATUSES = ("ROUTING_FAIL_TIMEOUT", "ROUTING_PARTIAL_SUCCESS_LOCAL_OPTIMUM_NOT_REACHED")
+# these never stop on their own, so they always get a time limit
+UNBOUNDED_METAHEURISTICS = ("guided_local_search", "simulated_annealing", "tabu_search")
+DEFAULT_TIME_LIMIT_S = 30
+
+
+class PlanningError(Exception):
+    """Raised when no route plan can be produced for the given inputs."""
+
+
+class CapacityError(PlanningError):
+    pass
+
+
+class NoSolutionError(PlanningError):
+    """``status`` is the search status (see :func:`search_stats`); None if no search ran.
+
+    ``timed_out`` means the search ended at its time limit rather than
+    running out of moves, so more time might still find a plan.
+    """
+    status = None
+    timed_out = False
+
+
+def _no_solution(message, status, options):
+    exc = NoSolutionError(message)
+    exc.status = status
+    # an unbounded metaheuristic only ever stops at its limit, whatever the status says
+    exc.timed_out = status in TIMEOUT_STATUSES or options.metaheuristic in UNBOUNDED_METAHEURISTICS
+    return exc
+
+
+@dataclass(frozen=True)
+class SearchOptions:
+    """How long and how hard the solver searches.
+
+    ``None`` limits mean "until the local search converges", except for the
+    unbounded metaheuristics, which fall back to ``DEFAULT_TIME_LIMIT_S``.
+    So does a ``bounded`` search, i.e. a model with delivery windows, whose
+    local search is not guaranteed to converge in reasonable time.
+
+    ``first_solution`` is one of :data:`FIRST_SOLUTIONS` or
+    :data:`WINDOW_INSERTION`; ``None`` means the latter with delivery windows
+    and "path_cheapest_arc" without.
+    """
+    time_limit_s: float = None
+    solution_limit: int = None
+    metaheuristic: str = "automatic"
+    first_solution: str = None
+
+    def seeded(self, time_windows=None):
+        """Whether the search starts from :func:`insertion_routes`."""
+        return (self.first_solution == WINDOW_INSERTION
+                or (self.first_solution is None and time_windows is not None))
+
+    def parameters(self, bounded=False):
+        if self.metaheuristic not in METAHEURISTICS:
+            raise ValueError(f"Unknown metaheuristic {self.metaheuristic!r}; "
+                             f"expected one of {tuple(METAHEURISTICS)}")
+        if self.first_solution not in (None, WINDOW_INSERTION, *FIRST_SOLUTIONS):
+            raise ValueError(f"Unknown first solution strategy {self.first_solution!r}; "
+                             f"expected one of {(*FIRST_SOLUTIONS, WINDOW_INSERTION)}")
+        from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+        params = pywrapcp.DefaultRoutingSearchParameters()
+        # a seeded search only falls back to OR-Tools' heuristic if its seed cannot be read
+        first_solution = self.first_solution if self.first_solution in FIRST_SOLUTIONS else "path_cheapest_arc"
+        params.first_solution_strategy = getattr(routing_enums_pb2.FirstSolutionStrategy,
+                                                 FIRST_SOLUTIONS[first_solution])
+        params.local_search_metaheuristic = getattr(routing_enums_pb2.LocalSearchMetaheuristic,
+                                                    METAHEURISTICS[self.metaheuristic])
+
+        time_limit_s = self.time_limit_s
+        if (time_limit_s is None and self.solution_limit is None
+                and (bounded or self.metaheuristic in UNBOUNDED_METAHEURISTICS)):
+            time_limit_s = DEFAULT_TIME_LIMIT_S
+        if time_limit_s is not None:
+            params.time_limit.FromMilliseconds(int(time_limit_s * 1000))
+        if self.solution_limit is not None:
+            params.solution_limit = int(self.solution_limit)
+        return params
+
+
+@dataclass
+class Incumbent:
+    """An improved solution reported while the search is still running.
+
+    ``cost`` leaves out the lateness penalty; ``late`` counts the orders this
+    solution would deliver after their due time.
+    """
+    solution_no: int
+    cost: int
+    routes: int      # drivers with at least one drop
+    seconds: float   # since the search started
+    late: int = 0
+
+
+def _incumbent_reporter(routing, manager, on_solution, time_windows=None, late_penalty=0):
+    """At-solution callback forwarding only strictly improving solutions."""
+    state = {"n": 0, "best": None, "t0": time.perf_counter()}
+    if time_windows is not None:
+        time_dim = routing.GetDimensionOrDie("Time")
+        due = np.asarray(time_windows.due_s, dtype=np.int64)
+        cumuls = [time_dim.CumulVar(manager.NodeToIndex(node)) for node in range(1, len(due) + 1)]
+
+    def report():
+        state["n"] += 1
+        cost = routing.CostVar().Value()
+        if state["best"] is not None and cost >= state["best"]:
+            return
+        state["best"] = cost
+        used = sum(
+            not routing.IsEnd(routing.NextVar(routing.Start(v)).Value())
+            for v in range(routing.vehicles())
+        )
+        late = 0
+        if time_windows is not None:
+            # unvisited nodes keep their earliest (ready) time, which is never late
+            late_s = np.fromiter((c.Min() for c in cumuls), dtype=np.int64, count=len(cumuls)) - due
+            late = int((late_s > 0).sum())
+            cost -= int(late_s[late_s > 0].sum()) * late_penalty
+        on_solution(Incumbent(state["n"], cost, used, time.perf_counter() - state["t0"], late))
+
+    return report
+
+
+@dataclass
+class TimeWindows:
+    """Per-order delivery windows, in seconds from ``origin``.
+
+    Customer node ``i`` (row ``i - 1``) can be served from its order time plus
+    the drive from the depot until its due time. Travel times are
+    ``travel_s`` when given (e.g. a road network's), else the distance matrix
+    driven at ``speed_kmph``; ``service_s`` is spent at every drop.
+    """
+    ordered_s: np.ndarray
+    due_s: np.ndarray
+    origin: np.datetime64
+    speed_kmph: float
+    service_s: int = SERVICE_TIME_S
+    travel_s: np.ndarray = None
+
+    def travel(self, distance_matrix):
+        if self.travel_s is not None:
+            return np.asarray(self.travel_s, dtype=np.int64)
+        return np.rint(np.asarray(distance_matrix, dtype=np.int64) * 3.6 / self.speed_kmph).astype(np.int64)
+
+    def subset(self, rows, travel_s=None):
+        """Windows of the customers at ``rows`` (0-based), e.g. for one cluster."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if travel_s is None and self.travel_s is not None:
+            nodes = np.r_[DEPOT_NODE, rows + 1]
+            travel_s = np.asarray(self.travel_s)[np.ix_(nodes, nodes)]
+        return TimeWindows(self.ordered_s[rows], self.due_s[rows], self.origin, self.speed_kmph,
+                           self.service_s, travel_s)
+
+
+def _add_time_dimension(routing, manager, time_windows, travel_s, late_penalty, excluded=()):
+    """"Time" dimension: travel + service transits, waiting allowed, due times soft.
+
+    Arriving before the order is ready is impossible; every second past its
+    due time costs ``late_penalty``. ``excluded`` nodes are inactive, so their
+    (possibly empty) windows are skipped.
+    """
+    num_nodes = len(travel_s)
+    service = np.full(num_nodes, int(time_windows.service_s), dtype=np.int64)
+    service[DEPOT_NODE] = 0
+    ready = np.asarray(time_windows.ordered_s, dtype=np.int64) + travel_s[DEPOT_NODE, 1:]
+    due = np.asarray(time_windows.due_s, dtype=np.int64)
+    horizon = int(max(due.max(initial=0), ready.max(initial=0))) + 24 * 3600
+
+    transit_idx = routing.RegisterTransitMatrix((travel_s + service[:, None]).tolist())
+    routing.AddDimension(transit_idx, horizon, horizon, False, "Time")
+    time_dim = routing.GetDimensionOrDie("Time")
+    excluded = set(map(int, excluded))
+    for node in range(1, num_nodes):
+        cumul = time_dim.CumulVar(manager.NodeToIndex(node))
+        if node in excluded:
+            continue
+        cumul.SetMin(int(ready[node - 1]))
+        time_dim.SetCumulVarSoftUpperBound(manager.NodeToIndex(node), int(due[node - 1]), late_penalty)
+        routing.AddVariableMinimizedByFinalizer(cumul)  # ETA = earliest feasible arrival
+    for vehicle_id in range(routing.vehicles()):
+        routing.AddVariableMinimizedByFinalizer(time_dim.CumulVar(routing.End(vehicle_id)))
+    return time_dim
+
+
+def precheck(distance_matrix, time_windows=None, max_route_m=MAX_ROUTE_M):
+    """``{node: reason}`` for customers no route can serve, even as its only stop.
+
+    A customer is unreachable when the depot round trip alone exceeds
+    ``max_route_m``, or, with ``time_windows``, when the drive from the depot
+    cannot arrive before its due time. One vectorized pass over the matrix.
+    """
+    matrix = np.asarray(distance_matrix, dtype=np.int64)
+    round_trip = matrix[DEPOT_NODE, 1:] + matrix[1:, DEPOT_NODE]
+    reasons = {
+        int(row) + 1: (f"depot round trip {round_trip[row] / 1000:.1f} km exceeds "
+                       f"the {max_route_m / 1000:g} km route limit")
+        for row in np.flatnonzero(round_trip > max_route_m)
+    }
+    if time_windows is not None and len(matrix) > 1:
+        ready = (np.asarray(time_windows.ordered_s, dtype=np.int64)
+                 + time_windows.travel(matrix)[DEPOT_NODE, 1:])
+        late = ready - np.asarray(time_windows.due_s, dtype=np.int64)
+        for row in np.flatnonzero(late > 0):
+            reasons.setdefault(int(row) + 1, f"cannot arrive before its deadline "
+                                             f"({-(-late[row] // 60)} min late even as a first drop)")
+    return reasons
+
+
+def late_seconds(routes, time_windows):
+    """Seconds past the due time at every stop of ``routes`` (0 when on time)."""
+    if time_windows is None or routes.arrival_s is None:
+        return np.zeros(len(routes.nodes), dtype=np.int64)
+    due = np.asarray(time_windows.due_s, dtype=np.int64)[routes.nodes - 1]
+    return np.maximum(routes.arrival_s - due, 0)
+
+
+def _arrivals(route, travel_s, ready, service_s):
+    """Earliest arrival at each stop of ``route``, as in the model's "Time" dimension."""
+    arrival = np.empty(len(route), dtype=np.int64)
+    prev, t = DEPOT_NODE, None
+    for i, node in enumerate(route):
+        t = ready[node - 1] if t is None else max(ready[node - 1], t + service_s + travel_s[prev, node])
+        arrival[i], prev = t, node
+    return arrival
+
+
+def cheapest_insertion(node_routes, new_nodes, distance_matrix, max_drops, locked=None,
+                       max_route_m=MAX_ROUTE_M, time_windows=None, allow_unassigned=False):
+    """Insert ``new_nodes`` one by one where they add the least distance.
+
+    Positions inside a route's locked prefix and routes that are full or would
+    exceed ``max_route_m`` are skipped. With ``time_windows``, positions that
+    make any stop of the route arrive after its due time are skipped too, so
+    the seed stays a valid warm start; an order with no on-time position goes
+    where it adds the least distance, and the solver repairs its lateness.
+    An order that fits nowhere raises :class:`CapacityError`, or with
+    ``allow_unassigned`` is left out for the solver to place or drop.
+    Returns new node lists.
+    """
+    matrix = np.asarray(distance_matrix, dtype=np.int64)
+    routes = [list(r) for r in node_routes]
+    locked = locked or [0] * len(routes)
+    lengths = np.array([sum(matrix[a, b] for a, b in zip([DEPOT_NODE] + r, r + [DEPOT_NODE]))
+                        for r in routes], dtype=np.int64)
+    if time_windows is not None:
+        travel_s = time_windows.travel(matrix)
+        ready = np.asarray(time_windows.ordered_s, dtype=np.int64) + travel_s[DEPOT_NODE, 1:]
+        due = np.asarray(time_windows.due_s, dtype=np.int64)
+
+    def on_time(route):
+        return (_arrivals(route, travel_s, ready, int(time_windows.service_s))
+                <= due[np.asarray(route) - 1]).all()
+
+    for node in new_nodes:
+        best = late = None
+        empty_seen = False
+        for v, route in enumerate(routes):
+            if len(route) >= max_drops or (not route and empty_seen):
+                continue  # full, or as good as an empty route already tried
+            empty_seen = empty_seen or not route
+            path = np.array([DEPOT_NODE] + route + [DEPOT_NODE])
+            a, b = path[:-1], path[1:]
+            added = matrix[a, node] + matrix[node, b] - matrix[a, b]
+            added[:locked[v]] = np.iinfo(np.int64).max  # never before a dispatched stop
+            added[lengths[v] + added > max_route_m] = np.iinfo(np.int64).max
+            for pos in np.argsort(added, kind="stable"):
+                if added[pos] == np.iinfo(np.int64).max or (best is not None and added[pos] >= best[0]):
+                    break
+                if late is None or added[pos] < late[0]:
+                    late = (added[pos], v, int(pos))
+                if time_windows is None or on_time(route[:pos] + [int(node)] + route[pos:]):
+                    best = (added[pos], v, int(pos))
+                    break
+        best = best or late
+        if best is None and allow_unassigned:
+            continue
+        if best is None:
+            raise CapacityError(f"No driver has room for late order node {node}.")
+        added, v, pos = best
+        routes[v].insert(pos, int(node))
+        lengths[v] += added
+    return routes
+
+
+def insertion_routes(distance_matrix, num_drivers, max_drops, time_windows=None, excluded=(),
+                     max_route_m=MAX_ROUTE_M):
+    """Seed routes for :data:`WINDOW_INSERTION`: :func:`cheapest_insertion` from empty routes.
+
+    Orders are inserted most urgent first; the ``excluded`` ones and any that
+    fit nowhere are left out.
+    """
+    nodes = np.setdiff1d(np.arange(1, len(distance_matrix)), np.fromiter(map(int, excluded), dtype=np.int64))
+    if time_windows is not None:
+        nodes = nodes[np.argsort(np.asarray(time_windows.due_s)[nodes - 1], kind="stable")]
+    return cheapest_insertion([[] for _ in range(int(num_drivers))], nodes, distance_matrix, max_drops,
+                              max_route_m=max_route_m, time_windows=time_windows, allow_unassigned=True)
+
+
+def drop_penalty(num_drivers, max_route_m=MAX_ROUTE_M):
+    """Penalty per unassigned order: more than the cost of any complete plan.
+
+    Serving one more order therefore always beats anything dropping it could
+    save, and the solver only drops orders it cannot fit in. It is also the
+    cost of every second a delivery is late, so lateness is never a saving.
+    """
+    num_drivers = int(num_drivers)
+    fixed = VEHICLE_FIXED_COST * num_drivers * (num_drivers - 1) // 2
+    return fixed + num_drivers * int(max_route_m) + 1
+
+
+def drop_demands(num_nodes):
+    """One drop per customer node, zero at the depot."""
+    demands = np.ones(num_nodes, dtype=np.int64)
+    demands[DEPOT_NODE] = 0
+    return demands
+
+
+def build_routing_model(distance_matrix, num_drivers, max_drops_per_driver,
+                        max_route_m=MAX_ROUTE_M, time_windows=None, optional=False, excluded=()):
+    """Return ``(manager, routing)`` for an int meters ``distance_matrix``.
+
+    ``time_windows`` (:class:`TimeWindows`) adds the "Time" dimension. With
+    ``optional`` every customer may be left out at :func:`drop_penalty`, and
+    the ``excluded`` nodes (e.g. from :func:`precheck`) are never visited.
+    """
+    from ortools.constraint_solver import pywrapcp
+
+    distance_matrix = np.asarray(distance_matrix, dtype=np.int64)
+    num_nodes = len(distance_matrix)
+
+    manager = pywrapcp.RoutingIndexManager(num_nodes, num_drivers, DEPOT_NODE)
+    routing = pywrapcp.RoutingModel(manager)
+
+    # ✅ Distance as a native transit matrix (meters)
+    transit_idx = routing.RegisterTransitMatrix(distance_matrix.tolist())
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_idx)
+    routing.AddDimension(
+        transit_idx,
+        0,            # slack
+        max_route_m,  # max meters per route
+        True,         # start from 0
+        "Distance",
+    )
+
+    # ✅ Drop count as a native unary transit vector
+    demand_idx = routing.RegisterUnaryTransitVector(drop_demands(num_nodes).tolist())
+    routing.AddDimensionWithVehicleCapacity(
+        demand_idx,
+        0,
+        [int(max_drops_per_driver)] * int(num_drivers),
+        True,
+        "DropCount",
+    )
+
+    for vehicle_id in range(1, num_drivers):
+        routing.SetFixedCostOfVehicle(VEHICLE_FIXED_COST * vehicle_id, vehicle_id)
+
+    if optional:
+        penalty = drop_penalty(num_drivers, max_route_m)
+        for node in range(1, num_nodes):
+            routing.AddDisjunction([manager.NodeToIndex(node)], penalty)
+        for node in excluded:
+            routing.ActiveVar(manager.NodeToIndex(int(node))).SetValue(0)
+
+    if time_windows is not None:
+        _add_time_dimension(routing, manager, time_windows, time_windows.travel(distance_matrix),
+                            drop_penalty(num_drivers, max_route_m), excluded)
+
+    return manager, routing
+
+
+def _lock_prefixes(routing, manager, node_routes, locked):
+    """Pin the first ``locked[v]`` stops of each route: same vehicle, same order."""
+    solver = routing.solver()
+    for vehicle_id, (route_nodes, count) in enumerate(zip(node_routes, locked)):
+        prev = routing.Start(vehicle_id)
+        for node in route_nodes[:count]:
+            index = manager.NodeToIndex(int(node))
+            solver.Add(routing.NextVar(prev) == index)
+            prev = index
+
+
+def search_stats(routing, seconds):
+    """Statistics of ``routing``'s last search (status name, branches, failures, ...)."""
+    from ortools.constraint_solver import routing_enums_pb2
+
+    solver = routing.solver()
+    return {
+        'status': routing_enums_pb2.RoutingSearchStatus.Value.Name(routing.status()),
+        'seconds': round(seconds, 3),
+        'branches': solver.Branches(),
+        'failures': solver.Failures(),
+        'solutions': solver.Solutions(),
+        'vehicles': routing.vehicles(),
+        'nodes': routing.nodes(),
+    }
+
+
+def solve_routes(distance_matrix, num_drivers, max_drops, options=None, on_solution=None,
+                 initial_routes=None, locked=None, time_windows=None, allow_unassigned=False, stop=None):
+    """Solve the VRP and return the solution as :class:`Routes`.
+
+    ``options`` is a :class:`SearchOptions`; ``on_solution`` is called with an
+    :class:`Incumbent` each time the search finds a cheaper solution.
+
+    ``initial_routes`` (one node list per vehicle, covering every customer;
+    with ``allow_unassigned``, customers left out start unassigned)
+    warm-starts the search from an existing plan instead of a first-solution
+    heuristic. ``locked`` gives, per vehicle, how many leading stops of
+    ``initial_routes`` are already dispatched and must not move.
+
+    With ``time_windows`` the solver only builds routes that meet every
+    delivery window, and each stop's ETA is its "Time" cumul. Unless
+    ``options`` names an OR-Tools strategy, the search then starts from
+    :func:`insertion_routes`.
+
+    Orders that fail :func:`precheck` raise :class:`NoSolutionError` before
+    any search. With ``allow_unassigned`` they are left out instead, as is
+    whatever else does not fit, and the routes' ``unassigned`` lists them.
+
+    ``stop`` is polled throughout the search; once it returns True the search
+    ends and keeps its best solution, as if it had hit the time limit. That
+    solution is on time if the search found any on-time one; otherwise it is
+    returned anyway, with the routes' ``late_s`` marking the late stops.
+    """
+    num_drivers = int(num_drivers)
+    max_drops = int(max_drops)
+
+    total_orders = len(distance_matrix) - 1
+    max_capacity = num_drivers * max_drops
+    if total_orders > max_capacity and not allow_unassigned:
+        raise CapacityError(f"Orders ({total_orders}) exceed driver capacity ({max_capacity}).")
+    unreachable = precheck(distance_matrix, time_windows)
+    if unreachable and not allow_unassigned:
+        node, reason = next(iter(unreachable.items()))
+        raise NoSolutionError(f"{len(unreachable)} order(s) cannot be served by any driver "
+                              f"(node {node}: {reason}).")
+    if num_drivers == 0:
+        routes = Routes.from_node_lists([], distance_matrix).set_unassigned(total_orders, unreachable)
+        if time_windows is not None:
+            routes.arrival_s, routes.origin = np.empty(0, dtype=np.int64), time_windows.origin
+        return routes
+
+    manager, routing = build_routing_model(distance_matrix, num_drivers, max_drops,
+                                           time_windows=time_windows, optional=allow_unassigned,
+                                           excluded=unreachable)
+    options = options or SearchOptions()
+    search_params = options.parameters(bounded=time_windows is not None)
+    late_penalty = drop_penalty(num_drivers)
+    if locked is not None:
+        _lock_prefixes(routing, manager, initial_routes, locked)
+    if on_solution is not None:
+        routing.AddAtSolutionCallback(_incumbent_reporter(routing, manager, on_solution, time_windows,
+                                                          late_penalty))
+    if stop is not None:
+        routing.AddSearchMonitor(routing.solver().CustomLimit(lambda: bool(stop())))
+
+    solution = None
+    started = time.perf_counter()
+    seed = initial_routes
+    if seed is None and options.seeded(time_windows):
+        seed = insertion_routes(distance_matrix, num_drivers, max_drops, time_windows, unreachable)
+    if seed is not None:
+        routing.CloseModelWithParameters(search_params)
+        initial = routing.ReadAssignmentFromRoutes([list(map(int, r)) for r in seed], True)
+        if initial is not None:
+            solution = routing.SolveFromAssignmentWithParameters(initial, search_params)
+    warm_started = solution is not None and initial_routes is not None
+    if solution is None:
+        solution = routing.SolveWithParameters(search_params)
+    stats = search_stats(routing, time.perf_counter() - started)
+    if not solution:
+        if time_windows is not None:
+            raise _no_solution(f"No routing solution meets every delivery window ({stats['status']}).",
+                               stats['status'], options)
+        raise _no_solution(f"No routing solution found ({stats['status']}).", stats['status'], options)
+
+    routes = Routes.from_solution(manager, routing, solution, distance_matrix, time_windows)
+    routes.late_s = late_seconds(routes, time_windows)
+    late = routes.late_s > 0
+    if late.any() and not (stop is not None and stop()):
+        minutes = -(-(routes.arrival_s[late] - time_windows.due_s[routes.nodes[late] - 1]).max() // 60)
+        raise _no_solution(f"No routing solution meets every delivery window ({int(late.sum())} "
+                           f"order(s) up to {minutes} min late, {stats['status']}).", stats['status'], options)
+    routes.set_unassigned(total_orders, unreachable)
+    routes.cost = solution.ObjectiveValue() - int(routes.late_s.sum()) * late_penalty
+    routes.warm_started = warm_started
+    routes.search = {**stats, 'objective': routes.cost}
+    return routes
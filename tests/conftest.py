@@ -0,0 +1,30 @@
+"""Shared fixtures; the package is imported from the checkout, like the benchmarks do."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dispatch_planner.distance import distance_matrix_m  # noqa: E402
+from dispatch_planner.preprocess import DEFAULT_DEPOT  # noqa: E402
+from dispatch_planner.routing import TimeWindows  # noqa: E402
+
+SPEED_KMPH = 30
+
+
+@pytest.fixture
+def opposite_pair():
+    """``(matrix, windows)``: two orders 2 km either side of the depot, both due on arrival.
+
+    One driver has to serve both, so whichever comes second is always late.
+    """
+    lat, lon = DEFAULT_DEPOT
+    points = [(lat, lon), (lat + 0.018, lon), (lat - 0.018, lon)]
+    matrix = distance_matrix_m(points)
+    windows = TimeWindows(np.zeros(2, dtype=np.int64), np.zeros(2, dtype=np.int64),
+                          np.datetime64("2026-01-05T08:00:00"), SPEED_KMPH)
+    windows.due_s = windows.travel(matrix)[0, 1:]  # the drive from the depot, not a second more
+    return matrix, windows
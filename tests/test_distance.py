@@ -0,0 +1,61 @@
+"""Vectorized distances against geopy's geodesic, and the matrix helpers."""
+
+import numpy as np
+import pytest
+from geopy.distance import geodesic
+
+from dispatch_planner.distance import (
+    distance_block_m,
+    distance_matrix_km,
+    distance_matrix_m,
+    ellipsoidal_km,
+    extend_matrix_m,
+    haversine_km,
+    vincenty_km,
+)
+from dispatch_planner.preprocess import DEFAULT_DEPOT
+
+
+def city(num_points, seed=0, spread=0.1):
+    """Points scattered ~10 km around the depot."""
+    rng = np.random.default_rng(seed)
+    return np.asarray(DEFAULT_DEPOT) + rng.normal(0, spread, (num_points, 2))
+
+
+@pytest.fixture(scope="module")
+def pairs():
+    a, b = city(300, seed=1), city(300, seed=2)
+    exact = np.array([geodesic(p, q).km for p, q in zip(a, b)])
+    return a, b, exact
+
+
+@pytest.mark.parametrize("fn, tolerance_km", [
+    (vincenty_km, 1e-6),     # sub-millimetre
+    (ellipsoidal_km, 0.01),  # the solver's matrices: metres at city scale
+])
+def test_agrees_with_geodesic(pairs, fn, tolerance_km):
+    a, b, exact = pairs
+    np.testing.assert_allclose(fn(a[:, 0], a[:, 1], b[:, 0], b[:, 1]), exact, rtol=0, atol=tolerance_km)
+
+
+def test_haversine_is_off_by_about_half_a_percent(pairs):
+    a, b, exact = pairs
+    error = haversine_km(a[:, 0], a[:, 1], b[:, 0], b[:, 1]) / exact - 1
+    assert np.abs(error).max() < 0.006 and np.abs(error).max() > 0.001  # why the matrices are ellipsoidal
+
+
+def test_coincident_and_missing_points():
+    for fn in (vincenty_km, ellipsoidal_km, haversine_km):
+        km = fn(np.array([DEFAULT_DEPOT[0], np.nan]), np.array([DEFAULT_DEPOT[1], DEFAULT_DEPOT[1]]),
+                *DEFAULT_DEPOT)
+        assert km[0] == 0 and np.isnan(km[1])
+
+
+def test_matrix_helpers_agree():
+    points, new = city(40, seed=3), city(7, seed=4)
+    matrix = distance_matrix_m(points)
+    assert matrix.dtype == np.int32 and (matrix == matrix.T).all() and (np.diag(matrix) == 0).all()
+    np.testing.assert_array_equal(matrix, np.rint(distance_matrix_km(points) * 1000))
+    np.testing.assert_array_equal(distance_block_m(points[:5], points), matrix[:5])
+    np.testing.assert_array_equal(extend_matrix_m(matrix, points, new),
+                                  distance_matrix_m(np.vstack([points, new])))
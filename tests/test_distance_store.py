@@ -0,0 +1,38 @@
+"""The persistent distance store is opt-in and sized small by default."""
+
+import os
+
+import numpy as np
+import pytest
+
+from dispatch_planner.distance import distance_matrix_m
+from dispatch_planner.distance_store import DEFAULT_MAX_POINTS, DistanceStore
+from dispatch_planner.preprocess import DEFAULT_DEPOT
+
+
+def day(num_points, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.asarray(DEFAULT_DEPOT) + rng.normal(0, 0.02, (num_points, 2))
+
+
+def test_from_env_is_opt_in(tmp_path):
+    assert DistanceStore.from_env({}) is None
+    store = DistanceStore.from_env({"DISPATCH_DISTANCE_CACHE": str(tmp_path / "d")})
+    assert store.max_points == DEFAULT_MAX_POINTS
+    assert os.path.getsize(tmp_path / "d" / "matrix.i32") == DEFAULT_MAX_POINTS ** 2 * 4
+    store.close()
+
+
+def test_store_keeps_its_size(tmp_path):
+    env = {"DISPATCH_DISTANCE_CACHE": str(tmp_path), "DISPATCH_DISTANCE_CACHE_POINTS": "50"}
+    store = DistanceStore.from_env(env)
+    points = np.round(day(30), 6)
+    np.testing.assert_array_equal(store.matrix_m(points), distance_matrix_m(points))
+    store.close()
+
+    reopened = DistanceStore(str(tmp_path))
+    assert reopened.max_points == 50 and len(reopened) == 30
+    np.testing.assert_array_equal(reopened.matrix_m(points[:10]), distance_matrix_m(points[:10]))
+    reopened.close()
+    with pytest.raises(ValueError, match="max_points"):
+        DistanceStore(str(tmp_path), max_points=60)
@@ -0,0 +1,33 @@
+"""Fleet sweep statuses."""
+
+import pickle
+
+import pytest
+
+from dispatch_planner.fleet import FEASIBLE, NO_SOLUTION, OVER_CAPACITY, TIMED_OUT, sweep_fleet
+from dispatch_planner.routing import NoSolutionError, SearchOptions, solve_routes
+
+
+def statuses(sweep):
+    return dict(zip(zip(sweep.table['Drivers'], sweep.table['Max Drops']), sweep.table['Status']))
+
+
+def test_timed_out_is_not_no_solution(opposite_pair):
+    matrix, windows = opposite_pair
+    # one driver is always late: guided local search runs into its limit, greedy descent converges
+    timed = sweep_fleet(matrix, [1, 2], [1, 2],
+                        SearchOptions(time_limit_s=0.5, metaheuristic="guided_local_search"), windows,
+                        workers=1)
+    assert statuses(timed) == {(1, 1): OVER_CAPACITY, (1, 2): TIMED_OUT, (2, 1): FEASIBLE, (2, 2): FEASIBLE}
+    converged = sweep_fleet(matrix, [1], [2], SearchOptions(metaheuristic="greedy_descent"), windows, workers=1)
+    assert statuses(converged) == {(1, 2): NO_SOLUTION}
+    assert timed.smallest()['Drivers used'] == 2
+
+
+def test_no_solution_status_survives_pickling(opposite_pair):
+    matrix, windows = opposite_pair
+    with pytest.raises(NoSolutionError) as raised:
+        solve_routes(matrix, 1, 2, SearchOptions(time_limit_s=0.5, metaheuristic="guided_local_search"),
+                     time_windows=windows)
+    error = pickle.loads(pickle.dumps(raised.value))  # as sent back by a SolveJob or pool worker
+    assert error.timed_out and error.status is not None
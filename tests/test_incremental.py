@@ -0,0 +1,80 @@
+"""Late-order insertion: locked prefixes, delivery windows and matrix reuse."""
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_pipeline import make_day
+from dispatch_planner import incremental
+from dispatch_planner.cache import PlanCache
+from dispatch_planner.distance import distance_matrix_m
+from dispatch_planner.engine import node_points
+from dispatch_planner.preprocess import DEFAULT_DEPOT
+from dispatch_planner.routing import CapacityError, SearchOptions, TimeWindows, cheapest_insertion
+
+KM = 1 / 111.32  # degrees of latitude
+
+
+def points(*offsets):
+    """Matrix over the depot and points ``(km north, km east)`` of it."""
+    lat, lon = DEFAULT_DEPOT
+    return distance_matrix_m([(lat, lon)] + [(lat + n * KM, lon + e * KM) for n, e in offsets])
+
+
+def test_insertion_keeps_locked_prefix():
+    # route 1 -> 2 is a triangle with the depot; 3 sits on the way out to 1, 4 on the way from 1 to 2
+    matrix = points((1, 0), (1, 2), (0.5, -0.1), (1.1, 1))
+    assert cheapest_insertion([[1, 2]], [3], matrix, 3) == [[3, 1, 2]]
+    assert cheapest_insertion([[1, 2]], [3], matrix, 3, locked=[1]) == [[1, 2, 3]]
+    assert cheapest_insertion([[1, 2]], [4], matrix, 3, locked=[1]) == [[1, 4, 2]]
+    # a fully dispatched route only takes the order at its end
+    assert cheapest_insertion([[1, 2]], [4], matrix, 3, locked=[2]) == [[1, 2, 4]]
+
+
+def test_insertion_prefers_an_on_time_position():
+    matrix = points((2, 0), (2.5, 0.2))
+    windows = TimeWindows(np.zeros(2, dtype=np.int64), np.zeros(2, dtype=np.int64),
+                          np.datetime64("2026-01-05T08:00:00"), 30)
+    windows.due_s = windows.travel(matrix)[0, 1:]  # only a driver heading straight there is on time
+    shared, empty = cheapest_insertion([[1], []], [2], matrix, 2)
+    assert sorted(shared) == [1, 2] and empty == []
+    assert cheapest_insertion([[1], []], [2], matrix, 2, time_windows=windows) == [[1], [2]]
+    # no on-time position left: the cheapest one, for the solver to repair
+    (route,) = cheapest_insertion([[1]], [2], matrix, 2, time_windows=windows)
+    assert sorted(route) == [1, 2]
+
+
+def test_insertion_capacity():
+    matrix = points((1, 0), (2, 0))
+    with pytest.raises(CapacityError):
+        cheapest_insertion([[1]], [2], matrix, 1)
+    assert cheapest_insertion([[1]], [2], matrix, 1, allow_unassigned=True) == [[1]]
+
+
+def test_replanner_only_computes_new_rows(tmp_path, monkeypatch):
+    orders, locations = make_day(36, seed=4)
+    order_file, location_file = tmp_path / "orders.csv", tmp_path / "locations.csv"
+    orders.iloc[:30].to_csv(order_file, index=False)
+    locations.iloc[:30].to_csv(location_file, index=False)
+    cache = PlanCache()
+    result = cache.plan(order_file, location_file, num_drivers=12, max_drops=3,
+                        search=SearchOptions(time_limit_s=1))
+
+    def rebuilt(*args, **kwargs):
+        raise AssertionError("the full matrix was rebuilt")
+
+    extended = []
+    extend_matrix_m = incremental.extend_matrix_m
+
+    def extend(distance_matrix, points, new_points):
+        extended.append((len(distance_matrix), len(new_points)))
+        return extend_matrix_m(distance_matrix, points, new_points)
+
+    monkeypatch.setattr(incremental, "build_matrix", rebuilt)
+    monkeypatch.setattr(incremental, "extend_matrix_m", extend)
+    planner = cache.replanner(result, order_file, location_file, 12, 3, search=SearchOptions(time_limit_s=1))
+    late = planner.add_orders(orders, locations)
+
+    new = len(late.sameday) - len(result.sameday)
+    assert new > 0 and extended == [(len(result.sameday) + 1, new)]
+    np.testing.assert_array_equal(planner.distance_matrix, distance_matrix_m(node_points(late.sameday, late.depot)))
+    assert set(late.routes.order_no) == set(late.sameday['Order No'])
@@ -0,0 +1,67 @@
+"""Background solves: stopping a windowed search keeps its best routes; evicted jobs end."""
+
+from benchmarks.bench_pipeline import make_day
+from dispatch_planner.cache import LRUCache, PlanCache
+from dispatch_planner.jobs import SolveJob
+from dispatch_planner.routing import SearchOptions, solve_routes
+
+# guided local search never converges, so only the cancel ends it
+SEARCH = SearchOptions(time_limit_s=120, metaheuristic="guided_local_search")
+
+
+def test_stop_keeps_late_routes(opposite_pair):
+    matrix, windows = opposite_pair
+    found = []
+    routes = solve_routes(matrix, 1, 2, SEARCH, on_solution=found.append, time_windows=windows,
+                          stop=lambda: bool(found))
+    assert routes.lengths.tolist() == [2]
+    assert (routes.late_s > 0).sum() == 1
+    assert routes.cost < 100_000  # distance and fixed costs, without the lateness penalty
+    assert found[0].late == 1 and found[0].cost < 100_000
+
+
+def test_cancelled_job_returns_routes(opposite_pair):
+    matrix, windows = opposite_pair
+    job = SolveJob(solve_routes, matrix, 1, 2, SEARCH, time_windows=windows)
+    try:
+        while job.poll().best is None and not job.done:
+            job.wait(timeout=0.05)
+        job.cancel()
+        assert job.wait(timeout=60)
+        routes = job.result()
+    finally:
+        job.close()
+    assert job.cancelled
+    assert routes.lengths.tolist() == [2]
+    assert (routes.late_s > 0).sum() == 1
+
+
+def test_lru_cache_hands_every_leaving_value_to_on_evict():
+    evicted = []
+    cache = LRUCache(maxsize=2, on_evict=evicted.append)
+    a, b, c, d = object(), object(), object(), object()
+    cache.put("a", a)
+    cache.put("b", b)
+    cache.put("a", a)  # the same value again: still cached
+    cache.get("a")
+    cache.put("c", c)  # "b" is the least recently used
+    cache.put("a", d)  # replaced
+    assert evicted == [b, a] and len(cache) == 2
+    cache.clear()
+    assert evicted == [b, a, c, d] and len(cache) == 0
+
+
+def test_evicted_job_is_closed(tmp_path):
+    orders, locations = make_day(30, seed=5)
+    order_file, location_file = tmp_path / "orders.csv", tmp_path / "locations.csv"
+    orders.to_csv(order_file, index=False)
+    locations.to_csv(location_file, index=False)
+    cache = PlanCache(maxsize=1)
+    first = cache.submit(order_file, location_file, num_drivers=20, max_drops=3, search=SEARCH)
+    second = cache.submit(order_file, location_file, num_drivers=21, max_drops=3, search=SEARCH)
+    try:
+        assert first.closed and first.done and "abandoned" in str(first.error)
+        assert not second.closed and not second.poll().done
+    finally:
+        cache.clear()
+    assert second.closed and second.done
@@ -0,0 +1,48 @@
+"""Multi-depot planning: per-depot order checks and the exported workbook."""
+
+import io
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from benchmarks.bench_pipeline import make_day
+from dispatch_planner.engine import NoSolutionError
+from dispatch_planner.export import write_xlsx
+from dispatch_planner.multidepot import plan_depots
+from dispatch_planner.preprocess import DEFAULT_DEPOT
+from dispatch_planner.routing import SearchOptions
+
+LAT, LON = DEFAULT_DEPOT
+
+
+def depots(*names):
+    """Depots a few hundred metres apart, so each gets a share of the day."""
+    return pd.DataFrame({'Depot': list(names), 'LAT': [LAT + 0.004 * i for i in range(len(names))],
+                         'LON': [LON] * len(names)})
+
+
+def test_sheet_names_stay_unique_when_cut():
+    # the same first 22 characters, and names Excel tells apart by case only
+    table = depots("Bangkok Sukhumvit Store North", "Bangkok Sukhumvit Store South",
+                   "Bangkok Sukhumvit Store south2", "bangkok sukhumvit store NORTH")
+    orders, locations = make_day(60, seed=2)
+    result = plan_depots(orders, locations, table, num_drivers=12, max_drops=3, workers=1,
+                         search=SearchOptions(time_limit_s=1))
+
+    buffer = io.BytesIO()
+    write_xlsx(result, buffer)
+    names = load_workbook(buffer, read_only=True).sheetnames
+    driver_sheets = names[2:]
+    assert sum(int((plan.routes.lengths > 0).sum()) for plan in result.results.values()) == len(driver_sheets)
+    assert len({name.lower() for name in names}) == len(names)
+    assert all(len(name) <= 31 for name in names)
+    assert any("~2 " in name for name in driver_sheets)
+
+
+def test_unservable_order_fails_before_solving():
+    orders, locations = make_day(30, seed=1, radius_km=8)
+    with pytest.raises(NoSolutionError, match=r"^Far: No driver can serve order"):
+        # an 8 km sameday radius puts some round trips over the 10 km route limit
+        plan_depots(orders, locations, depots("Far"), num_drivers=30, max_drops=1, workers=1,
+                    sameday_radius_km=8, search=SearchOptions(time_limit_s=30))
@@ -0,0 +1,46 @@
+"""The column-wise preprocessing matches the original row-wise app code."""
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_preprocess import check_equal, legacy_classify, make_orders
+from dispatch_planner.preprocess import DEFAULT_DEPOT, add_order_datetime, classify_zones, prepare_orders
+
+DIRTY_DATES = ['', 'nan', '31/02/2026', '2026-01-05', '05/01/2026']
+DIRTY_TIMES = ['', 'nan', '25:00:00', '8:00', '08:00:00 ']
+
+
+def dirty_orders(num_rows, seed=0):
+    """Raw 'Order Date' / 'Order Time' strings, some unparseable, and a few NaN coordinates."""
+    rng = np.random.default_rng(seed)
+    df = make_orders(num_rows, seed).drop(columns='order_datetime')
+    stamps = pd.Timestamp("2026-01-05 08:00") + pd.to_timedelta(rng.integers(0, 36000, num_rows), unit='s')
+    df['Order Date'] = stamps.strftime('%d/%m/%Y')
+    df['Order Time'] = stamps.strftime('%H:%M:%S')
+    dirty = rng.choice(num_rows, num_rows // 10, replace=False)
+    df.loc[dirty, 'Order Date'] = rng.choice(DIRTY_DATES, len(dirty))
+    df.loc[dirty[::2], 'Order Time'] = rng.choice(DIRTY_TIMES, len(dirty[::2]))
+    df.loc[rng.choice(num_rows, 5, replace=False), 'LAT'] = np.nan
+    df.loc[rng.choice(num_rows, 5, replace=False), 'LON'] = np.nan
+    return df
+
+
+def test_classify_zones_matches_legacy():
+    orders = make_orders(2000, seed=3)
+    check_equal(legacy_classify(orders.copy(), DEFAULT_DEPOT), classify_zones(orders.copy(), DEFAULT_DEPOT))
+
+
+def test_prepare_orders_matches_legacy_on_dirty_input():
+    orders = dirty_orders(2000, seed=7)
+    fast = prepare_orders(orders.copy(), DEFAULT_DEPOT)
+    assert fast['order_datetime'].isna().sum() >= 2000 // 10 * 0.8
+
+    # geopy rejects NaN coordinates, so the original code only ran on complete rows
+    located = orders[['LAT', 'LON']].notna().all(axis=1)
+    legacy = legacy_classify(add_order_datetime(orders[located].copy()), DEFAULT_DEPOT)
+    check_equal(legacy, fast[located])
+
+    unlocated = fast[~located]
+    assert unlocated['distance_km'].isna().all()
+    assert (unlocated['zone'] == 'nextday').all()
+    assert unlocated['delivery_deadline'].isna().all()